@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Benchmark the compression of the events published in the stream.
+
+For each compression algorithm, with and without a shared
+dictionary, it reports the average size of the payloads and the
+time spent compressing and decompressing them.
+
+The dictionary is trained with half of the events and it is
+evaluated with the other half. Use '--save-dict' to write it to
+a file that can be set in GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_DICT.
+When 'zstandard' is installed, the dictionary is trained with it;
+otherwise, it is built from the most recent events, which is the
+format zlib expects.
+
+Usage:
+    python benchmarks/events_compression.py [--dict-size N] [--save-dict PATH]
+"""
+
+import argparse
+import time
+
+from grimoirelab.core.scheduler.codecs import get_codec
+from grimoirelab.core.scheduler.compression import COMPRESSORS, encode_payload
+
+from json_codecs import git_events, github_events
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def train_dictionary(samples, size):
+    """Build a compression dictionary from a list of payloads"""
+
+    if zstandard:
+        return zstandard.train_dictionary(size, samples).as_bytes()
+
+    # zlib uses the end of the dictionary first, so the
+    # most common contents must be at the end
+    return b''.join(samples)[-size:]
+
+
+def measure(name, compressor, payloads, original=None):
+    start = time.perf_counter()
+    encoded = [encode_payload(data, compressor) for data in payloads]
+    compress_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if compressor:
+        for fields in encoded:
+            if 'encoding' in fields:
+                compressor.decompress(fields['data'])
+    decompress_time = time.perf_counter() - start
+
+    size = sum(len(fields['data']) for fields in encoded) / len(encoded)
+    ratio = original / size if original else 1
+
+    print(f"  {name:<12} {size:>8.0f} bytes/event  ratio {ratio:>6.2f}x  "
+          f"compress {compress_time * 1000:>8.1f} ms  decompress {decompress_time * 1000:>8.1f} ms")
+
+    return size
+
+
+def run(name, events, dict_size):
+    codec = get_codec()
+    payloads = [codec.dumps(event) for event in events]
+
+    training, payloads = payloads[::2], payloads[1::2]
+    dictionary = train_dictionary(training, dict_size)
+
+    print(f"{name} ({len(payloads)} events)")
+
+    original = measure('none', None, payloads)
+
+    for compressor_name, compressor_class in COMPRESSORS.items():
+        try:
+            compressors = [
+                (compressor_name, compressor_class()),
+                (f'{compressor_name}+dict', compressor_class(dictionary=dictionary))
+            ]
+        except ValueError as e:
+            print(f"  {compressor_name:<12} skipped: {e}")
+            continue
+
+        for label, compressor in compressors:
+            measure(label, compressor, payloads, original)
+
+    return dictionary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark events compression")
+    parser.add_argument('--dict-size', type=int, default=16 * 1024,
+                        help="size of the dictionary in bytes")
+    parser.add_argument('--save-dict', default=None,
+                        help="file where the dictionary trained with git events is written")
+    args = parser.parse_args()
+
+    dictionary = run('git', git_events(), args.dict_size)
+    run('github', github_events(400), args.dict_size)
+
+    if args.save_dict:
+        with open(args.save_dict, 'wb') as fd:
+            fd.write(dictionary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Benchmark publishing events in the Redis events stream.
+
+It compares the number of events per second published one by one,
+with a XADD per event, against the events published in batches
+by `EventsPublisher`.
+
+By default, events are published to a fakeredis server. Use the
+option '--redis-url' to run it against a real Redis server, where
+the network latency is taken into account.
+
+Usage:
+    python benchmarks/events_publisher.py [--events N] [--batch-size N]
+                                          [--redis-url URL]
+"""
+
+import argparse
+import json
+import time
+
+import fakeredis
+import redis
+
+from grimoirelab.core.scheduler.tasks.chronicler import EventsPublisher
+
+
+STREAM_NAME = 'bench:events'
+STREAM_MAX_LENGTH = 1 * 10 ** 6
+
+
+def make_message(n):
+    """Generate a message similar to the ones created by the chronicler"""
+
+    event = {
+        'specversion': '1.0',
+        'id': f'{n:040x}',
+        'source': 'https://github.com/chaoss/grimoirelab-core.git',
+        'type': 'org.grimoirelab.events.git.commit',
+        'time': 1700000000 + n,
+        'data': {
+            'commit': f'{n:040x}',
+            'Author': 'John Smith <jsmith@example.com>',
+            'message': 'Update the documentation of the project',
+        }
+    }
+    return {'data': json.dumps(event)}
+
+
+def publish_per_event(conn, messages):
+    for message in messages:
+        conn.xadd(STREAM_NAME, message, maxlen=STREAM_MAX_LENGTH)
+
+
+def publish_batched(conn, messages, batch_size):
+    publisher = EventsPublisher(conn, STREAM_NAME, STREAM_MAX_LENGTH,
+                                batch_size=batch_size)
+    for message in messages:
+        publisher.publish(message)
+    publisher.flush()
+
+
+def run(name, func, conn, messages, *args):
+    conn.delete(STREAM_NAME)
+
+    start = time.perf_counter()
+    func(conn, messages, *args)
+    elapsed = time.perf_counter() - start
+
+    assert conn.xlen(STREAM_NAME) == len(messages)
+    conn.delete(STREAM_NAME)
+
+    print(f"{name:<20} {len(messages) / elapsed:>12.0f} events/s  ({elapsed:.3f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark events publication")
+    parser.add_argument('--events', type=int, default=50000,
+                        help="number of events to publish")
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help="number of events per batch")
+    parser.add_argument('--redis-url', default=None,
+                        help="Redis server to use instead of fakeredis")
+    args = parser.parse_args()
+
+    if args.redis_url:
+        conn = redis.Redis.from_url(args.redis_url)
+    else:
+        conn = fakeredis.FakeStrictRedis()
+
+    messages = [make_message(n) for n in range(args.events)]
+
+    run('per-event XADD', publish_per_event, conn, messages)
+    run(f'batched ({args.batch_size})', publish_batched, conn, messages, args.batch_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Benchmark the JSON codecs used to encode and decode events.
+
+Git events are generated by running perceval and chronicler on
+the git log used by the tests. GitHub events are CloudEvents with
+the structure of the issues fetched by perceval, including users,
+labels, reactions and comments.
+
+For each codec, it measures the number of events encoded and
+decoded per second and checks all of them generate the same bytes.
+
+Usage:
+    python benchmarks/json_codecs.py [--repeat N]
+"""
+
+import argparse
+import os
+import time
+
+import cloudevents.conversion
+import chronicler.eventizer
+import perceval.backends.core.git
+
+from grimoirelab.core.scheduler.codecs import CODECS, get_codec
+
+
+GIT_LOG = os.path.join(os.path.dirname(__file__), '..',
+                       'tests', 'scheduler', 'data', 'git_log.txt')
+
+
+def git_events():
+    """Generate git events from the tests git log"""
+
+    backend = perceval.backends.core.git.Git('http://example.com', GIT_LOG)
+    events = chronicler.eventizer.eventize('git', backend.fetch())
+
+    return [cloudevents.conversion.to_dict(event) for event in events]
+
+
+def github_user(n):
+    login = f'user{n}'
+    return {
+        'login': login,
+        'id': 1000 + n,
+        'node_id': f'MDQ6VXNlcj{n:05d}',
+        'avatar_url': f'https://avatars.githubusercontent.com/u/{1000 + n}?v=4',
+        'url': f'https://api.github.com/users/{login}',
+        'html_url': f'https://github.com/{login}',
+        'type': 'User',
+        'site_admin': False,
+        'name': f'Usuario Número {n}',
+        'company': 'Bitergia',
+        'location': 'Madrid, España',
+        'email': None,
+    }
+
+
+def github_events(nevents=200):
+    """Generate events with the structure of GitHub issues"""
+
+    events = []
+    for n in range(nevents):
+        comments = [
+            {
+                'id': 500000 + n * 10 + c,
+                'user': github_user(c),
+                'created_at': '2024-01-02T10:11:12Z',
+                'body': f'Comment {c}: LGTM 👍 but please check the "tests"\n\nThanks!',
+                'reactions': {'total_count': c, '+1': c, '-1': 0, 'heart': 0},
+                'author_association': 'CONTRIBUTOR',
+            }
+            for c in range(n % 8)
+        ]
+        data = {
+            'url': f'https://api.github.com/repos/chaoss/grimoirelab-core/issues/{n}',
+            'id': 2000000 + n,
+            'number': n,
+            'title': f'Improve the performance of the archivist #{n}',
+            'user': github_user(n),
+            'labels': [
+                {'id': 1, 'name': 'enhancement', 'color': 'a2eeef', 'default': True},
+                {'id': 2, 'name': 'performance', 'color': 'ff0000', 'default': False},
+            ],
+            'state': 'open' if n % 3 else 'closed',
+            'locked': False,
+            'assignees': [github_user(n + 1)],
+            'comments': len(comments),
+            'created_at': '2024-01-01T09:00:00Z',
+            'updated_at': '2024-01-03T18:30:00Z',
+            'closed_at': None,
+            'body': 'The archivist spends most of the time encoding JSON.\n' * 5,
+            'reactions': {'total_count': 3, '+1': 2, 'rocket': 1},
+            'comments_data': comments,
+            'user_data': github_user(n),
+        }
+        events.append({
+            'specversion': '1.0',
+            'id': f'{n:040x}',
+            'type': 'org.grimoirelab.events.github.issue.opened',
+            'source': 'https://github.com/chaoss/grimoirelab-core',
+            'time': 1704099600.0 + n,
+            'datacontenttype': 'application/json',
+            'data': data,
+        })
+    return events
+
+
+def measure(func, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            func(item)
+    elapsed = time.perf_counter() - start
+
+    return len(items) * repeat / elapsed
+
+
+def run(name, events, repeat):
+    print(f"{name} ({len(events)} events)")
+
+    reference = None
+
+    for codec_name in CODECS:
+        try:
+            codec = get_codec(codec_name)
+        except ValueError as e:
+            print(f"  {codec_name:<8} skipped: {e}")
+            continue
+
+        encoded = [codec.dumps(event) for event in events]
+
+        if reference is None:
+            reference = encoded
+        elif encoded != reference:
+            print(f"  {codec_name:<8} WARNING: output differs from the other codecs")
+
+        size = sum(len(data) for data in encoded) / len(encoded)
+        dumps = measure(codec.dumps, events, repeat)
+        loads = measure(codec.loads, encoded, repeat)
+
+        print(f"  {codec_name:<8} dumps {dumps:>10.0f} events/s  "
+              f"loads {loads:>10.0f} events/s  ({size:.0f} bytes/event)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON codecs")
+    parser.add_argument('--repeat', type=int, default=200,
+                        help="number of times each set of events is processed")
+    args = parser.parse_args()
+
+    run('git', git_events(), args.repeat)
+    run('github', github_events(), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Benchmark the queries the scheduler runs on the tasks and jobs tables.
+
+It seeds the database with eventizer tasks and jobs, and times the
+most frequent queries: tasks filtered by status (maintenance), the
+first page of tasks ordered by scheduling date (API) and the latest
+job of a task, by number and by scheduling date. The queries are
+timed with the indexes of the scheduler tables and after dropping
+them; the indexes are created again at the end.
+
+The database configured in the settings is used, so run it against
+a database created for the benchmark, never against a production
+one. By default, 100k tasks and 10M jobs are created; seeding them
+takes a while, so use '--skip-seed' to run the queries again on an
+already seeded database.
+
+Usage:
+    DJANGO_SETTINGS_MODULE=<settings> python benchmarks/scheduler_queries.py
+        [--tasks N] [--jobs N] [--skip-seed] [--repeat N]
+"""
+
+import argparse
+import datetime
+import os
+import random
+import time
+import uuid
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'grimoirelab.core.config.settings')
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from grimoirelab.core.scheduler.models import SchedulerStatus  # noqa: E402
+from grimoirelab.core.scheduler.scheduler import _set_bulk_created_pks  # noqa: E402
+from grimoirelab.core.scheduler.tasks.models import EventizerJob, EventizerTask  # noqa: E402
+
+
+BATCH_SIZE = 10000
+MAINTAINED_STATUS = [
+    SchedulerStatus.RUNNING,
+    SchedulerStatus.RECOVERY,
+    SchedulerStatus.ENQUEUED,
+    SchedulerStatus.NEW
+]
+
+
+def seed(ntasks, njobs):
+    """Create tasks and their jobs"""
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    statuses = [choice for choice, _ in SchedulerStatus.choices]
+    jobs_per_task = max(njobs // ntasks, 1)
+
+    print(f"Seeding {ntasks} tasks and {jobs_per_task * ntasks} jobs")
+
+    for first in range(0, ntasks, BATCH_SIZE):
+        tasks = [
+            EventizerTask(uuid=str(uuid.uuid4()),
+                          task_type=EventizerTask.TASK_TYPE,
+                          task_args={'uri': f'https://example.com/repo-{first + i}.git'},
+                          status=random.choice(statuses),
+                          scheduled_at=now + datetime.timedelta(seconds=random.randint(-86400, 86400)),
+                          datasource_type='git',
+                          datasource_category='commit')
+            for i in range(min(BATCH_SIZE, ntasks - first))
+        ]
+        tasks = EventizerTask.objects.bulk_create(tasks)
+        # MySQL doesn't return the primary keys of the new rows
+        _set_bulk_created_pks(EventizerTask, tasks)
+
+        jobs = []
+        for task in tasks:
+            for job_num in range(1, jobs_per_task + 1):
+                jobs.append(EventizerJob(uuid=str(uuid.uuid4()),
+                                         job_num=job_num,
+                                         task_id=task.pk,
+                                         status=SchedulerStatus.COMPLETED,
+                                         queue='eventizer_jobs',
+                                         scheduled_at=now - datetime.timedelta(hours=jobs_per_task - job_num)))
+                if len(jobs) >= BATCH_SIZE:
+                    EventizerJob.objects.bulk_create(jobs)
+                    jobs = []
+        if jobs:
+            EventizerJob.objects.bulk_create(jobs)
+
+
+def queries(task_ids):
+    """Return the queries to time"""
+
+    def maintained_tasks():
+        return list(EventizerTask.objects.filter(status__in=MAINTAINED_STATUS).values_list('pk', flat=True))
+
+    def tasks_page():
+        return list(EventizerTask.objects.order_by('-scheduled_at')[:25])
+
+    def latest_job_by_num():
+        for task_id in task_ids:
+            EventizerJob.objects.filter(task_id=task_id).order_by('-job_num').first()
+
+    def latest_job_by_date():
+        for task_id in task_ids:
+            EventizerJob.objects.filter(task_id=task_id).order_by('-scheduled_at').first()
+
+    return [
+        ('tasks by status', maintained_tasks),
+        ('tasks page', tasks_page),
+        (f'latest job by num (x{len(task_ids)})', latest_job_by_num),
+        (f'latest job by date (x{len(task_ids)})', latest_job_by_date),
+    ]
+
+
+def measure(queries, repeat):
+    results = {}
+    for name, query in queries:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = best
+    return results
+
+
+def scheduler_indexes():
+    """Return the indexes of the scheduler tables"""
+
+    return [(model, index) for model in (EventizerTask, EventizerJob)
+            for index in model._meta.indexes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scheduler queries")
+    parser.add_argument('--tasks', type=int, default=100000,
+                        help="number of tasks to create")
+    parser.add_argument('--jobs', type=int, default=10 * 10 ** 6,
+                        help="number of jobs to create")
+    parser.add_argument('--skip-seed', action='store_true',
+                        help="don't create tasks and jobs")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="number of times each query is run")
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        seed(args.tasks, args.jobs)
+
+    task_ids = random.sample(list(EventizerTask.objects.values_list('pk', flat=True)), 100)
+    to_time = queries(task_ids)
+    indexes = scheduler_indexes()
+
+    indexed = measure(to_time, args.repeat)
+
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            editor.remove_index(model, index)
+    try:
+        not_indexed = measure(to_time, args.repeat)
+    finally:
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+
+    print(f"{'query':<32} {'no index':>12} {'indexed':>12} {'speedup':>9}")
+    for name, _ in to_time:
+        before, after = not_indexed[name], indexed[name]
+        print(f"{name:<32} {before * 1000:>9.1f} ms {after * 1000:>9.1f} ms {before / after:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
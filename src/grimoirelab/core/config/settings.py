@@ -290,11 +290,56 @@ RQ_QUEUES = {
 
 GRIMOIRELAB_EVENTS_STREAM_NAME = os.environ.get('GRIMOIRELAB_EVENTS_STREAM_NAME',
                                                 'events')
+# Number of partitions of the events stream. Events of a task are always
+# published in the same partition, so their order is kept. Archivists
+# are spread across partitions; there should be at least one archivist
+# worker per partition. After changing it, run 'grimoirelab admin streams
+# rebalance' to reassign the archivists.
+GRIMOIRELAB_EVENTS_STREAM_PARTITIONS = int(os.environ.get('GRIMOIRELAB_EVENTS_STREAM_PARTITIONS', 1))
 # Maximum events in Redis stream before dropping. Consumers must process events
 # faster than production to avoid loss. Default max size is 1M events (~2.5GB Git events).
 # Adjust for memory constraints.
 GRIMOIRELAB_EVENTS_STREAM_MAX_LENGTH = int(os.environ.get('GRIMOIRELAB_EVENTS_STREAM_MAX_LENGTH',
                                                           1 * 10 ** 6))
+# Events are published in batches to reduce the round trips to Redis.
+# A batch is sent when it reaches the maximum size or when its oldest
+# event has been waiting longer than the flush interval (in seconds).
+GRIMOIRELAB_EVENTS_STREAM_BATCH_SIZE = int(os.environ.get('GRIMOIRELAB_EVENTS_STREAM_BATCH_SIZE', 100))
+GRIMOIRELAB_EVENTS_STREAM_FLUSH_INTERVAL = float(os.environ.get('GRIMOIRELAB_EVENTS_STREAM_FLUSH_INTERVAL', 1))
+
+# Flow control. When the events not yet processed by the archivists
+# reach the high water mark, eventizers pause the publication until
+# they drop to the low water mark (80% of the high mark by default).
+# The high water mark must be lower than the maximum length of the
+# stream, so events are not dropped. Set it to 0 to disable it.
+# Eventizers wait indefinitely unless a maximum time is set.
+GRIMOIRELAB_EVENTS_STREAM_HIGH_WATER_MARK = int(os.environ.get('GRIMOIRELAB_EVENTS_STREAM_HIGH_WATER_MARK', 0))
+GRIMOIRELAB_EVENTS_STREAM_LOW_WATER_MARK = os.environ.get('GRIMOIRELAB_EVENTS_STREAM_LOW_WATER_MARK', None)
+if GRIMOIRELAB_EVENTS_STREAM_LOW_WATER_MARK is not None:
+    GRIMOIRELAB_EVENTS_STREAM_LOW_WATER_MARK = int(GRIMOIRELAB_EVENTS_STREAM_LOW_WATER_MARK)
+GRIMOIRELAB_EVENTS_STREAM_THROTTLE_INTERVAL = float(os.environ.get('GRIMOIRELAB_EVENTS_STREAM_THROTTLE_INTERVAL', 1))
+GRIMOIRELAB_EVENTS_STREAM_MAX_THROTTLE_TIME = os.environ.get('GRIMOIRELAB_EVENTS_STREAM_MAX_THROTTLE_TIME', None)
+if GRIMOIRELAB_EVENTS_STREAM_MAX_THROTTLE_TIME is not None:
+    GRIMOIRELAB_EVENTS_STREAM_MAX_THROTTLE_TIME = float(GRIMOIRELAB_EVENTS_STREAM_MAX_THROTTLE_TIME)
+
+# Events can be compressed in the stream to reduce the memory used
+# by Redis. Possible values are 'none', 'zlib' or 'zstd' (requires
+# 'zstandard' package). Events are flagged with the algorithm used,
+# so consumers can read compressed and uncompressed events.
+# Small events, like git events, compress much better when a shared
+# dictionary is used. Producers and consumers must be configured
+# with the same dictionary file.
+GRIMOIRELAB_EVENTS_STREAM_COMPRESSION = os.environ.get('GRIMOIRELAB_EVENTS_STREAM_COMPRESSION', 'none')
+GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_LEVEL = os.environ.get('GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_LEVEL', None)
+if GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_LEVEL is not None:
+    GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_LEVEL = int(GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_LEVEL)
+GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_DICT = os.environ.get('GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_DICT', None)
+
+# JSON codec used to encode and decode the events. Possible values
+# are 'orjson', 'json' (standard library) or 'auto', that selects
+# 'orjson' when the package is installed. All of them generate
+# the same documents.
+GRIMOIRELAB_JSON_CODEC = os.environ.get('GRIMOIRELAB_JSON_CODEC', 'auto')
 
 RQ = {
     'JOB_CLASS': 'grimoirelab.core.scheduler.jobs.GrimoireLabJob',
@@ -309,6 +354,22 @@ GRIMOIRELAB_JOB_INTERVAL = int(os.environ.get('GRIMOIRELAB_JOB_INTERVAL', 60 * 6
 GRIMOIRELAB_JOB_MAX_RETRIES = int(os.environ.get('GRIMOIRELAB_JOB_MAX_RETRIES', 5))
 GRIMOIRELAB_JOB_RESULT_TTL = int(os.environ.get('GRIMOIRELAB_JOB_RESULT_TTL', 300))
 GRIMOIRELAB_JOB_TIMEOUT = int(os.environ.get('GRIMOIRELAB_JOB_TIMEOUT', -1))
+# Running jobs save their progress (items processed, last offset and
+# rate) at most every these seconds, so it can be followed while they
+# run and failed jobs can be recovered from a recent point.
+GRIMOIRELAB_JOB_PROGRESS_INTERVAL = float(os.environ.get('GRIMOIRELAB_JOB_PROGRESS_INTERVAL', 5))
+
+# The reconciler checks the scheduled tasks every these seconds,
+# rescheduling the jobs lost in Redis. The rate limit sets the
+# maximum number of tasks checked per second (0 means no limit).
+GRIMOIRELAB_RECONCILER_INTERVAL = float(os.environ.get('GRIMOIRELAB_RECONCILER_INTERVAL', 60))
+GRIMOIRELAB_RECONCILER_RATE_LIMIT = float(os.environ.get('GRIMOIRELAB_RECONCILER_RATE_LIMIT', 1000))
+
+# Old jobs are removed when they are pruned. The last jobs of each
+# task are kept, and failed jobs are kept for these days too, so
+# errors can be checked.
+GRIMOIRELAB_JOB_RETENTION_COUNT = int(os.environ.get('GRIMOIRELAB_JOB_RETENTION_COUNT', 10))
+GRIMOIRELAB_JOB_RETENTION_FAILED_DAYS = int(os.environ.get('GRIMOIRELAB_JOB_RETENTION_FAILED_DAYS', 30))
 
 GRIMOIRELAB_GIT_STORAGE_PATH = os.environ.get('GRIMOIRELAB_GIT_PATH', '~/.perceval')
 
@@ -322,4 +383,10 @@ GRIMOIRELAB_ARCHIVIST = {
     'STORAGE_INDEX': os.environ.get('GRIMOIRELAB_ARCHIVIST_STORAGE_INDEX', 'events'),
     'STORAGE_VERIFY_CERT': os.environ.get('GRIMOIRELAB_ARCHIVIST_STORAGE_VERIFY_CERT', 'False').lower() in ('true', '1'),
     'EVENTS_PER_JOB': int(os.environ.get('GRIMOIRELAB_ARCHIVIST_EVENTS_PER_JOB', 10000)),
+    'READ_COUNT': int(os.environ.get('GRIMOIRELAB_ARCHIVIST_READ_COUNT', 100)),
+    'MAX_ITEMS_BULK': int(os.environ.get('GRIMOIRELAB_ARCHIVIST_MAX_ITEMS_BULK', 100)),
+    'MAX_BYTES_BULK': int(os.environ.get('GRIMOIRELAB_ARCHIVIST_MAX_BYTES_BULK', 10 * 1024 * 1024)),
+    # Number of bulk requests each archivist keeps in flight while
+    # it reads new events. Set it to 1 to store events synchronously.
+    'MAX_IN_FLIGHT': int(os.environ.get('GRIMOIRELAB_ARCHIVIST_MAX_IN_FLIGHT', 1)),
 }
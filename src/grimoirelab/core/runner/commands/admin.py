@@ -24,6 +24,8 @@ import click
 import django.core
 import django_rq
 
+from django.conf import settings
+
 if typing.TYPE_CHECKING:
     from click import Context
 
@@ -161,3 +163,208 @@ def remove_jobs():
         for jid in registry.get_job_ids():
             registry.remove(jid)
         click.echo(f"{key} registry removed.")
+
+
+@admin.group()
+@click.pass_context
+def tasks(ctx: Context):
+    """Cancel, pause, or resume sets of GrimoireLab tasks."""
+
+    pass
+
+
+def _task_selector_options(func):
+    """Add the options to select tasks to a command."""
+
+    options = [
+        click.option('--uuid', 'uuids',
+                     multiple=True,
+                     help="Uuid of a task. It can be set multiple times."),
+        click.option('--datasource-type',
+                     help="Data source type of the tasks (e.g. 'git')."),
+        click.option('--datasource-category',
+                     help="Data source category of the tasks (e.g. 'commit')."),
+        click.option('--status',
+                     multiple=True,
+                     help="Status of the tasks (e.g. 'failed'). It can be set multiple times.")
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def _task_selector(uuids, datasource_type, datasource_category, status):
+    """Return the selector of tasks from the options given."""
+
+    from grimoirelab.core.scheduler.models import SchedulerStatus
+
+    labels = {choice.name.lower(): choice for choice in SchedulerStatus}
+
+    unknown = [label for label in status if label.lower() not in labels]
+    if unknown:
+        raise click.BadParameter(f"unknown status '{unknown[0]}'; "
+                                 f"valid values are: {', '.join(labels)}",
+                                 param_hint="'--status'")
+
+    selector = {
+        'uuids': list(uuids) or None,
+        'datasource_type': datasource_type,
+        'datasource_category': datasource_category,
+        'status': [labels[label.lower()] for label in status] or None
+    }
+    if not any(value is not None for value in selector.values()):
+        raise click.UsageError("At least one option to select the tasks is required.")
+
+    return selector
+
+
+@tasks.command(name='cancel')
+@_task_selector_options
+def cancel_tasks(**options):
+    """Cancel the selected tasks and delete their jobs."""
+
+    from grimoirelab.core.scheduler.scheduler import cancel_tasks
+
+    ntasks = cancel_tasks(**_task_selector(**options))
+    click.echo(f"{ntasks} tasks canceled.")
+
+
+@tasks.command(name='pause')
+@_task_selector_options
+def pause_tasks(**options):
+    """Pause the selected tasks.
+
+    Tasks won't run again until they are resumed. Jobs that
+    are running finish.
+    """
+    from grimoirelab.core.scheduler.scheduler import pause_tasks
+
+    ntasks = pause_tasks(**_task_selector(**options))
+    click.echo(f"{ntasks} tasks paused.")
+
+
+@tasks.command(name='resume')
+@_task_selector_options
+def resume_tasks(**options):
+    """Resume the selected tasks that are paused."""
+
+    from grimoirelab.core.scheduler.scheduler import resume_tasks
+
+    ntasks = resume_tasks(**_task_selector(**options))
+    click.echo(f"{ntasks} tasks resumed.")
+
+
+@admin.group()
+@click.pass_context
+def jobs(ctx: Context):
+    """Manage the history of GrimoireLab jobs."""
+
+    pass
+
+
+@jobs.command()
+@click.option('--keep-jobs',
+              type=click.IntRange(min=1),
+              default=None,
+              help="Number of jobs kept for each task.")
+@click.option('--keep-failed-days',
+              type=click.IntRange(min=0),
+              default=None,
+              help="Days failed jobs are kept.")
+@click.option('--batch-size',
+              type=click.IntRange(min=1),
+              default=10000,
+              show_default=True,
+              help="Number of jobs checked on each transaction.")
+def prune(keep_jobs: int | None, keep_failed_days: int | None, batch_size: int):
+    """Remove the old jobs of the tasks.
+
+    The last jobs of each task, and the jobs that failed recently,
+    are kept; by default, the values set in GRIMOIRELAB_JOB_RETENTION_COUNT
+    and GRIMOIRELAB_JOB_RETENTION_FAILED_DAYS. Jobs are removed in
+    small transactions, so the command can run while GrimoireLab
+    is running; run it periodically to keep the jobs tables small.
+    """
+    from grimoirelab.core.scheduler.retention import prune_jobs
+
+    if keep_jobs is None:
+        keep_jobs = settings.GRIMOIRELAB_JOB_RETENTION_COUNT
+    if keep_failed_days is None:
+        keep_failed_days = settings.GRIMOIRELAB_JOB_RETENTION_FAILED_DAYS
+
+    pruned = prune_jobs(keep_jobs=keep_jobs,
+                        keep_failed_days=keep_failed_days,
+                        batch_size=batch_size)
+
+    click.echo(f"{pruned} jobs pruned.")
+
+
+@admin.group()
+@click.pass_context
+def streams(ctx: Context):
+    """Manage the GrimoireLab events streams."""
+
+    pass
+
+
+@streams.command()
+@click.option('--force',
+              is_flag=True,
+              default=False,
+              help="Rebalance even if there are events not archived.")
+def rebalance(force: bool):
+    """Reassign the archivists to the partitions of the events stream.
+
+    Run this command after changing the number of partitions set in
+    GRIMOIRELAB_EVENTS_STREAM_PARTITIONS. Archivists will be spread
+    evenly across the partitions.
+
+    Changing the number of partitions moves tasks to other partitions.
+    To keep the order of their events, all the partitions must be
+    drained before. The command refuses to rebalance when there are
+    events not archived, unless '--force' is set. Events of partitions
+    that are removed won't be archived.
+    """
+    from grimoirelab.core.scheduler.streams import (
+        stream_backlog,
+        stream_partition_name
+    )
+    from grimoirelab.core.scheduler.tasks.models import StorageTask
+
+    connection = django_rq.get_connection(settings.GRIMOIRELAB_Q_ARCHIVIST_JOBS)
+    stream_name = settings.GRIMOIRELAB_EVENTS_STREAM_NAME
+    partitions = settings.GRIMOIRELAB_EVENTS_STREAM_PARTITIONS
+
+    tasks = list(StorageTask.objects.filter(burst=False).order_by('id'))
+
+    current = {task.partition for task in tasks} | set(range(partitions))
+    backlogs = {
+        partition: stream_backlog(connection, stream_partition_name(stream_name, partition))
+        for partition in sorted(current)
+    }
+    pending = {partition: backlog for partition, backlog in backlogs.items() if backlog > 0}
+
+    if pending and not force:
+        msg = ", ".join(f"{stream_partition_name(stream_name, p)} ({n})" for p, n in pending.items())
+        raise click.ClickException(f"There are events not archived in: {msg}. "
+                                   "Wait until archivists process them or use '--force'.")
+
+    orphans = [p for p in pending if p >= partitions]
+    for partition in orphans:
+        click.secho(f"Warning: {pending[partition]} events in "
+                    f"'{stream_partition_name(stream_name, partition)}' won't be archived.",
+                    fg='yellow')
+
+    moved = 0
+    for i, task in enumerate(tasks):
+        partition = i % partitions
+        if task.partition != partition:
+            task.task_args['partition'] = partition
+            task.save(update_fields=['task_args'])
+            moved += 1
+
+    click.echo(f"{len(tasks)} archivists assigned to {partitions} partitions; {moved} moved.")
+
+    if len(tasks) < partitions:
+        click.secho(f"Warning: {partitions - len(tasks)} partitions don't have archivists.",
+                    fg='yellow')
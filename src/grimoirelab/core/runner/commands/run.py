@@ -18,7 +18,9 @@
 
 from __future__ import annotations
 
+import collections
 import os
+import signal
 import typing
 
 import click
@@ -143,6 +145,57 @@ def archivists(workers: int):
     )
 
 
+@run.command()
+@click.option('--interval',
+              type=float,
+              default=None,
+              help="Seconds between sweeps. [default: GRIMOIRELAB_RECONCILER_INTERVAL]")
+@click.option('--rate-limit',
+              type=float,
+              default=None,
+              help="Maximum number of tasks checked per second; 0 for no limit. "
+                   "[default: GRIMOIRELAB_RECONCILER_RATE_LIMIT]")
+@click.option('--batch-size',
+              default=1000,
+              show_default=True,
+              help="Number of tasks checked on each page.")
+def reconciler(interval: float | None, rate_limit: float | None, batch_size: int):
+    """Start the tasks reconciler.
+
+    The reconciler checks periodically the scheduled tasks and
+    reschedules the jobs that were lost in Redis (e.g. after
+    Redis was restarted). Tasks are checked incrementally, in
+    pages, and the number of tasks checked per second is limited
+    to keep the load low.
+
+    The metrics of the reconciler, like the number of jobs
+    rescheduled, are available in the API at
+    '/scheduler/reconciler/metrics/'.
+    """
+    import django_rq
+
+    from grimoirelab.core.scheduler.reconciler import TaskReconciler
+
+    if interval is None:
+        interval = settings.GRIMOIRELAB_RECONCILER_INTERVAL
+    if rate_limit is None:
+        rate_limit = settings.GRIMOIRELAB_RECONCILER_RATE_LIMIT
+
+    task_reconciler = TaskReconciler(django_rq.get_connection(),
+                                     batch_size=batch_size,
+                                     rate_limit=rate_limit)
+
+    def _stop(signum, frame):
+        task_reconciler.stop()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    click.echo(f"Reconciler started; checking tasks every {interval} seconds.")
+    task_reconciler.run(interval)
+    click.echo("Reconciler stopped.")
+
+
 def create_background_tasks(clear_tasks: bool):
     """
     Create background tasks before starting the server.
@@ -150,7 +203,11 @@ def create_background_tasks(clear_tasks: bool):
     :return:
     """
     from grimoirelab.core.scheduler.scheduler import schedule_task
-    from grimoirelab.core.scheduler.tasks.models import StorageTask
+    from grimoirelab.core.scheduler.tasks.models import (
+        JobLogChunk,
+        StorageJob,
+        StorageTask
+    )
 
     workers = settings.GRIMOIRELAB_ARCHIVIST['WORKERS']
     storage_url = settings.GRIMOIRELAB_ARCHIVIST['STORAGE_URL']
@@ -158,8 +215,14 @@ def create_background_tasks(clear_tasks: bool):
     storage_type = settings.GRIMOIRELAB_ARCHIVIST['STORAGE_TYPE']
     verify_certs = settings.GRIMOIRELAB_ARCHIVIST['STORAGE_VERIFY_CERT']
     events_per_job = settings.GRIMOIRELAB_ARCHIVIST['EVENTS_PER_JOB']
+    read_count = settings.GRIMOIRELAB_ARCHIVIST['READ_COUNT']
+    max_items_bulk = settings.GRIMOIRELAB_ARCHIVIST['MAX_ITEMS_BULK']
+    max_bytes_bulk = settings.GRIMOIRELAB_ARCHIVIST['MAX_BYTES_BULK']
+    max_in_flight = settings.GRIMOIRELAB_ARCHIVIST['MAX_IN_FLIGHT']
+    partitions = settings.GRIMOIRELAB_EVENTS_STREAM_PARTITIONS
 
     if clear_tasks:
+        JobLogChunk.delete_logs(StorageJob.objects.values_list('uuid', flat=True))
         StorageTask.objects.all().delete()
         click.echo("Removing old background tasks.")
 
@@ -173,18 +236,36 @@ def create_background_tasks(clear_tasks: bool):
         'storage_db_name': storage_db_name,
         'storage_verify_certs': verify_certs,
         'redis_group': 'archivist',
-        'limit': events_per_job
+        'limit': events_per_job,
+        'read_count': read_count,
+        'max_items_bulk': max_items_bulk,
+        'max_bytes_bulk': max_bytes_bulk,
+        'max_in_flight': max_in_flight
     }
     if workers > current:
+        # Spread the new consumers across the partitions of
+        # the stream, starting with the ones with less consumers.
+        consumers = collections.Counter({partition: 0 for partition in range(partitions)})
+        for task in StorageTask.objects.filter(burst=False):
+            consumers[task.partition] += 1
+
         for _ in range(workers - current):
+            partition = min(range(partitions), key=lambda p: consumers[p])
+            consumers[partition] += 1
+
             schedule_task(
                 task_type=StorageTask.TASK_TYPE,
                 storage_type=storage_type,
-                task_args=task_args,
+                task_args={**task_args, 'partition': partition},
                 job_interval=1,
                 job_max_retries=10
             )
         click.echo(f"Created {workers} background tasks.")
+
+        if workers < partitions:
+            click.secho(f"Warning: {partitions - workers} partitions of the events stream "
+                        "don't have archivists. Increase the number of workers.", fg='yellow')
     elif workers < current:
-        tasks = StorageTask.objects.all()[workers:]
-        tasks.update(burst=True)
+        # Querysets can't be updated once they are sliced
+        extra = StorageTask.objects.filter(burst=False).order_by('pk').values_list('pk', flat=True)[workers:]
+        StorageTask.objects.filter(pk__in=list(extra)).update(burst=True)
@@ -16,8 +16,13 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 
+from __future__ import annotations
+
+import typing
+
 import django_rq
 
+from django.db.models import Prefetch
 from rest_framework import (
     generics,
     pagination,
@@ -29,7 +34,15 @@ from .models import (
     SchedulerStatus,
     get_registered_task_model
 )
-from .tasks.models import EventizerTask
+from .tasks.models import EventizerTask, JobLogChunk
+
+if typing.TYPE_CHECKING:
+    from typing import Any
+    from .models import Job
+
+
+# Number of jobs of each task returned in the list of tasks
+TASK_LIST_LAST_JOBS = 10
 
 
 class EventizerPaginator(pagination.PageNumberPagination):
@@ -62,8 +75,11 @@ class EventizerTaskListSerializer(serializers.ModelSerializer):
         ]
 
     def get_last_jobs(self, obj):
-        job_klass = get_registered_task_model('eventizer')[1]
-        jobs = job_klass.objects.filter(task=obj).order_by('-job_num')[:10]
+        # Jobs are prefetched for all the tasks of the page
+        jobs = getattr(obj, 'last_jobs', None)
+        if jobs is None:
+            job_klass = get_registered_task_model('eventizer')[1]
+            jobs = job_klass.objects.filter(task=obj).order_by('-job_num')[:TASK_LIST_LAST_JOBS]
         return EventizerJobSummarySerializer(jobs, many=True).data
 
 
@@ -120,27 +136,38 @@ class EventizerJobSerializer(serializers.ModelSerializer):
 
 
 class EventizerJobLogsSerializer(serializers.ModelSerializer):
-    logs = serializers.SerializerMethodField()
+    """Serialize the log entries of a job after a position.
 
+    The position is read from the context ('offset'). The
+    position of the next entry is returned in the field
+    'offset', so clients can request only the new entries.
+    """
     class Meta:
         model = get_registered_task_model('eventizer')[1]
         fields = [
-            'uuid', 'logs'
+            'uuid'
         ]
 
-    def get_logs(self, obj):
-        if obj.status == SchedulerStatus.RUNNING:
-            rq_job = django_rq.get_queue(obj.queue).fetch_job(obj.uuid)
-            if rq_job:
-                return rq_job.log
-        return obj.logs
+    def to_representation(self, obj):
+        data = super().to_representation(obj)
+        data['logs'], data['offset'] = read_job_log(obj, self.context.get('offset', None))
+        return data
 
 
 class EventizerTaskList(generics.ListAPIView):
-    queryset = EventizerTask.objects.all().order_by('-scheduled_at')
     serializer_class = EventizerTaskListSerializer
     pagination_class = EventizerPaginator
 
+    def get_queryset(self):
+        # The last jobs of all the tasks of the page are
+        # obtained with a single windowed query
+        job_klass = get_registered_task_model('eventizer')[1]
+        last_jobs = job_klass.objects.order_by('-job_num')[:TASK_LIST_LAST_JOBS]
+
+        return EventizerTask.objects.all().order_by('-scheduled_at').prefetch_related(
+            Prefetch('jobs', queryset=last_jobs, to_attr='last_jobs')
+        )
+
 
 class EventizerTaskDetail(generics.RetrieveAPIView):
     queryset = EventizerTask.objects.all()
@@ -169,6 +196,13 @@ class EventizerJobDetail(generics.RetrieveAPIView):
 
 
 class EventizerJobLogs(generics.RetrieveAPIView):
+    """Return the log of a job.
+
+    By default, only the most recent entries are returned. Use
+    the parameter 'offset' to get the entries after a position,
+    like the one returned by the previous request, or 'full=true'
+    to get the full history, including the archived entries.
+    """
     lookup_field = 'uuid'
     serializer_class = EventizerJobLogsSerializer
     pagination_class = EventizerPaginator
@@ -176,3 +210,69 @@ class EventizerJobLogs(generics.RetrieveAPIView):
     def get_queryset(self):
         task_id = self.kwargs['task_id']
         return get_registered_task_model('eventizer')[1].objects.filter(task__uuid=task_id)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+
+        if self.request.query_params.get('full', '').lower() in ('true', '1'):
+            context['offset'] = 0
+        else:
+            context['offset'] = parse_log_offset(self.request.query_params.get('offset', None))
+
+        return context
+
+
+def parse_log_offset(value: str | None) -> int | None:
+    """Parse the position of a log given as a parameter.
+
+    :param value: value of the parameter
+
+    :returns: the position, or None when it's not set
+
+    :raises ValidationError: when the value is not a valid position
+    """
+    if value is None or value == '':
+        return None
+
+    try:
+        offset = int(value)
+    except ValueError:
+        offset = -1
+
+    if offset < 0:
+        raise serializers.ValidationError({'offset': "must be a non-negative integer"})
+
+    return offset
+
+
+def read_job_log(job: Job, offset: int | None = None) -> tuple[list[dict[str, Any]], int]:
+    """Read the log entries of a job after a position.
+
+    The log of running jobs is read from Redis; otherwise, it is
+    read from the database. Archived entries are only read when
+    the position is before the most recent entries.
+
+    :param job: job to read the log from
+    :param offset: position of the first entry to return; when
+        it's `None`, only the most recent entries are returned
+
+    :returns: a tuple with the entries and the position of the
+        next entry
+    """
+    if job.status == SchedulerStatus.RUNNING:
+        rq_job = django_rq.get_queue(job.queue).fetch_job(job.uuid)
+        if rq_job:
+            return rq_job.read_log(offset)
+
+    archived = JobLogChunk.count_entries(job.uuid)
+    start = archived if offset is None else offset
+
+    log = []
+    if start < archived:
+        log.extend(JobLogChunk.get_log(job.uuid, start, archived))
+        start = archived
+
+    entries = (job.logs or [])[start - archived:]
+    log.extend(entries)
+
+    return log, start + len(entries)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import annotations
+
+import json
+import re
+import typing
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if typing.TYPE_CHECKING:
+    from typing import Any
+
+
+DEFAULT_CODEC = 'auto'
+
+
+_django_encoder = DjangoJSONEncoder()
+
+_SURROGATES = re.compile('[\ud800-\udfff]')
+
+
+def _escape_surrogates(text: str) -> str:
+    """Escape lone surrogates found in a JSON document.
+
+    Surrogates can't be encoded in UTF-8 but they appear in strings
+    decoded with `surrogateescape` (e.g., commit messages that are
+    not valid UTF-8). They are escaped in the same way as the
+    standard library does when `ensure_ascii` is set.
+
+    :param text: JSON document
+
+    :returns: the document with the surrogates escaped
+    """
+    return _SURROGATES.sub(lambda m: '\\u{0:04x}'.format(ord(m.group())), text)
+
+
+def encode_default(obj: Any) -> Any:
+    """Convert objects not supported by JSON.
+
+    Objects are converted to the dictionary of their attributes.
+    When they don't have it, the conversion is the one done by
+    Django, that supports types like dates, decimals or UUIDs.
+
+    :param obj: object to convert
+
+    :returns: a JSON serializable version of the object
+
+    :raises TypeError: when the object cannot be converted
+    """
+    try:
+        return obj.__dict__
+    except AttributeError:
+        return _django_encoder.default(obj)
+
+
+class JSONCodec:
+    """Base class for JSON codecs.
+
+    Codecs encode objects to compact JSON documents in UTF-8
+    (no whitespace between elements and without escaping
+    non-ASCII characters). Types not supported by JSON are
+    converted with `encode_default`. Lone surrogates, that can't
+    be encoded in UTF-8, are escaped (e.g., `\\udcff`).
+
+    Every codec generates the same bytes for the same object,
+    so they can be exchanged without altering the data written
+    in the events stream or in the storage systems. The only
+    difference is the notation of floats with exponents (e.g.,
+    `1e16` against `1e+16`), which are decoded to the same value.
+    """
+    name = None
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode an object to JSON.
+
+        :param obj: object to encode
+
+        :returns: the JSON document encoded in UTF-8
+        """
+        raise NotImplementedError
+
+    def loads(self, data: bytes | str) -> Any:
+        """Decode a JSON document.
+
+        :param data: JSON document
+
+        :returns: the decoded object
+        """
+        raise NotImplementedError
+
+
+class StdlibJSONCodec(JSONCodec):
+    """JSON codec based on the standard library."""
+
+    name = 'json'
+
+    def __init__(self) -> None:
+        self._encoder = json.JSONEncoder(separators=(',', ':'),
+                                         ensure_ascii=False,
+                                         allow_nan=False,
+                                         default=encode_default)
+
+    def dumps(self, obj: Any) -> bytes:
+        text = self._encoder.encode(obj)
+        try:
+            return text.encode('utf-8')
+        except UnicodeEncodeError:
+            return _escape_surrogates(text).encode('utf-8')
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """JSON codec based on the orjson library.
+
+    Dates and dataclasses are passed to `encode_default`, instead
+    of being encoded by orjson, so the output is the same as
+    the one generated by the standard library.
+
+    orjson doesn't support lone surrogates, so the documents
+    that include them are handled by the standard library codec.
+    """
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        if not orjson:
+            raise ValueError("JSON codec 'orjson' is not available; install 'orjson' package")
+
+        self._options = (orjson.OPT_NON_STR_KEYS |
+                         orjson.OPT_PASSTHROUGH_DATETIME |
+                         orjson.OPT_PASSTHROUGH_DATACLASS)
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, default=encode_default, option=self._options)
+        except orjson.JSONEncodeError:
+            return get_codec(StdlibJSONCodec.name).dumps(obj)
+
+    def loads(self, data: bytes | str) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return get_codec(StdlibJSONCodec.name).loads(data)
+
+
+CODECS = {
+    StdlibJSONCodec.name: StdlibJSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+}
+
+_codecs = {}
+
+
+def get_codec(name: str | None = DEFAULT_CODEC) -> JSONCodec:
+    """Get a JSON codec by its name.
+
+    When the name is 'auto' or None, the codec based on orjson
+    is returned if the package is installed; otherwise, it
+    returns the one based on the standard library. Codecs
+    are created once and shared.
+
+    :param name: name of the codec ('auto', 'orjson' or 'json')
+
+    :returns: the JSON codec
+
+    :raises ValueError: when the codec is not supported or
+        it is not available
+    """
+    if name in (None, DEFAULT_CODEC):
+        name = OrjsonCodec.name if orjson else StdlibJSONCodec.name
+
+    try:
+        return _codecs[name]
+    except KeyError:
+        pass
+
+    try:
+        codec_class = CODECS[name]
+    except KeyError:
+        raise ValueError(f"JSON codec '{name}' not supported")
+
+    codec = codec_class()
+    _codecs[name] = codec
+
+    return codec
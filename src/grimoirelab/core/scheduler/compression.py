@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import typing
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+if typing.TYPE_CHECKING:
+    from typing import Any
+
+
+NO_COMPRESSION = 'none'
+
+# Fields of the stream entries that flag how the payload is encoded
+ENCODING_FIELD = 'encoding'
+DICTIONARY_FIELD = 'dict'
+
+
+class PayloadCompressor:
+    """Base class for payload compressors.
+
+    Compressors reduce the size of the payload of the stream
+    entries. They can use a shared dictionary, that improves
+    the compression of small payloads like events. Producers
+    and consumers must use the same dictionary, so it is
+    identified by a hash of its contents.
+
+    :param level: compression level; when it's not set, the
+        default level of the algorithm is used
+    :param dictionary: contents of the shared dictionary
+    """
+    name = None
+
+    def __init__(self, level: int | None = None,
+                 dictionary: bytes | None = None) -> None:
+        self.level = level
+        self.dictionary = dictionary
+
+    @property
+    def dictionary_id(self) -> str | None:
+        """Return the identifier of the dictionary."""
+
+        return get_dictionary_id(self.dictionary) if self.dictionary else None
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a payload.
+
+        :param data: payload to compress
+
+        :returns: the compressed payload
+        """
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompress a payload.
+
+        :param data: compressed payload
+
+        :returns: the original payload
+        """
+        raise NotImplementedError
+
+
+class ZlibCompressor(PayloadCompressor):
+    """Payload compressor based on zlib."""
+
+    name = 'zlib'
+
+    def __init__(self, level: int | None = None,
+                 dictionary: bytes | None = None) -> None:
+        super().__init__(level, dictionary)
+
+        self._level = zlib.Z_DEFAULT_COMPRESSION if level is None else level
+        self._zdict = {'zdict': dictionary} if dictionary else {}
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(self._level, **self._zdict)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        decompressor = zlib.decompressobj(**self._zdict)
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+class ZstdCompressor(PayloadCompressor):
+    """Payload compressor based on Zstandard.
+
+    Compressor objects of this class are not thread-safe.
+    """
+    name = 'zstd'
+
+    def __init__(self, level: int | None = None,
+                 dictionary: bytes | None = None) -> None:
+        if not zstandard:
+            raise ValueError("compression 'zstd' is not available; install 'zstandard' package")
+
+        super().__init__(level, dictionary)
+
+        params = {}
+        if dictionary:
+            params['dict_data'] = zstandard.ZstdCompressionDict(dictionary)
+
+        level = 3 if level is None else level
+
+        self._compressor = zstandard.ZstdCompressor(level=level, **params)
+        self._decompressor = zstandard.ZstdDecompressor(**params)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+COMPRESSORS = {
+    ZlibCompressor.name: ZlibCompressor,
+    ZstdCompressor.name: ZstdCompressor,
+}
+
+
+def get_dictionary_id(dictionary: bytes) -> str:
+    """Return the identifier of a compression dictionary.
+
+    :param dictionary: contents of the dictionary
+    """
+    return hashlib.sha256(dictionary).hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=None)
+def load_dictionary(path: str) -> bytes:
+    """Read a compression dictionary from a file.
+
+    :param path: path to the file of the dictionary
+
+    :returns: the contents of the dictionary
+    """
+    with open(path, 'rb') as fd:
+        return fd.read()
+
+
+def get_compressor(name: str | None,
+                   level: int | None = None,
+                   dictionary_path: str | None = None) -> PayloadCompressor | None:
+    """Get a payload compressor by its name.
+
+    :param name: name of the compressor ('zlib', 'zstd'); when it
+        is 'none' or None, no compressor is returned
+    :param level: compression level
+    :param dictionary_path: path to the file of the shared dictionary
+
+    :returns: the payload compressor or None
+
+    :raises ValueError: when the compressor is not supported or
+        it is not available
+    """
+    if name in (None, NO_COMPRESSION):
+        return None
+
+    try:
+        compressor_class = COMPRESSORS[name]
+    except KeyError:
+        raise ValueError(f"compression '{name}' not supported")
+
+    dictionary = load_dictionary(dictionary_path) if dictionary_path else None
+
+    return compressor_class(level=level, dictionary=dictionary)
+
+
+def encode_payload(data: bytes,
+                   compressor: PayloadCompressor | None = None) -> dict[str, Any]:
+    """Encode the payload of a stream entry.
+
+    The payload is returned in the field 'data'. When it is
+    compressed, the name of the algorithm is set in the field
+    'encoding' and the identifier of the dictionary, if any, in
+    the field 'dict'. Payloads that don't get smaller are not
+    compressed.
+
+    :param data: payload to encode
+    :param compressor: compressor used to reduce the payload
+
+    :returns: the fields of the stream entry with the payload
+    """
+    if compressor:
+        compressed = compressor.compress(data)
+
+        if len(compressed) < len(data):
+            fields = {
+                'data': compressed,
+                ENCODING_FIELD: compressor.name
+            }
+            if compressor.dictionary:
+                fields[DICTIONARY_FIELD] = compressor.dictionary_id
+            return fields
+
+    return {'data': data}
+
+
+class PayloadDecoder:
+    """Decode the payload of stream entries.
+
+    Entries can be compressed with any of the supported
+    algorithms, or not compressed at all, so consumers can read
+    entries published by producers with different settings.
+    Entries compressed with a dictionary can only be decoded
+    when the decoder was configured with that dictionary.
+
+    :param dictionary_path: path to the file of the shared dictionary
+    """
+    def __init__(self, dictionary_path: str | None = None) -> None:
+        self.dictionary = load_dictionary(dictionary_path) if dictionary_path else None
+        self._compressors = {}
+
+    def _get_compressor(self, name: str, dictionary_id: str | None) -> PayloadCompressor:
+        key = (name, dictionary_id)
+
+        try:
+            return self._compressors[key]
+        except KeyError:
+            pass
+
+        if name not in COMPRESSORS:
+            raise ValueError(f"compression '{name}' not supported")
+
+        if dictionary_id is None:
+            dictionary = None
+        elif self.dictionary and get_dictionary_id(self.dictionary) == dictionary_id:
+            dictionary = self.dictionary
+        else:
+            raise ValueError(f"compression dictionary '{dictionary_id}' not found")
+
+        compressor = COMPRESSORS[name](dictionary=dictionary)
+        self._compressors[key] = compressor
+
+        return compressor
+
+    def decode(self, fields: dict[bytes, bytes]) -> bytes:
+        """Decode the payload of a stream entry.
+
+        :param fields: fields of the stream entry
+
+        :returns: the original payload
+
+        :raises ValueError: when the payload cannot be decoded with
+            the available algorithms or dictionaries
+        """
+        data = fields[b'data']
+        encoding = fields.get(ENCODING_FIELD.encode('utf-8'), None)
+
+        if encoding is None:
+            return data
+
+        dictionary_id = fields.get(DICTIONARY_FIELD.encode('utf-8'), None)
+        if dictionary_id is not None:
+            dictionary_id = dictionary_id.decode('utf-8')
+
+        compressor = self._get_compressor(encoding.decode('utf-8'), dictionary_id)
+
+        return compressor.decompress(data)
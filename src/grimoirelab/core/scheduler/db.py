@@ -18,17 +18,38 @@
 
 from __future__ import annotations
 
+import collections
 import typing
 
-from .models import SchedulerStatus, get_all_registered_task_models
+from django.core.exceptions import FieldDoesNotExist
+
+from grimoirelab_toolkit.datetime import datetime_utcnow
+
+from .models import (
+    SchedulerStatus,
+    get_all_registered_task_models,
+    get_all_registered_task_names,
+    get_registered_task_model,
+    get_uuid_task_type
+)
 from .errors import NotFoundError
 
 
 if typing.TYPE_CHECKING:
-    from typing import Iterator
+    from typing import Any, Iterator
+    import rq.job
+    from django.db.models import QuerySet
     from .models import Task, Job
 
 
+# Types of the tasks and jobs found which uuid doesn't include
+# the type (i.e. created by older versions), so they are only
+# searched in all the models once per process.
+UUID_TYPES_CACHE_SIZE = 4096
+
+_uuid_types_cache: collections.OrderedDict[str, str] = collections.OrderedDict()
+
+
 def find_tasks_by_status(statuses: list[SchedulerStatus]) -> Iterator[Task]:
     """Find tasks by their status.
 
@@ -40,12 +61,55 @@ def find_tasks_by_status(statuses: list[SchedulerStatus]) -> Iterator[Task]:
         yield from task_class.objects.filter(status__in=statuses).iterator()
 
 
+def filter_tasks(
+    uuids: list[str] | None = None,
+    datasource_type: str | None = None,
+    datasource_category: str | None = None,
+    status: list[SchedulerStatus] | None = None
+) -> Iterator[tuple[type[Task], type[Job], QuerySet]]:
+    """Select tasks of any type by some of their fields.
+
+    Tasks must match all the selectors given. Types of task that
+    don't have a field used as selector (e.g. storage tasks don't
+    have a data source) don't match.
+
+    :param uuids: list of uuids of the tasks.
+    :param datasource_type: type of data source of the tasks.
+    :param datasource_category: category of data source of the tasks.
+    :param status: list of status of the tasks.
+
+    :returns: iterator of (task class, job class, queryset) tuples,
+        one for each type of task that can match.
+
+    :raises ValueError: when no selector is given.
+    """
+    selectors = {
+        'uuid__in': uuids,
+        'datasource_type': datasource_type,
+        'datasource_category': datasource_category,
+        'status__in': status
+    }
+    selectors = {key: value for key, value in selectors.items() if value is not None}
+
+    if not selectors:
+        raise ValueError("at least one selector is required")
+
+    for task_class, job_class in get_all_registered_task_models():
+        try:
+            for lookup in selectors:
+                task_class._meta.get_field(lookup.split('__')[0])
+        except FieldDoesNotExist:
+            continue
+        yield task_class, job_class, task_class.objects.filter(**selectors)
+
+
 def find_task(task_uuid: str) -> Task:
     """Find a task by its uuid.
 
-    Due to the way the tasks are defined with Django,
-    we need to iterate through all the task models to find
-    the task.
+    The model of the task is obtained from the type encoded in its
+    uuid, so the task is found with a single query. Tasks created
+    with older versions don't include the type, so every task model
+    is checked until the task is found.
 
     :param task_uuid: the task uuid to find.
 
@@ -53,12 +117,14 @@ def find_task(task_uuid: str) -> Task:
     .
     :raises NotFoundError: when the task is not found.
     """
-    for task_class, _ in get_all_registered_task_models():
+    for task_type in _candidate_task_types(task_uuid):
+        task_class, _ = get_registered_task_model(task_type)
         try:
             task = task_class.objects.get(uuid=task_uuid)
         except task_class.DoesNotExist:
             continue
         else:
+            _cache_task_type(task_uuid, task_type)
             return task
     raise NotFoundError(element=task_uuid)
 
@@ -66,9 +132,10 @@ def find_task(task_uuid: str) -> Task:
 def find_job(job_uuid: str) -> Job:
     """Find a job by its uuid.
 
-    Due to the way the jobs are defined with Django,
-    we need to iterate through all the job models to find
-    the job.
+    The model of the job is obtained from the type encoded in its
+    uuid, so the job, and its task, are found with a single query.
+    Jobs created with older versions don't include the type, so
+    every job model is checked until the job is found.
 
     :param job_uuid: the job uuid to find.
 
@@ -76,11 +143,110 @@ def find_job(job_uuid: str) -> Job:
 
     :raises NotFoundError: if the job is not found.
     """
-    for _, job_class in get_all_registered_task_models():
+    for task_type in _candidate_task_types(job_uuid):
+        _, job_class = get_registered_task_model(task_type)
         try:
-            job = job_class.objects.get(uuid=job_uuid)
+            job = job_class.objects.select_related('task').get(uuid=job_uuid)
         except job_class.DoesNotExist:
             continue
         else:
+            _cache_task_type(job_uuid, task_type)
             return job
     raise NotFoundError(element=job_uuid)
+
+
+def find_job_from_meta(job: rq.job.Job) -> Job:
+    """Find the job of a RQ job.
+
+    The type of task and the primary key of the job are read
+    from the metadata of the RQ job, so the job and its task are
+    loaded with a single query. When they aren't available (e.g.
+    jobs enqueued by older versions), the job is searched by its
+    uuid.
+
+    :param job: the RQ job.
+
+    :returns: the job found.
+
+    :raises NotFoundError: if the job is not found.
+    """
+    task_type = job.meta.get('task_type', None)
+    job_pk = job.meta.get('job_pk', None)
+
+    if task_type not in get_all_registered_task_names() or job_pk is None:
+        return find_job(job.id)
+
+    _, job_class = get_registered_task_model(task_type)
+    try:
+        return job_class.objects.select_related('task').get(pk=job_pk, uuid=job.id)
+    except job_class.DoesNotExist:
+        raise NotFoundError(element=job.id)
+
+
+def update_status(
+    model: type[Task] | type[Job],
+    pk: int,
+    status: SchedulerStatus,
+    expected: list[SchedulerStatus] | None = None,
+    **fields: Any
+) -> bool:
+    """Update the status of a task or a job.
+
+    The status, the modification date and the extra fields given
+    are written with a single UPDATE. When `expected` is set, the
+    row is only updated if its current status is one of them, so
+    concurrent transitions don't overwrite each other.
+
+    :param model: task or job model.
+    :param pk: primary key of the task or the job.
+    :param status: new status.
+    :param expected: list of status the row must have to be updated.
+    :param fields: other fields to update.
+
+    :returns: whether the row was updated.
+    """
+    rows = model.objects.filter(pk=pk)
+
+    if expected is not None:
+        rows = rows.filter(status__in=expected)
+
+    updated = rows.update(status=status,
+                          last_modified=datetime_utcnow(),
+                          **fields)
+    return updated == 1
+
+
+def _candidate_task_types(uuid: str) -> list[str]:
+    """Return the types of task where a uuid can be found.
+
+    When the type can't be obtained from the uuid itself,
+    all the registered types are returned, starting with the
+    one in the cache.
+    """
+    registered = get_all_registered_task_names()
+
+    task_type = get_uuid_task_type(uuid)
+    if task_type in registered:
+        return [task_type]
+
+    # Cached types are checked first; the rest of types
+    # are only checked if the element was deleted
+    task_type = _uuid_types_cache.get(uuid, None)
+    if task_type in registered:
+        _uuid_types_cache.move_to_end(uuid)
+        return [task_type] + [name for name in registered if name != task_type]
+
+    return registered
+
+
+def _cache_task_type(uuid: str, task_type: str) -> None:
+    """Store in the cache the type of task of a uuid without it."""
+
+    if get_uuid_task_type(uuid):
+        return
+
+    _uuid_types_cache[uuid] = task_type
+    _uuid_types_cache.move_to_end(uuid)
+
+    if len(_uuid_types_cache) > UUID_TYPES_CACHE_SIZE:
+        _uuid_types_cache.popitem(last=False)
@@ -19,16 +19,24 @@
 from __future__ import annotations
 
 import logging
+import time
 import typing
 
+import redis
 import rq.job
+from rq.defaults import DEFAULT_FAILURE_TTL
+
+from .codecs import get_codec
 
 if typing.TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Callable
     from logging import LogRecord
     from rq.types import FunctionReferenceType
 
 
+PROGRESS_INTERVAL = 5  # seconds
+
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +48,20 @@ class GrimoireLabJob(rq.job.Job):
     logging and progress handling. The log entries generated
     by the job can be accessed through the property `log`.
 
+    Log entries are stored in a Redis list, next to the job hash.
+    While the job is running, entries are buffered and written in
+    chunks of `LOG_FLUSH_SIZE` entries or every `LOG_FLUSH_INTERVAL`
+    seconds, so writing a log entry doesn't rewrite the whole log.
+    The buffer is flushed when the job finishes or fails.
+
+    Only the most recent `LOG_MAX_ENTRIES` entries are kept in Redis,
+    so the memory used by a job doesn't grow with its log. When the
+    list has `LOG_ARCHIVE_SIZE` entries more than that, the oldest
+    ones are compressed and archived in the database. The property
+    `log` only returns the recent entries; the archived ones are
+    available with `archived_log`. Set `LOG_MAX_ENTRIES` to `None`
+    to keep all the entries in Redis.
+
     To create an instance of this class, you must use the
     classmethod `create`. This method ensures that all the elements
     needed to run a job are properly set up.
@@ -48,11 +70,18 @@ class GrimoireLabJob(rq.job.Job):
     # Default packages to log
     PACKAGES_TO_LOG = [__name__, 'chronicler', 'archivist', 'perceval', 'rq']
 
+    # Log buffering and retention
+    LOG_FLUSH_SIZE = 50
+    LOG_FLUSH_INTERVAL = 1  # seconds
+    LOG_MAX_ENTRIES = 1000
+    LOG_ARCHIVE_SIZE = 500
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self._loggers = self.PACKAGES_TO_LOG
-        self.meta['log'] = []
+        self._log_sink = None
         self.meta['progress'] = None
+        self.meta['log_archived'] = 0
 
     @classmethod
     def create(cls, func: FunctionReferenceType,
@@ -68,7 +97,11 @@ class GrimoireLabJob(rq.job.Job):
         # Make sure meta parameters are initialized.
         # If not given, they will be overridden on the initialization
         # of the Job class parent.
-        kwargs['meta'] = {'log': [], 'progress': None}
+        kwargs['meta'] = {
+            'progress': None,
+            'log_archived': 0,
+            **(kwargs.get('meta', None) or {})
+        }
         job = super().create(func, *args, **kwargs)
         job._loggers = loggers if loggers else job.PACKAGES_TO_LOG
 
@@ -87,21 +120,138 @@ class GrimoireLabJob(rq.job.Job):
         self.meta['progress'] = value
         self.save_meta()
 
+    @property
+    def log_key(self) -> bytes:
+        """Returns the key of the Redis list where logs are stored."""
+
+        return self.key + b':log'
+
     @property
     def log(self) -> list[dict[str, Any]] | None:
-        """Returns the log of the job."""
+        """Returns the log of the job.
+
+        It includes the entries that are still in the buffer
+        when it's called from the process that runs the job.
+        Entries stored in the job metadata by older versions
+        are also returned.
+        """
+        codec = get_codec()
+
+        log = list(self.meta.get('log', []))
+        log.extend(codec.loads(entry) for entry in self.connection.lrange(self.log_key, 0, -1))
+
+        if self._log_sink:
+            log.extend(self._log_sink.buffer)
+
+        return log
+
+    @property
+    def log_archived(self) -> int:
+        """Returns the number of log entries archived."""
+
+        return self.meta.get('log_archived', 0)
+
+    @property
+    def archived_log(self) -> list[dict[str, Any]]:
+        """Returns the log entries archived in the database."""
+
+        from .tasks.models import JobLogChunk  # avoid circular imports
+
+        return JobLogChunk.get_log(self.id)
+
+    def read_log(self, offset: int | None = None) -> tuple[list[dict[str, Any]], int]:
+        """Returns the log entries after a position.
 
-        return self.meta.get('log', [])
+        Positions count every entry written by the job, archived
+        or not, so the log can be followed passing the position
+        returned by the previous call. Only the entries after that
+        position are read. Entries stored in the job metadata by
+        older versions are not returned.
+
+        :param offset: position of the first entry to return; when
+            it's `None`, the entries that weren't archived are returned
+
+        :returns: a tuple with the entries and the position of the
+            next entry
+        """
+        from .tasks.models import JobLogChunk  # avoid circular imports
+
+        with self.connection.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self.key)
+                    meta = pipe.hget(self.key, 'meta')
+                    archived = self.serializer.loads(meta).get('log_archived', 0) if meta else 0
+                    start = archived if offset is None else offset
+                    pipe.multi()
+                    pipe.lrange(self.log_key, max(start - archived, 0), -1)
+                    entries = pipe.execute()[0]
+                    break
+                except redis.WatchError:
+                    continue
+
+        log = []
+        if start < archived:
+            log.extend(JobLogChunk.get_log(self.id, start, archived))
+            start = archived
+
+        codec = get_codec()
+        log.extend(codec.loads(entry) for entry in entries)
+
+        return log, start + len(entries)
 
     def add_log(self, log: dict[str, Any]) -> None:
-        """Add a log entry."""
+        """Add a log entry.
 
-        self.meta['log'].append(log)
-        self.save_meta()
+        While the job is running, the entry is buffered. Otherwise,
+        it is written right away.
+        """
+        if self._log_sink:
+            self._log_sink.add(log)
+        else:
+            self.connection.rpush(self.log_key, get_codec().dumps(log))
+
+    def delete(self, pipeline=None, *args, **kwargs) -> None:
+        """Delete the job and its log from Redis."""
+
+        connection = pipeline if pipeline is not None else self.connection
+        connection.delete(self.log_key)
+
+        super().delete(pipeline, *args, **kwargs)
+
+    def cleanup(self, ttl: int | None = None, pipeline=None, *args, **kwargs) -> None:
+        """Prepare the job and its log for eventual deletion.
+
+        The log expires along with the job, so it's kept the time
+        set for the result (`result_ttl`) or for the failure
+        (`failure_ttl`) of the job.
+        """
+        super().cleanup(ttl, pipeline, *args, **kwargs)
+
+        # When the TTL is 0, the job and its log were deleted
+        if not ttl:
+            return
+
+        connection = pipeline if pipeline is not None else self.connection
+        if ttl > 0:
+            connection.expire(self.log_key, ttl)
+        else:
+            connection.persist(self.log_key)
 
     def _add_log_handler(self):
         """Add the log handler to the job."""
 
+        # While the job runs, the log is kept as long as the job
+        # would be if the worker died; once it finishes, the log
+        # gets the TTL of the job in `cleanup`.
+        failure_ttl = self.failure_ttl if self.failure_ttl is not None else DEFAULT_FAILURE_TTL
+
+        self._log_sink = JobLogSink(self,
+                                    flush_size=self.LOG_FLUSH_SIZE,
+                                    flush_interval=self.LOG_FLUSH_INTERVAL,
+                                    max_entries=self.LOG_MAX_ENTRIES,
+                                    archive_size=self.LOG_ARCHIVE_SIZE,
+                                    ttl=failure_ttl if failure_ttl > 0 else None)
         self._job_logger = JobLogHandler(self)
 
         for logger_name in self._loggers:
@@ -116,6 +266,9 @@ class GrimoireLabJob(rq.job.Job):
             logger_job = logging.getLogger(logger_name)
             logger_job.removeHandler(self._job_logger)
 
+        self._log_sink.close()
+        self._log_sink = None
+
     def _execute(self) -> Any:
         """Run the job."""
 
@@ -129,10 +282,213 @@ class GrimoireLabJob(rq.job.Job):
             self._remove_log_handler()
 
 
+class JobLogSink:
+    """Buffer the log entries of a job and write them in chunks.
+
+    Entries are appended to a Redis list. They are written when
+    the buffer has `flush_size` entries or, when a new entry is
+    added, the oldest one has been waiting more than `flush_interval`
+    seconds. The job metadata is saved on each flush too, so the
+    progress of the job is updated while it runs.
+
+    When `max_entries` is set, the list works as a ring buffer.
+    Once it has `archive_size` entries more than `max_entries`,
+    the oldest entries are archived in the database and removed
+    from the list, keeping only the last `max_entries`. Entries
+    are archived before they are removed, so they are never lost.
+
+    The list expires `ttl` seconds after the last write, so it's
+    removed even when the job never closes the sink. Entries that
+    can't be encoded to JSON are sanitized, converting the values
+    that fail to their representation.
+
+    Entries must be added from a single thread at a time; the log
+    handler of the job guarantees it.
+
+    :param job: job that generates the logs
+    :param flush_size: maximum number of entries to buffer
+    :param flush_interval: maximum time, in seconds, an entry
+        waits in the buffer
+    :param max_entries: maximum number of entries kept in Redis;
+        when it's `None`, entries are never archived
+    :param archive_size: minimum number of entries archived at once
+    :param ttl: time, in seconds, the list is kept in Redis after
+        the last write; `None` to keep it forever
+    """
+    def __init__(self, job: GrimoireLabJob,
+                 flush_size: int = GrimoireLabJob.LOG_FLUSH_SIZE,
+                 flush_interval: float = GrimoireLabJob.LOG_FLUSH_INTERVAL,
+                 max_entries: int | None = GrimoireLabJob.LOG_MAX_ENTRIES,
+                 archive_size: int = GrimoireLabJob.LOG_ARCHIVE_SIZE,
+                 ttl: int | None = None) -> None:
+        self.job = job
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.archive_size = archive_size
+        self.ttl = ttl
+        self.buffer = []
+        self._buffered_at = None
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Add an entry to the buffer, writing it when needed.
+
+        :param entry: log entry
+        """
+        if not self.buffer:
+            self._buffered_at = time.monotonic()
+
+        self.buffer.append(entry)
+
+        if len(self.buffer) >= self.flush_size:
+            self.flush()
+        elif time.monotonic() - self._buffered_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write the buffered entries.
+
+        The buffer is emptied before writing, so entries are not
+        written again, and the buffer doesn't grow, when Redis fails.
+
+        :returns: number of entries written
+        """
+        if not self.buffer:
+            return 0
+
+        entries = [self._encode(entry) for entry in self.buffer]
+
+        self.buffer = []
+        self._buffered_at = None
+
+        pipe = self.job.connection.pipeline()
+        pipe.rpush(self.job.log_key, *entries)
+        if self.ttl:
+            pipe.expire(self.job.log_key, self.ttl)
+        length = pipe.execute()[0]
+
+        if self.max_entries is not None and length >= self.max_entries + self.archive_size:
+            self.archive(length - self.max_entries)
+
+        self.job.save_meta()
+
+        return len(entries)
+
+    @staticmethod
+    def _encode(entry: dict[str, Any]) -> bytes:
+        """Encode a log entry, sanitizing it when it's needed.
+
+        Values that can't be encoded are replaced by their
+        representation.
+
+        :param entry: log entry
+
+        :returns: the encoded entry
+        """
+        codec = get_codec()
+
+        try:
+            return codec.dumps(entry)
+        except (TypeError, ValueError):
+            pass
+
+        sanitized = {}
+        for key, value in entry.items():
+            try:
+                codec.dumps(value)
+            except (TypeError, ValueError):
+                value = repr(value)
+            sanitized[str(key)] = value
+
+        return codec.dumps(sanitized)
+
+    def archive(self, nentries: int) -> None:
+        """Move the oldest entries of the list to the database.
+
+        :param nentries: number of entries to archive
+        """
+        from .tasks.models import JobLogChunk  # avoid circular imports
+
+        entries = self.job.connection.lrange(self.job.log_key, 0, nentries - 1)
+
+        JobLogChunk.archive(self.job.id, self.job.log_archived, entries)
+
+        # The list and the number of entries archived must change
+        # at once, so readers always get consistent positions
+        self.job.meta['log_archived'] = self.job.log_archived + nentries
+
+        pipe = self.job.connection.pipeline()
+        pipe.ltrim(self.job.log_key, nentries, -1)
+        pipe.hset(self.job.key, 'meta', self.job.serializer.dumps(self.job.meta))
+        pipe.execute()
+
+    def close(self, ttl: int | None = None) -> None:
+        """Write the remaining entries.
+
+        :param ttl: time, in seconds, the log is kept in Redis
+        """
+        self.flush()
+
+        if ttl:
+            self.job.connection.expire(self.job.log_key, ttl)
+
+
+class ProgressReporter:
+    """Save the progress of a running job at a limited rate.
+
+    Jobs call `update` for every item they process. It only counts
+    the items, so it can be called from tight loops. At most every
+    `interval` seconds, the function `on_report` is called with the
+    number of items processed and the rate, in items per second,
+    so the job can update its progress object. Then, the metadata
+    of the job is saved, making the progress visible to other
+    processes while the job runs.
+
+    :param job: job that reports its progress
+    :param interval: minimum time, in seconds, between reports
+    :param on_report: function called before the progress is saved
+    """
+    def __init__(self, job: rq.job.Job,
+                 interval: float = PROGRESS_INTERVAL,
+                 on_report: Callable[[int, float], None] | None = None) -> None:
+        self.job = job
+        self.interval = interval
+        self.on_report = on_report
+        self.count = 0
+        self.started_at = time.monotonic()
+        self._reported_at = self.started_at
+
+    @property
+    def rate(self) -> float:
+        """Number of items processed per second."""
+
+        elapsed = time.monotonic() - self.started_at
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def update(self, nitems: int = 1) -> None:
+        """Count processed items, reporting the progress when it's due.
+
+        :param nitems: number of items processed
+        """
+        self.count += nitems
+
+        if time.monotonic() - self._reported_at >= self.interval:
+            self.report()
+
+    def report(self) -> None:
+        """Save the progress of the job right away."""
+
+        if self.on_report:
+            self.on_report(self.count, self.rate)
+
+        self.job.save_meta()
+        self._reported_at = time.monotonic()
+
+
 class JobLogHandler(logging.StreamHandler):
     """Handler class for the job logs.
 
-    Log entries will be stored in the job metadata.
+    Log entries will be stored in the job log.
 
     :param job: job to store the logs
     """
@@ -141,7 +497,7 @@ class JobLogHandler(logging.StreamHandler):
         self.job = job
 
     def emit(self, record: LogRecord) -> None:
-        """Emit a log entry storing it in the job metadata.
+        """Emit a log entry storing it in the job log.
 
         :param record: log record to emit
         """
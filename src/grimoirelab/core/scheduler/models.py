@@ -18,6 +18,7 @@
 
 from __future__ import annotations
 
+import json
 import typing
 import uuid
 
@@ -27,6 +28,7 @@ from django.db.models import (
     BooleanField,
     CharField,
     DateTimeField,
+    Index,
     IntegerField,
     JSONField,
     PositiveIntegerField,
@@ -43,6 +45,7 @@ from ..models import (
     MAX_SIZE_CHAR_FIELD,
     MAX_SIZE_CHAR_INDEX
 )
+from .codecs import encode_default
 
 
 if typing.TYPE_CHECKING:
@@ -52,6 +55,9 @@ if typing.TYPE_CHECKING:
 GRIMOIRELAB_TASK_PREFIX = "grimoire:task:"
 GRIMOIRELAB_JOB_PREFIX = "grimoire:job:"
 
+# Length of the string representation of a UUID
+UUID_LENGTH = 36
+
 
 class SchedulerStatus(IntegerChoices):
     """Types of task and job status."""
@@ -62,6 +68,18 @@ class SchedulerStatus(IntegerChoices):
     COMPLETED = 4, _("completed")
     FAILED = 5, _("failed")
     RECOVERY = 6, _("recovery")
+    PAUSED = 7, _("paused")
+
+
+class JobResultEncoder(DjangoJSONEncoder):
+    """JSON encoder for job results.
+
+    Objects not supported by JSON are converted with the
+    same function used by the JSON codecs.
+    """
+
+    def default(self, o):
+        return encode_default(o)
 
 
 class Task(BaseModel):
@@ -85,6 +103,15 @@ class Task(BaseModel):
     Tasks that were cancelled or interrupted while running that
     can be resumed will be mark as 'RECOVERY'.
 
+    Tasks can be paused ('PAUSED'). Paused tasks are not maintained
+    nor rescheduled until they are resumed. Jobs that were running
+    when the task was paused finish, but they don't change the
+    status of the task.
+
+    Tasks keep the number of jobs created and the checkpoint of
+    the last job run (its arguments and its progress), so new jobs
+    can be created without reading the previous ones.
+
     This class is an abstract class and should be inherited by
     implementing methods to create the task, prepare the job
     parameters for running the task, and determine if the task can be
@@ -113,8 +140,20 @@ class Task(BaseModel):
                                            default=settings.GRIMOIRELAB_JOB_MAX_RETRIES)
     burst = BooleanField(default=False)
 
+    # Jobs data
+    job_count = PositiveIntegerField(default=0)
+    checkpoint = JSONField(encoder=JobResultEncoder, null=True, default=None)
+
     class Meta:
         abstract = True
+        indexes = [
+            # Tasks to maintain are filtered by status
+            Index(fields=['status', 'scheduled_at']),
+            # Tasks are listed by their scheduling date
+            Index(fields=['scheduled_at']),
+            # The reconciler pages tasks by modification date
+            Index(fields=['last_modified']),
+        ]
 
     @classmethod
     def create_task(
@@ -137,25 +176,57 @@ class Task(BaseModel):
         :param args: additional arguments.
         :param kwargs: additional keyword arguments.
         """
+        task = cls.build_task(
+            task_args, job_interval, job_max_retries, burst=burst,
+            *args, **kwargs
+        )
+        task.save()
+        return task
+
+    @classmethod
+    def build_task(
+        cls,
+        task_args: dict[str, Any],
+        job_interval: int,
+        job_max_retries: int,
+        burst: bool = False,
+        *args, **kwargs
+    ) -> Self:
+        """Build a new task without saving it.
+
+        Task types with extra fields must override this method
+        to set them. It takes the same arguments as `create_task`.
+        """
         task = cls(
-            uuid=str(uuid.uuid4()),
+            uuid=generate_uuid(cls.TASK_TYPE),
             task_type=cls.TASK_TYPE,
             task_args=task_args,
             job_interval=job_interval,
             job_max_retries=job_max_retries,
             burst=burst
         )
-        task.save()
         return task
 
-    def save_run(self, status: SchedulerStatus) -> None:
+    def save_run(
+        self,
+        status: SchedulerStatus,
+        checkpoint: dict[str, Any] | None = None
+    ) -> None:
         """Save the result of the task execution.
 
         This method will update the internal state of the task after a run,
         according to the new status given as argument.
 
         :param status: new status of the task.
+        :param checkpoint: arguments and progress of the job run.
         """
+        update_fields = ['runs', 'last_run', 'failures', 'last_modified']
+
+        if checkpoint is not None:
+            # Keep the same value that is read from the database
+            self.checkpoint = json.loads(json.dumps(checkpoint, cls=JobResultEncoder))
+            update_fields.append('checkpoint')
+
         self.runs += 1
         self.last_run = datetime_utcnow()
 
@@ -163,8 +234,18 @@ class Task(BaseModel):
             self.failures += 1
         else:
             self.failures = 0
-        self.status = status
-        self.save()
+
+        # Paused tasks keep their status until they are resumed. The
+        # task can be paused while the job runs, so the status stored
+        # in the database is checked when it's updated.
+        updated = type(self).objects.filter(
+            pk=self.pk
+        ).exclude(
+            status=SchedulerStatus.PAUSED
+        ).update(status=status)
+
+        self.status = status if updated else SchedulerStatus.PAUSED
+        self.save(update_fields=update_fields)
 
     def prepare_job_parameters(self) -> dict[str, Any]:
         """Generate the parameters for running the job."""
@@ -207,16 +288,6 @@ class Task(BaseModel):
         return NotImplementedError
 
 
-class JobResultEncoder(DjangoJSONEncoder):
-    """JSON encoder for job results."""
-
-    def default(self, o):
-        try:
-            return o.__dict__
-        except AttributeError:
-            return super().default(o)
-
-
 class Job(BaseModel):
     """Base class for jobs executed by the scheduler.
 
@@ -272,8 +343,24 @@ class Job(BaseModel):
         self.status = status
         self.progress = progress
         self.logs = logs
-        self.save()
-        self.task.save_run(status)
+        self.save(update_fields=['finished_at', 'status', 'progress',
+                                 'logs', 'last_modified'])
+        self.task.save_run(status, checkpoint={
+            'job_args': self.job_args,
+            'progress': progress
+        })
+
+    def delete(self, *args, **kwargs):
+        """Delete the job and its archived log.
+
+        Querysets of jobs don't call this method; when they are
+        deleted, their log must be deleted with `JobLogChunk.delete_logs`.
+        """
+        from .tasks.models import JobLogChunk  # avoid circular imports
+
+        JobLogChunk.delete_logs([self.uuid])
+
+        return super().delete(*args, **kwargs)
 
     @property
     def job_id(self) -> str:
@@ -295,8 +382,18 @@ def _create_job_class(task_class: type[Task]) -> type[Job]:
     :returns: the new job class.
     """
     class_name = task_class.__name__.replace('Task', 'Job')
+
+    # The latest jobs of a task are selected by number
+    # or by scheduling date
+    meta_class = type('Meta', (), {
+        'indexes': [
+            Index(fields=['task', 'job_num']),
+            Index(fields=['task', 'scheduled_at']),
+        ]
+    })
     job_class = type(class_name, (Job,), {
         'task': ForeignKey(task_class, on_delete=CASCADE, related_name="jobs",),
+        'Meta': meta_class,
         '__module__': task_class.__module__
     })
     return job_class
@@ -365,3 +462,32 @@ def get_all_registered_task_names() -> list[str]:
     :returns: a list with all registered task names.
     """
     return list(GRIMOIRELAB_TASK_MODELS.keys())
+
+
+def generate_uuid(task_type: str) -> str:
+    """Generate the uuid of a task or a job.
+
+    The type of the task is added as a prefix of a random UUID
+    (i.e. '<task_type>-<uuid>'). This way, the model of a task
+    or a job can be obtained from its uuid, without querying the
+    tables of every registered model.
+
+    :param task_type: type of the task.
+
+    :returns: a new uuid.
+    """
+    return f"{task_type}-{uuid.uuid4()}"
+
+
+def get_uuid_task_type(value: str) -> str | None:
+    """Return the type of task encoded in a uuid.
+
+    :param value: uuid of a task or a job.
+
+    :returns: the type of the task or None when the uuid
+        wasn't generated with `generate_uuid`.
+    """
+    if len(value) <= UUID_LENGTH + 1 or value[-UUID_LENGTH - 1] != '-':
+        return None
+
+    return value[:-UUID_LENGTH - 1]
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import annotations
+
+import logging
+import time
+import typing
+
+from django.db.models import Q
+
+from grimoirelab_toolkit.datetime import datetime_utcnow
+
+from .models import get_all_registered_task_models
+from .scheduler import (
+    MAINTENANCE_BATCH_SIZE,
+    _maintain_tasks_batch,
+    _maintained_tasks
+)
+
+if typing.TYPE_CHECKING:
+    import datetime
+    import redis
+    from .models import Task, Job
+
+
+logger = logging.getLogger(__name__)
+
+RECONCILER_METRICS_KEY = 'grimoirelab:reconciler:metrics'
+
+
+class TaskReconciler:
+    """Heal the tasks which jobs were lost in Redis.
+
+    The reconciler checks the scheduled tasks incrementally, in
+    pages of tasks sorted by modification date. Each sweep only
+    checks the tasks that were modified before it started, so
+    the tasks rescheduled during a sweep are checked again on the
+    next one. The number of tasks checked per second can be limited
+    to keep the load of the database and Redis low.
+
+    After every sweep, the number of tasks checked and the number
+    of jobs rescheduled are stored in the Redis hash
+    RECONCILER_METRICS_KEY, together with the totals since the
+    reconciler started for the first time.
+
+    :param connection: Redis connection where the metrics are stored
+    :param batch_size: number of tasks checked on each page
+    :param rate_limit: maximum number of tasks checked per second;
+        when it's 0 or None, there is no limit
+    """
+    def __init__(self,
+                 connection: redis.Redis,
+                 batch_size: int = MAINTENANCE_BATCH_SIZE,
+                 rate_limit: float | None = None) -> None:
+        self.connection = connection
+        self.batch_size = batch_size
+        self.rate_limit = rate_limit
+        self._stopped = False
+
+    def run(self, interval: float) -> None:
+        """Run sweeps until the reconciler is stopped.
+
+        :param interval: seconds to wait between sweeps
+        """
+        self._stopped = False
+
+        while not self._stopped:
+            self.sweep()
+            self._sleep(interval)
+
+    def stop(self) -> None:
+        """Stop the reconciler after the current page."""
+
+        self._stopped = True
+
+    def sweep(self) -> dict[str, int]:
+        """Check all the scheduled tasks once.
+
+        :returns: a dict with the number of tasks checked and
+            the number of jobs rescheduled
+        """
+        started_at = datetime_utcnow()
+        start = time.monotonic()
+        checked = 0
+        rescheduled = 0
+
+        for task_class, job_class in get_all_registered_task_models():
+            cursor = None
+
+            while not self._stopped:
+                page_start = time.monotonic()
+
+                tasks = self._fetch_page(task_class, job_class, started_at, cursor)
+                if not tasks:
+                    break
+
+                # Rescheduling updates the modification date of the tasks
+                cursor = (tasks[-1].last_modified, tasks[-1].pk)
+                checked += len(tasks)
+                rescheduled += _maintain_tasks_batch(task_class, job_class, tasks)
+
+                if self.rate_limit:
+                    elapsed = time.monotonic() - page_start
+                    self._sleep(len(tasks) / self.rate_limit - elapsed)
+
+        metrics = {
+            'checked': checked,
+            'rescheduled': rescheduled
+        }
+        self._save_metrics(metrics, started_at, time.monotonic() - start)
+
+        if rescheduled:
+            logger.info(f"Reconciler: {rescheduled} jobs rescheduled; {checked} tasks checked.")
+        else:
+            logger.debug(f"Reconciler: {checked} tasks checked.")
+
+        return metrics
+
+    def _fetch_page(self,
+                    task_class: type[Task],
+                    job_class: type[Job],
+                    until: datetime.datetime,
+                    cursor: tuple[datetime.datetime, int] | None) -> list[Task]:
+        """Return the page of tasks after the cursor."""
+
+        tasks = _maintained_tasks(task_class, job_class).filter(last_modified__lte=until)
+
+        if cursor:
+            last_modified, pk = cursor
+            tasks = tasks.filter(
+                Q(last_modified__gt=last_modified) |
+                Q(last_modified=last_modified, pk__gt=pk)
+            )
+
+        return list(tasks.order_by('last_modified', 'pk')[:self.batch_size])
+
+    def _save_metrics(self,
+                      metrics: dict[str, int],
+                      started_at: datetime.datetime,
+                      duration: float) -> None:
+        """Store the metrics of the last sweep in Redis."""
+
+        pipe = self.connection.pipeline()
+        pipe.hset(RECONCILER_METRICS_KEY, mapping={
+            'last_sweep_at': started_at.isoformat(),
+            'last_sweep_duration': duration,
+            'last_sweep_checked': metrics['checked'],
+            'last_sweep_rescheduled': metrics['rescheduled'],
+        })
+        pipe.hincrby(RECONCILER_METRICS_KEY, 'sweeps', 1)
+        pipe.hincrby(RECONCILER_METRICS_KEY, 'total_checked', metrics['checked'])
+        pipe.hincrby(RECONCILER_METRICS_KEY, 'total_rescheduled', metrics['rescheduled'])
+        pipe.execute()
+
+    def _sleep(self, seconds: float) -> None:
+        """Sleep the given seconds or until the reconciler is stopped."""
+
+        deadline = time.monotonic() + seconds
+
+        while not self._stopped:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 1))
+
+
+def get_reconciler_metrics(connection: redis.Redis) -> dict[str, str]:
+    """Return the metrics stored by the reconciler.
+
+    :param connection: Redis connection where the metrics are stored
+
+    :returns: a dict with the metrics; empty when the reconciler
+        never ran
+    """
+    metrics = connection.hgetall(RECONCILER_METRICS_KEY)
+
+    return {key.decode('utf-8'): value.decode('utf-8') for key, value in metrics.items()}
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import annotations
+
+import datetime
+import logging
+import typing
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max, Min, Q
+
+from grimoirelab_toolkit.datetime import datetime_utcnow
+
+from .models import SchedulerStatus, get_all_registered_task_models
+
+if typing.TYPE_CHECKING:
+    from django.db.models import QuerySet
+    from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+PRUNE_BATCH_SIZE = 10000
+
+
+def prune_jobs(
+    keep_jobs: int = settings.GRIMOIRELAB_JOB_RETENTION_COUNT,
+    keep_failed_days: int = settings.GRIMOIRELAB_JOB_RETENTION_FAILED_DAYS,
+    batch_size: int = PRUNE_BATCH_SIZE
+) -> int:
+    """Remove the old jobs of the tasks.
+
+    The last `keep_jobs` jobs of each task are kept, and so are
+    the jobs that failed in the last `keep_failed_days` days. Jobs
+    that are enqueued or running are never removed. The archived
+    logs of the jobs are removed with them.
+
+    Jobs are pruned incrementally, in ranges of `batch_size`
+    primary keys, and each range is removed in its own transaction,
+    so the tables are not locked for a long time. The latest jobs
+    of a task are found using its job counter, so the jobs of other
+    tasks don't need to be read.
+
+    :param keep_jobs: number of jobs kept for each task.
+    :param keep_failed_days: days failed jobs are kept.
+    :param batch_size: number of primary keys checked on each range.
+
+    :returns: the number of jobs removed.
+
+    :raises ValueError: when `keep_jobs` is less than 1; the
+        latest job of a task is always needed to maintain it.
+    """
+    if keep_jobs < 1:
+        raise ValueError(f"at least one job per task must be kept; {keep_jobs} given")
+
+    failed_since = datetime_utcnow() - datetime.timedelta(days=keep_failed_days)
+    pruned = 0
+
+    for _, job_class in get_all_registered_task_models():
+        jobs = _prunable_jobs(job_class, keep_jobs, failed_since)
+        bounds = job_class.objects.aggregate(first=Min('pk'), last=Max('pk'))
+
+        if bounds['first'] is None:
+            continue
+
+        for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+            pruned += _prune_jobs_range(job_class, jobs, start, start + batch_size)
+
+    logger.info(f"{pruned} jobs pruned")
+
+    return pruned
+
+
+def _prunable_jobs(
+    job_class: type[Job],
+    keep_jobs: int,
+    failed_since: datetime.datetime
+) -> QuerySet:
+    """Return the jobs out of the retention policy."""
+
+    return job_class.objects.filter(
+        job_num__lte=F('task__job_count') - keep_jobs
+    ).exclude(
+        status__in=[SchedulerStatus.ENQUEUED, SchedulerStatus.RUNNING]
+    ).exclude(
+        Q(status=SchedulerStatus.FAILED) & Q(finished_at__gte=failed_since)
+    )
+
+
+def _prune_jobs_range(
+    job_class: type[Job],
+    jobs: QuerySet,
+    start: int,
+    end: int
+) -> int:
+    """Remove the jobs with primary keys in [start, end).
+
+    :returns: the number of jobs removed.
+    """
+    from .tasks.models import JobLogChunk  # avoid circular imports
+
+    with transaction.atomic():
+        pruned = list(jobs.filter(pk__gte=start, pk__lt=end).values_list('pk', 'uuid'))
+        if not pruned:
+            return 0
+
+        JobLogChunk.delete_logs([uuid for _, uuid in pruned])
+        job_class.objects.filter(pk__in=[pk for pk, _ in pruned]).delete()
+
+    return len(pruned)
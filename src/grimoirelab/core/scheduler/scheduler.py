@@ -21,36 +21,56 @@ from __future__ import annotations
 import datetime
 import logging
 import typing
-import uuid
 
 import django_rq
 import rq.exceptions
 import rq.job
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery
 
 from grimoirelab_toolkit.datetime import datetime_utcnow
 
 from .db import (
-    find_tasks_by_status,
-    find_job,
-    find_task
+    filter_tasks,
+    find_job_from_meta,
+    find_task,
+    update_status
 )
 from .errors import NotFoundError
 from .models import (
     Job,
     SchedulerStatus,
     Task,
+    generate_uuid,
+    get_all_registered_task_models,
     get_registered_task_model
 )
 
 if typing.TYPE_CHECKING:
     import redis
-    from typing import Any
+    from django.db.models import QuerySet
+    from typing import Any, Iterator
 
 
 logger = logging.getLogger(__name__)
 
+MAINTENANCE_BATCH_SIZE = 1000
+SCHEDULE_BATCH_SIZE = 1000
+MAINTAINED_STATUS = [
+    SchedulerStatus.RUNNING,
+    SchedulerStatus.RECOVERY,
+    SchedulerStatus.ENQUEUED,
+    SchedulerStatus.NEW
+]
+# Status of the tasks when a new job is enqueued
+SCHEDULABLE_STATUS = MAINTAINED_STATUS + [SchedulerStatus.COMPLETED]
+# Tasks that are scheduled, including the ones that completed
+# a job and are about to be rescheduled
+PAUSABLE_TASKS = Q(status__in=MAINTAINED_STATUS) | Q(status=SchedulerStatus.COMPLETED, burst=False)
+
 
 def schedule_task(
     task_type: str,
@@ -84,6 +104,181 @@ def schedule_task(
     return task
 
 
+def schedule_tasks(
+    task_type: str,
+    tasks: list[dict[str, Any]],
+    batch_size: int = SCHEDULE_BATCH_SIZE
+) -> list[tuple[Task | None, str | None]]:
+    """Schedule a set of tasks of the same type.
+
+    Each element of `tasks` is a dict with the arguments to create
+    a task: 'task_args', and optionally 'job_interval',
+    'job_max_retries' and 'burst', plus the specific arguments of
+    the type of task (e.g. 'datasource_type').
+
+    All the tasks are validated before creating any of them. Valid
+    tasks, and their first jobs, are inserted in bulk and the jobs
+    are enqueued with a single Redis pipeline per batch. Invalid
+    tasks are not created and don't prevent the rest from being
+    scheduled.
+
+    :param task_type: type of the tasks to be scheduled.
+    :param tasks: list with the arguments of each task.
+    :param batch_size: number of tasks created on each batch.
+
+    :returns: a list with a (task, error) tuple for each element
+        of `tasks`; task is None when its arguments were not valid,
+        and error is None when it was scheduled.
+
+    :raises KeyError: if the task type is not registered.
+    """
+    task_class, job_class = get_registered_task_model(task_type)
+
+    results = []
+    valid = []
+
+    for n, params in enumerate(tasks):
+        try:
+            task, job_args = _build_task(task_class, params)
+        except (KeyError, TypeError, ValueError, ValidationError) as e:
+            results.append((None, _error_message(e)))
+        else:
+            results.append((task, None))
+            valid.append((n, task, job_args))
+
+    for i in range(0, len(valid), batch_size):
+        batch = valid[i:i + batch_size]
+        try:
+            _create_scheduled_tasks(task_class, job_class, batch)
+        except Exception as e:
+            for n, task, _ in batch:
+                results[n] = (task, str(e))
+
+    return results
+
+
+def _build_task(
+    task_class: type[Task],
+    params: dict[str, Any]
+) -> tuple[Task, dict[str, Any]]:
+    """Build and validate a task and the arguments of its first job."""
+
+    params = dict(params)
+    task_args = params.pop('task_args')
+    job_interval = params.pop('job_interval', settings.GRIMOIRELAB_JOB_INTERVAL)
+    job_max_retries = params.pop('job_max_retries', settings.GRIMOIRELAB_JOB_MAX_RETRIES)
+
+    task = task_class.build_task(task_args, job_interval, job_max_retries, **params)
+    # Fields not set yet (e.g. scheduling data) are not validated
+    unset = [field.name for field in task._meta.fields
+             if field.null and getattr(task, field.attname) is None]
+    task.full_clean(exclude=unset, validate_unique=False, validate_constraints=False)
+    job_args = task.prepare_job_parameters()
+
+    return task, job_args
+
+
+def _create_scheduled_tasks(
+    task_class: type[Task],
+    job_class: type[Job],
+    entries: list[tuple[int, Task, dict[str, Any]]]
+) -> None:
+    """Insert a batch of tasks and their first jobs, and enqueue them.
+
+    When the jobs can't be enqueued, the tasks and the jobs
+    are set as failed.
+    """
+    scheduled_at = datetime_utcnow()
+
+    tasks = [task for _, task, _ in entries]
+    for task in tasks:
+        task.status = SchedulerStatus.ENQUEUED
+        task.scheduled_at = scheduled_at
+        task.job_count = 1
+
+    with transaction.atomic():
+        task_class.objects.bulk_create(tasks)
+        _set_bulk_created_pks(task_class, tasks)
+
+        jobs = [
+            job_class(
+                uuid=generate_uuid(task.task_type),
+                job_num=1,
+                job_args=job_args,
+                queue=task.default_job_queue,
+                scheduled_at=scheduled_at,
+                task=task
+            )
+            for _, task, job_args in entries
+        ]
+        job_class.objects.bulk_create(jobs)
+        _set_bulk_created_pks(job_class, jobs)
+
+    _enqueue_created_jobs(task_class, job_class, tasks, jobs, scheduled_at)
+
+    logger.info(f"{len(tasks)} tasks of type '{task_class.TASK_TYPE}' scheduled")
+
+
+def _enqueue_created_jobs(
+    task_class: type[Task],
+    job_class: type[Job],
+    tasks: list[Task],
+    jobs: list[Job],
+    scheduled_at: datetime.datetime
+) -> None:
+    """Enqueue the jobs created in bulk for a list of tasks.
+
+    The jobs are enqueued with a single Redis pipeline per queue.
+    When they can't be enqueued, the tasks and the jobs are set
+    as failed.
+    """
+    queues = {}
+    for task, job_db in zip(tasks, jobs):
+        queues.setdefault(job_db.queue, []).append((task, job_db, scheduled_at))
+
+    try:
+        for queue, queue_entries in queues.items():
+            _enqueue_jobs(queue, queue_entries)
+    except Exception as e:
+        logger.error(f"Error enqueuing jobs of {len(tasks)} tasks. Not scheduled. Error: {e}")
+        for task, job_db in zip(tasks, jobs):
+            task.status = SchedulerStatus.FAILED
+            job_db.status = SchedulerStatus.FAILED
+        with transaction.atomic():
+            task_class.objects.filter(pk__in=[task.pk for task in tasks]).update(
+                status=SchedulerStatus.FAILED, last_modified=datetime_utcnow()
+            )
+            job_class.objects.filter(pk__in=[job_db.pk for job_db in jobs]).update(
+                status=SchedulerStatus.FAILED, last_modified=datetime_utcnow()
+            )
+        raise e
+
+
+def _set_bulk_created_pks(model: type[Task] | type[Job], objs: list[Task] | list[Job]) -> None:
+    """Set the primary keys of the objects created with 'bulk_create'.
+
+    Some databases (e.g. MySQL) don't return them after inserting
+    the rows, so they are read using the uuids of the objects.
+    """
+    if all(obj.pk is not None for obj in objs):
+        return
+
+    pks = dict(model.objects.filter(uuid__in=[obj.uuid for obj in objs]).values_list('uuid', 'pk'))
+    for obj in objs:
+        obj.pk = pks[obj.uuid]
+
+
+def _error_message(error: Exception) -> str:
+    """Return a readable message of a validation error."""
+
+    if isinstance(error, ValidationError):
+        return '; '.join(error.messages)
+    elif isinstance(error, KeyError):
+        return f"missing argument {error}"
+    else:
+        return str(error)
+
+
 def cancel_task(task_uuid: str) -> None:
     """Cancel a task that is scheduled and delete all its jobs.
 
@@ -96,52 +291,494 @@ def cancel_task(task_uuid: str) -> None:
     """
     task = find_task(task_uuid)
 
-    _, job_class = get_registered_task_model(task.TASK_TYPE)
+    task_class, job_class = get_registered_task_model(task.task_type)
+    _cancel_tasks_batch(task_class, job_class, [task.pk])
+
+
+def cancel_tasks(batch_size: int = MAINTENANCE_BATCH_SIZE, **selector: Any) -> int:
+    """Cancel a set of tasks and delete all their jobs.
+
+    Tasks are selected with the fields given in `selector`
+    (see `filter_tasks`). They are canceled in batches: the jobs
+    of the tasks are removed from Redis with a single pipeline per
+    queue and, then, the tasks and their jobs are deleted from the
+    database using one query per table. Jobs that are running
+    can't be stopped, but they won't be rescheduled.
+
+    :param batch_size: number of tasks canceled on each batch.
+    :param selector: fields to select the tasks.
+
+    :returns: the number of tasks canceled.
+
+    :raises ValueError: when no selector is given.
+    """
+    canceled = 0
+
+    for task_class, job_class, tasks in filter_tasks(**selector):
+        for pks in _task_pk_batches(tasks, batch_size):
+            _cancel_tasks_batch(task_class, job_class, pks)
+            canceled += len(pks)
+
+    logger.info(f"{canceled} tasks canceled")
+
+    return canceled
+
+
+def pause_tasks(batch_size: int = MAINTENANCE_BATCH_SIZE, **selector: Any) -> int:
+    """Pause a set of tasks.
+
+    Tasks are selected with the fields given in `selector`
+    (see `filter_tasks`); only the tasks that are scheduled can be
+    paused. The status of the tasks is set to 'PAUSED' and the
+    jobs waiting in the queues are removed from Redis, with a single
+    pipeline per queue, and from the database. Jobs that are running
+    finish, but the tasks won't be rescheduled until they are resumed.
+
+    :param batch_size: number of tasks paused on each batch.
+    :param selector: fields to select the tasks.
+
+    :returns: the number of tasks paused.
+
+    :raises ValueError: when no selector is given.
+    """
+    paused = 0
+
+    for task_class, job_class, tasks in filter_tasks(**selector):
+        tasks = tasks.filter(PAUSABLE_TASKS)
+
+        for pks in _task_pk_batches(tasks, batch_size):
+            paused += _pause_tasks_batch(task_class, job_class, pks)
+
+    logger.info(f"{paused} tasks paused")
+
+    return paused
+
+
+def resume_tasks(batch_size: int = MAINTENANCE_BATCH_SIZE, **selector: Any) -> int:
+    """Resume a set of paused tasks.
+
+    Tasks are selected with the fields given in `selector`
+    (see `filter_tasks`); only the tasks that are paused are
+    resumed. A new job is created for each task, in bulk, and
+    the jobs are enqueued with a single pipeline per queue to
+    run as soon as possible. Tasks with a running job are not
+    enqueued; they are rescheduled when that job finishes.
+
+    :param batch_size: number of tasks resumed on each batch.
+    :param selector: fields to select the tasks.
+
+    :returns: the number of tasks resumed.
+
+    :raises ValueError: when no selector is given.
+    """
+    resumed = 0
+
+    for task_class, job_class, tasks in filter_tasks(**selector):
+        tasks = tasks.filter(status=SchedulerStatus.PAUSED)
+
+        for pks in _task_pk_batches(tasks, batch_size):
+            resumed += _resume_tasks_batch(task_class, job_class, pks)
+
+    logger.info(f"{resumed} tasks resumed")
+
+    return resumed
+
+
+def _task_pk_batches(tasks: QuerySet, batch_size: int) -> Iterator[list[int]]:
+    """Return the primary keys of the tasks in batches.
+
+    The tasks are paged by primary key, so the batches are
+    valid even when the tasks of a batch are updated or
+    deleted before the next one is read.
+    """
+    last_pk = None
+
+    while True:
+        page = tasks.order_by('pk')
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+
+        pks = list(page.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+
+        yield pks
+        last_pk = pks[-1]
+
+
+def _cancel_tasks_batch(
+    task_class: type[Task],
+    job_class: type[Job],
+    pks: list[int]
+) -> None:
+    """Remove a batch of tasks and their jobs from Redis and the database."""
+
+    # Paused tasks aren't rescheduled while they are removed
+    task_class.objects.filter(pk__in=pks).update(
+        status=SchedulerStatus.PAUSED, last_modified=datetime_utcnow()
+    )
+
+    jobs = job_class.objects.filter(
+        task_id__in=pks, queue__isnull=False
+    ).exclude(
+        status=SchedulerStatus.RUNNING
+    ).values_list('queue', 'uuid')
+
+    queues = {}
+    for queue, job_uuid in jobs.iterator():
+        queues.setdefault(queue, []).append(job_uuid)
+
+    for queue, uuids in queues.items():
+        _remove_rq_jobs(queue, uuids)
 
-    jobs = job_class.objects.filter(task=task).all()
-    for job in jobs:
-        job_rq = rq.job.Job.fetch(job.uuid, connection=django_rq.get_connection(task.default_job_queue))
-        job_rq.delete()
+    from .tasks.models import JobLogChunk  # avoid circular imports
 
-    task.delete()
+    with transaction.atomic():
+        jobs = job_class.objects.filter(task_id__in=pks)
+        JobLogChunk.delete_logs(jobs.values_list('uuid', flat=True))
+        # Jobs are deleted with a single query by the cascade;
+        # only the keys of the tasks are read to collect them
+        task_class.objects.filter(pk__in=pks).only('pk').delete()
 
 
-def maintain_tasks() -> None:
+def _pause_tasks_batch(
+    task_class: type[Task],
+    job_class: type[Job],
+    pks: list[int]
+) -> int:
+    """Pause a batch of tasks and remove their pending jobs.
+
+    :returns: the number of tasks paused.
+    """
+    with transaction.atomic():
+        paused = task_class.objects.filter(
+            PAUSABLE_TASKS, pk__in=pks
+        ).update(
+            status=SchedulerStatus.PAUSED, last_modified=datetime_utcnow()
+        )
+        pending = list(
+            job_class.objects.filter(
+                task_id__in=pks, status=SchedulerStatus.ENQUEUED
+            ).values_list('pk', 'queue', 'uuid')
+        )
+
+    queues = {}
+    for _, queue, job_uuid in pending:
+        queues.setdefault(queue, []).append(job_uuid)
+
+    for queue, uuids in queues.items():
+        _remove_rq_jobs(queue, uuids)
+
+    # Workers could have started some of them in the meantime
+    job_class.objects.filter(
+        pk__in=[pk for pk, _, _ in pending], status=SchedulerStatus.ENQUEUED
+    ).delete()
+
+    return paused
+
+
+def _resume_tasks_batch(
+    task_class: type[Task],
+    job_class: type[Job],
+    pks: list[int]
+) -> int:
+    """Create and enqueue new jobs for a batch of paused tasks.
+
+    Tasks paused while one of their jobs was running only get
+    their status back; the callback of that job will reschedule
+    them, so they don't end up with two chains of jobs.
+
+    :returns: the number of tasks resumed.
+    """
+    running = task_class.objects.filter(
+        pk__in=pks,
+        status=SchedulerStatus.PAUSED,
+        jobs__status=SchedulerStatus.RUNNING
+    ).update(
+        status=SchedulerStatus.RUNNING, last_modified=datetime_utcnow()
+    )
+
+    tasks = list(task_class.objects.filter(pk__in=pks, status=SchedulerStatus.PAUSED).order_by('pk'))
+    if not tasks:
+        return running
+
+    scheduled_at = datetime_utcnow()
+    jobs = []
+
+    for task in tasks:
+        # The arguments of the job depend on the result of the last one
+        task.status = _resume_status(task)
+        job_args = task.prepare_job_parameters()
+
+        task.status = SchedulerStatus.ENQUEUED
+        task.scheduled_at = scheduled_at
+        task.job_count += 1
+        # 'bulk_update' doesn't set the modification date
+        task.last_modified = scheduled_at
+
+        jobs.append(
+            job_class(
+                uuid=generate_uuid(task.task_type),
+                job_num=task.job_count,
+                job_args=job_args,
+                queue=task.default_job_queue,
+                scheduled_at=scheduled_at,
+                task=task
+            )
+        )
+
+    with transaction.atomic():
+        task_class.objects.bulk_update(
+            tasks,
+            ['status', 'scheduled_at', 'job_count', 'last_modified']
+        )
+        job_class.objects.bulk_create(jobs)
+        _set_bulk_created_pks(job_class, jobs)
+
+    _enqueue_created_jobs(task_class, job_class, tasks, jobs, scheduled_at)
+
+    return running + len(tasks)
+
+
+def _resume_status(task: Task) -> SchedulerStatus:
+    """Return the status a paused task had after its last run."""
+
+    if task.checkpoint is None:
+        return SchedulerStatus.NEW
+    elif task.failures > 0:
+        return SchedulerStatus.RECOVERY
+    else:
+        return SchedulerStatus.COMPLETED
+
+
+def _remove_rq_jobs(
+    queue: str,
+    uuids: list[str],
+    batch_size: int = MAINTENANCE_BATCH_SIZE
+) -> None:
+    """Remove a set of jobs from a queue using Redis pipelines.
+
+    The jobs are removed from the queue and from the registries of
+    scheduled, finished and failed jobs, and their data and logs
+    are deleted. Unlike `rq.job.Job.delete`, the status of each job
+    isn't read before removing it, and jobs that don't exist in
+    Redis anymore are ignored.
+
+    :param queue: name of the queue.
+    :param uuids: list of uuids of the jobs.
+    :param batch_size: number of jobs removed on each pipeline.
+    """
+    queue_rq = django_rq.get_queue(queue)
+    registries = [
+        queue_rq.scheduled_job_registry,
+        queue_rq.finished_job_registry,
+        queue_rq.failed_job_registry
+    ]
+
+    for i in range(0, len(uuids), batch_size):
+        with queue_rq.connection.pipeline() as pipe:
+            for job_uuid in uuids[i:i + batch_size]:
+                job_key = queue_rq.job_class.key_for(job_uuid)
+
+                pipe.lrem(queue_rq.key, 0, job_uuid)
+                for registry in registries:
+                    pipe.zrem(registry.key, job_uuid)
+                pipe.delete(job_key, job_key + b':log', job_key + b':dependents')
+            pipe.execute()
+
+
+def maintain_tasks(batch_size: int = MAINTENANCE_BATCH_SIZE) -> None:
     """Maintain the tasks that are scheduled to be executed.
 
     This function will check the status of the tasks and jobs
     that are scheduled, rescheduling them if necessary.
+
+    Tasks are checked in batches. The latest job of each task
+    is obtained in the same query that selects the tasks, the
+    jobs are checked in Redis with a single pipelined request
+    per queue, and the missing ones are rescheduled together.
+
+    :param batch_size: number of tasks checked on each batch.
     """
-    tasks = find_tasks_by_status(
-        [
-            SchedulerStatus.RUNNING,
-            SchedulerStatus.RECOVERY,
-            SchedulerStatus.ENQUEUED,
-            SchedulerStatus.NEW
-        ]
+    for task_class, job_class in get_all_registered_task_models():
+        tasks = _maintained_tasks(task_class, job_class).order_by('pk')
+
+        batch = []
+        for task in tasks.iterator(chunk_size=batch_size):
+            batch.append(task)
+            if len(batch) >= batch_size:
+                _maintain_tasks_batch(task_class, job_class, batch)
+                batch = []
+        if batch:
+            _maintain_tasks_batch(task_class, job_class, batch)
+
+
+def _maintained_tasks(task_class: type[Task], job_class: type[Job]) -> QuerySet:
+    """Return the tasks to maintain, annotated with their latest job."""
+
+    latest_job = job_class.objects.filter(
+        task=OuterRef('pk')
+    ).order_by('-scheduled_at').values('pk')[:1]
+
+    return task_class.objects.filter(
+        status__in=MAINTAINED_STATUS
+    ).annotate(
+        latest_job_id=Subquery(latest_job)
     )
 
-    for task in tasks:
-        job_db = task.jobs.order_by('-scheduled_at').first()
 
-        try:
-            rq.job.Job.fetch(job_db.uuid, connection=django_rq.get_connection(task.default_job_queue))
+def _maintain_tasks_batch(
+    task_class: type[Task],
+    job_class: type[Job],
+    tasks: list[Task]
+) -> int:
+    """Reschedule the tasks of a batch which jobs are missing in Redis.
+
+    :returns: the number of jobs scheduled again.
+    """
+
+    jobs = job_class.objects.in_bulk(
+        [task.latest_job_id for task in tasks if task.latest_job_id]
+    )
+
+    queues = {}
+    rescheduled = 0
+
+    for task in tasks:
+        job_db = jobs.get(task.latest_job_id, None)
+
+        if not job_db:
+            logger.debug(f"Task {task.task_id} without jobs. Enqueuing.")
+            current_time = datetime_utcnow()
+            scheduled_at = task.scheduled_at if task.scheduled_at and task.scheduled_at > current_time else current_time
+            _enqueue_task(task, scheduled_at=scheduled_at)
+            rescheduled += 1
             continue
-        except rq.exceptions.NoSuchJobError:
+
+        queues.setdefault(task.default_job_queue, []).append((task, job_db))
+
+    for queue, entries in queues.items():
+        connection = django_rq.get_connection(queue)
+
+        with connection.pipeline(transaction=False) as pipe:
+            for _, job_db in entries:
+                pipe.exists(rq.job.Job.key_for(job_db.uuid))
+            found = pipe.execute()
+
+        missing = [entry for entry, exists in zip(entries, found) if not exists]
+
+        for task, job_db in missing:
             logger.debug(
                 f"Job #{job_db.job_id} in queue (task: {task.task_id}) missing. Rescheduling."
             )
 
-        current_time = datetime_utcnow()
+        if missing:
+            rescheduled += _reschedule_jobs(task_class, job_class, queue, missing)
+
+    return rescheduled
+
+
+def _reschedule_jobs(
+    task_class: type[Task],
+    job_class: type[Job],
+    queue: str,
+    entries: list[tuple[Task, Job]]
+) -> int:
+    """Schedule again the jobs missing in a queue.
+
+    All the jobs are enqueued using a single Redis pipeline.
+    Like in `_schedule_job`, the status of each task is updated
+    only when it wasn't paused meanwhile; otherwise, its job is
+    removed from the queue.
+
+    :param task_class: class of the tasks.
+    :param job_class: class of the jobs.
+    :param queue: name of the queue where the jobs are enqueued.
+    :param entries: list of (task, job) tuples to reschedule.
+
+    :returns: the number of jobs scheduled again.
+    """
+    current_time = datetime_utcnow()
+
+    jobs = []
+    for task, job_db in entries:
         scheduled_at = task.scheduled_at if task.scheduled_at > current_time else current_time
+        jobs.append((task, job_db, scheduled_at))
+
+    try:
+        _enqueue_jobs(queue, jobs)
+    except Exception as e:
+        logger.error(f"Error rescheduling {len(entries)} jobs in '{queue}'. Not scheduled. Error: {e}")
+        for task, job_db in entries:
+            if update_status(task_class, task.pk, SchedulerStatus.FAILED,
+                             expected=MAINTAINED_STATUS):
+                task.status = SchedulerStatus.FAILED
+        job_class.objects.filter(
+            pk__in=[job_db.pk for _, job_db in entries]
+        ).update(
+            status=SchedulerStatus.FAILED, last_modified=datetime_utcnow()
+        )
+        raise e
+
+    rescheduled = []
+    removed = []
+
+    for task, job_db, scheduled_at in jobs:
+        if update_status(task_class, task.pk, SchedulerStatus.ENQUEUED,
+                         expected=MAINTAINED_STATUS,
+                         scheduled_at=scheduled_at):
+            task.status = SchedulerStatus.ENQUEUED
+            task.scheduled_at = scheduled_at
+            job_db.status = SchedulerStatus.ENQUEUED
+            rescheduled.append(job_db.pk)
+        else:
+            logger.info(f"Task {task.task_id} paused or removed. Job #{job_db.job_id} not rescheduled.")
+            removed.append(job_db.uuid)
+
+    if removed:
+        _remove_rq_jobs(queue, removed)
+
+    job_class.objects.filter(
+        pk__in=rescheduled
+    ).update(
+        status=SchedulerStatus.ENQUEUED, last_modified=datetime_utcnow()
+    )
 
-        _schedule_job(task, job_db, scheduled_at, job_db.job_args)
+    return len(rescheduled)
+
+
+def _enqueue_jobs(
+    queue: str,
+    entries: list[tuple[Task, Job, datetime.datetime]]
+) -> None:
+    """Enqueue a set of jobs in a queue using a single Redis pipeline.
+
+    :param queue: name of the queue.
+    :param entries: list of (task, job, scheduled_at) tuples.
+    """
+    queue_rq = django_rq.get_queue(queue)
+
+    with queue_rq.connection.pipeline() as pipe:
+        for task, job_db, scheduled_at in entries:
+            queue_rq.enqueue_at(
+                datetime=scheduled_at,
+                f=task.job_function,
+                result_ttl=settings.GRIMOIRELAB_JOB_RESULT_TTL,
+                job_timeout=settings.GRIMOIRELAB_JOB_TIMEOUT,
+                on_success=task.on_success_callback,
+                on_failure=task.on_failure_callback,
+                job_id=job_db.uuid,
+                meta=_job_meta(task, job_db),
+                pipeline=pipe,
+                **job_db.job_args,
+            )
+        pipe.execute()
 
 
 def _enqueue_task(
     task: Task,
     scheduled_at: datetime.datetime | None = None
-) -> Job:
+) -> Job | None:
     """Enqueue the task to be executed in the future.
 
     A new job for the task will be created and enqueued in the
@@ -153,7 +790,8 @@ def _enqueue_task(
     :param task: task to be enqueued.
     :param scheduled_at: datetime when the task should be executed.
 
-    :return: the job object created.
+    :return: the job object created; None when the task was
+        paused or removed.
     """
     if not scheduled_at:
         scheduled_at = datetime_utcnow()
@@ -163,16 +801,33 @@ def _enqueue_task(
 
     _, job_class = get_registered_task_model(task.task_type)
 
-    job = job_class.objects.create(
-        uuid=str(uuid.uuid4()),
-        job_num=job_class.objects.filter(task=task).count() + 1,
-        job_args=job_args,
-        queue=queue,
-        scheduled_at=scheduled_at,
-        task=task
-    )
+    with transaction.atomic():
+        # The counter is incremented in the database, so
+        # concurrent updates don't generate the same number.
+        # Tasks paused meanwhile are not enqueued.
+        updated = type(task).objects.filter(
+            pk=task.pk
+        ).exclude(
+            status=SchedulerStatus.PAUSED
+        ).update(job_count=F('job_count') + 1)
+
+        if not updated:
+            logger.info(f"Task {task.task_id} paused or removed. Not enqueued.")
+            return None
+
+        task.refresh_from_db(fields=['job_count'])
+
+        job = job_class.objects.create(
+            uuid=generate_uuid(task.task_type),
+            job_num=task.job_count,
+            job_args=job_args,
+            queue=queue,
+            scheduled_at=scheduled_at,
+            task=task
+        )
 
-    _schedule_job(task, job, scheduled_at, job_args)
+    if not _schedule_job(task, job, scheduled_at, job_args):
+        return None
 
     logger.info(
         f"Job #{job.job_id} (task: {task.task_id})"
@@ -187,9 +842,15 @@ def _schedule_job(
     job: Job,
     scheduled_at: datetime.datetime,
     job_args: dict[str, Any]
-) -> rq.job.Job:
-    """Schedule the job to be executed."""
+) -> rq.job.Job | None:
+    """Schedule the job to be executed.
+
+    Only the status of the job and the scheduling data of the task
+    are written. The task is updated only when it wasn't paused
+    meanwhile; otherwise, the job is removed.
 
+    :returns: the RQ job; None when the task was paused.
+    """
     queue = task.default_job_queue
 
     try:
@@ -202,24 +863,48 @@ def _schedule_job(
             on_success=task.on_success_callback,
             on_failure=task.on_failure_callback,
             job_id=job.uuid,
+            meta=_job_meta(task, job),
             **job_args,
         )
-
-        job.status = SchedulerStatus.ENQUEUED
-        task.status = SchedulerStatus.ENQUEUED
-        task.scheduled_at = scheduled_at
     except Exception as e:
         logger.error(f"Error enqueuing job of task {task.task_id}. Not scheduled. Error: {e}")
         job.status = SchedulerStatus.FAILED
-        task.status = SchedulerStatus.FAILED
+        job.save(update_fields=['status', 'last_modified'])
+        if update_status(type(task), task.pk, SchedulerStatus.FAILED,
+                         expected=SCHEDULABLE_STATUS):
+            task.status = SchedulerStatus.FAILED
         raise e
-    finally:
-        job.save()
-        task.save()
+
+    # New jobs are created as enqueued, so only the task is updated
+    if not update_status(type(task), task.pk, SchedulerStatus.ENQUEUED,
+                         expected=SCHEDULABLE_STATUS,
+                         scheduled_at=scheduled_at):
+        logger.info(f"Task {task.task_id} paused while enqueuing. Job removed.")
+        _remove_rq_jobs(queue, [job.uuid])
+        job.delete()
+        task.status = SchedulerStatus.PAUSED
+        return None
+
+    job.status = SchedulerStatus.ENQUEUED
+    task.status = SchedulerStatus.ENQUEUED
+    task.scheduled_at = scheduled_at
 
     return rq_job
 
 
+def _job_meta(task: Task, job: Job) -> dict[str, Any]:
+    """Return the metadata that identifies the job in the database.
+
+    Workers and callbacks use it to load the job directly,
+    without searching it in every job model.
+    """
+    return {
+        'task_type': task.task_type,
+        'task_pk': task.pk,
+        'job_pk': job.pk
+    }
+
+
 def _on_success_callback(
     job: rq.job.Job,
     connection: redis.Redis,
@@ -233,13 +918,13 @@ def _on_success_callback(
     of the job object.
     """
     try:
-        job_db = find_job(job.id)
+        job_db = find_job_from_meta(job)
     except NotFoundError:
         logger.error("Job not found. Not rescheduling.")
         return
 
     job_db.save_run(SchedulerStatus.COMPLETED,
-                    progress=result, logs=job.meta.get('log', None))
+                    progress=result, logs=job.log)
     task = job_db.task
 
     logger.info(
@@ -247,7 +932,10 @@ def _on_success_callback(
     )
 
     # Reschedule task
-    if task.burst:
+    if task.status == SchedulerStatus.PAUSED:
+        logger.info(f"Task: {task.task_id} paused. It won't be rescheduled.")
+        return
+    elif task.burst:
         logger.info(f"Task: {task.task_id} finished. It was a burst task. It won't be rescheduled.")
         return
     else:
@@ -274,14 +962,14 @@ def _on_failure_callback(
     of the job object.
     """
     try:
-        job_db = find_job(job.id)
+        job_db = find_job_from_meta(job)
     except NotFoundError:
         logger.error("Job not found. Not rescheduling.")
         return
 
     job_db.save_run(SchedulerStatus.FAILED,
                     progress=job.meta['progress'],
-                    logs=job.meta.get('log', None))
+                    logs=job.log)
     task = job_db.task
 
     logger.error(
@@ -289,7 +977,10 @@ def _on_failure_callback(
     )
 
     # Try to retry the task
-    if task.failures >= task.job_max_retries:
+    if task.status == SchedulerStatus.PAUSED:
+        logger.info(f"Task: {task.task_id} paused. It won't be retried.")
+        return
+    elif task.failures >= task.job_max_retries:
         logger.error(
             f"Task: {task.task_id} max retries reached; cancelled"
         )
@@ -297,10 +988,13 @@ def _on_failure_callback(
     elif not task.can_be_retried():
         logger.error(f"Task: {task.task_id} can't be retried")
         return
+    elif not update_status(type(task), task.pk, SchedulerStatus.RECOVERY,
+                           expected=[SchedulerStatus.FAILED]):
+        logger.info(f"Task: {task.task_id} paused. It won't be retried.")
+        return
     else:
         logger.error(f"Task: {task.task_id} failed but task will be retried")
         task.status = SchedulerStatus.RECOVERY
-        task.save()
 
     scheduled_at = datetime_utcnow() + datetime.timedelta(seconds=task.job_interval)
     _enqueue_task(task, scheduled_at=scheduled_at)
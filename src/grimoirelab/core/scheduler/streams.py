@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import annotations
+
+import typing
+import zlib
+
+import redis
+
+if typing.TYPE_CHECKING:
+    from typing import Iterator
+
+
+def get_stream_partition(key: str, partitions: int) -> int:
+    """Return the partition of the events stream for a key.
+
+    The partition is obtained from a stable hash of the key, so
+    the events of a task are always published in the same
+    partition and their order is preserved.
+
+    :param key: key used to select the partition (e.g., a task uuid)
+    :param partitions: number of partitions of the stream
+
+    :returns: the partition number, from 0 to `partitions - 1`
+    """
+    if partitions < 1:
+        raise ValueError("'partitions' must be greater than 0")
+
+    return zlib.crc32(key.encode('utf-8')) % partitions
+
+
+def stream_partition_name(stream_name: str, partition: int) -> str:
+    """Return the name of the Redis key of a stream partition.
+
+    The first partition uses the name of the stream, so a stream
+    with a single partition is the same as a stream without them.
+    The rest of partitions are named '<stream_name>:<partition>'.
+
+    :param stream_name: name of the events stream
+    :param partition: partition number
+    """
+    if partition == 0:
+        return stream_name
+    else:
+        return f"{stream_name}:{partition}"
+
+
+def stream_partition_names(stream_name: str, partitions: int) -> Iterator[str]:
+    """Return the names of the partitions of a stream.
+
+    :param stream_name: name of the events stream
+    :param partitions: number of partitions
+    """
+    for partition in range(partitions):
+        yield stream_partition_name(stream_name, partition)
+
+
+def stream_backlog(connection: redis.Redis, stream_name: str) -> int:
+    """Return the backlog of the slowest consumer group of a stream.
+
+    The backlog of a consumer group is the number of entries not
+    delivered to the group yet (its lag) plus the entries delivered
+    but not acknowledged. When Redis can't compute the lag of a group
+    (e.g., entries were deleted or trimmed before the group read them),
+    the length of the stream is used as an upper bound. The length
+    is also the backlog when no consumer group was created yet, so
+    producers are throttled before the archivists start.
+
+    :param connection: Redis connection
+    :param stream_name: name of the stream
+
+    :returns: the number of entries not processed by the slowest
+        group; 0 when the stream doesn't exist
+    """
+    try:
+        groups = connection.xinfo_groups(stream_name)
+    except redis.exceptions.ResponseError:
+        # The stream doesn't exist
+        return 0
+
+    if not groups:
+        return connection.xlen(stream_name)
+
+    backlog = 0
+    stream_length = None
+
+    for group in groups:
+        lag = group.get('lag', None)
+
+        if lag is None:
+            if stream_length is None:
+                stream_length = connection.xlen(stream_name)
+            lag = stream_length
+
+        backlog = max(backlog, lag + group['pending'])
+
+    return backlog
@@ -19,7 +19,8 @@
 
 from __future__ import annotations
 
-import json
+import collections
+import concurrent.futures
 import logging
 import typing
 import urllib3
@@ -28,13 +29,24 @@ import redis
 import rq.job
 from opensearchpy import OpenSearch, RequestError
 
+from ..codecs import DEFAULT_CODEC, get_codec
+from ..compression import PayloadDecoder
+from ..jobs import PROGRESS_INTERVAL, ProgressReporter
+
 
 if typing.TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Iterator
+    from ..codecs import JSONCodec
 
 
 MAX_EVENTS_PER_JOB = 5000
 BLOCK_TIMEOUT = 60000  # seconds
+READ_COUNT = 100
+STORE_RETRIES = 3
+MAX_ITEMS_BULK = 100
+MAX_BYTES_BULK = 10 * 1024 * 1024
+MAX_IN_FLIGHT = 1
+DEAD_LETTER_SUFFIX = 'dead-letter'
 
 
 logger = logging.getLogger('archivist')
@@ -49,13 +61,35 @@ def archivist_job(
     consumer_name: str,
     events_queue: str,
     limit: int = MAX_EVENTS_PER_JOB,
-    block_timeout: int = BLOCK_TIMEOUT
+    block_timeout: int = BLOCK_TIMEOUT,
+    read_count: int = READ_COUNT,
+    store_retries: int = STORE_RETRIES,
+    max_items_bulk: int = MAX_ITEMS_BULK,
+    max_bytes_bulk: int = MAX_BYTES_BULK,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    json_codec: str = DEFAULT_CODEC,
+    compression_dict: str | None = None,
+    progress_interval: float = PROGRESS_INTERVAL
 ) -> ArchivistProgress:
     """Fetch and archive events.
 
     It will fetch events from a Redis stream and store them in a
     storage system.
 
+    Events are read from the stream in pages of `read_count`
+    entries. The storage system reports which entries of a page
+    were persisted and only those are acknowledged, with a single
+    call. Entries that could not be stored are retried right away,
+    up to `store_retries` times. After that, or if the job fails,
+    they will stay pending and will be recovered by other consumer.
+    Entries that can't be decoded are moved to the dead-letter
+    stream (see `dead_letter_stream_name`) and acknowledged.
+
+    When `max_in_flight` is greater than one, pages are stored
+    concurrently while the next ones are read from the stream.
+    Up to `max_in_flight` pages are stored at the same time and
+    they are acknowledged in the same order they were read.
+
     :param storage_type: type of the storage system (e.g., 'opensearch')
     :param storage_url: URL of the storage system
     :param storage_db_name: Name of the database to use
@@ -66,6 +100,21 @@ def archivist_job(
     :param limit: Maximum number of events to fetch and store
     :param block_timeout: Time to block when fetching events, None for not blocking,
         0 for blocking indefinitely.
+    :param read_count: Maximum number of events to read from the
+        stream on each call
+    :param store_retries: Number of times the events that could not
+        be stored are sent again to the storage system
+    :param max_items_bulk: Maximum number of events sent to the storage
+        system on each request
+    :param max_bytes_bulk: Maximum size, in bytes, of the requests sent
+        to the storage system
+    :param max_in_flight: Maximum number of pages being stored at the
+        same time
+    :param json_codec: Name of the JSON codec used to decode the events
+    :param compression_dict: Path to the shared dictionary used to
+        compress the events
+    :param progress_interval: Minimum time, in seconds, between
+        updates of the progress of the job while it runs
     """
     rq_job = rq.get_current_job()
 
@@ -77,22 +126,122 @@ def archivist_job(
     )
     rq_job.progress = progress
 
+    codec = get_codec(json_codec)
+    decoder = PayloadDecoder(compression_dict)
+
     Storage = get_storage_backend(storage_type)
     storage = Storage(url=storage_url,
                       db_name=storage_db_name,
-                      verify_certs=storage_verify_certs)
-    events = events_consumer(rq_job.connection,
-                             consumer_name,
-                             events_queue,
-                             redis_group,
-                             limit,
-                             block_timeout)
-
-    progress.total = storage.store(events)
+                      verify_certs=storage_verify_certs,
+                      max_items_bulk=max_items_bulk,
+                      max_bytes_bulk=max_bytes_bulk,
+                      codec=codec)
+    pages = events_consumer(rq_job.connection,
+                            consumer_name,
+                            events_queue,
+                            redis_group,
+                            limit,
+                            block_timeout,
+                            read_count,
+                            codec=codec,
+                            decoder=decoder)
+
+    def checkpoint(total: int, rate: float) -> None:
+        progress.rate = rate
+
+    reporter = ProgressReporter(rq_job,
+                                interval=progress_interval,
+                                on_report=checkpoint)
+
+    for stored_ids in _store_pages(storage, pages, store_retries, max_in_flight):
+        acked = ack_stream_entries(rq_job.connection,
+                                   events_queue,
+                                   redis_group,
+                                   stored_ids)
+        progress.total += acked
+        reporter.update(acked)
+
+    progress.rate = reporter.rate
 
     return progress
 
 
+def _store_pages(
+        storage: StorageBackend,
+        pages: Iterator[list[StreamEntry]],
+        retries: int = STORE_RETRIES,
+        max_in_flight: int = MAX_IN_FLIGHT
+) -> Iterator[list[bytes]]:
+    """Store pages of stream entries.
+
+    For each page, it returns the ids of the entries that were
+    stored, in the same order the pages were read.
+
+    When `max_in_flight` is greater than one, pages are stored by
+    a pool of threads, so the next pages are read and encoded while
+    the previous ones are stored. No more than `max_in_flight` pages
+    will be waiting to be stored, so the memory is bounded.
+
+    :param storage: storage backend
+    :param pages: pages of stream entries to store
+    :param retries: number of times failed entries are stored again
+    :param max_in_flight: maximum number of pages stored at the same time
+
+    :returns: iterator of the ids stored for each page
+    """
+    if max_in_flight <= 1:
+        for page in pages:
+            yield _store_entries(storage, page, retries)
+        return
+
+    in_flight = collections.deque()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for page in pages:
+            if len(in_flight) >= max_in_flight:
+                yield in_flight.popleft().result()
+            in_flight.append(executor.submit(_store_entries, storage, page, retries))
+
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def _store_entries(
+        storage: StorageBackend,
+        entries: list[StreamEntry],
+        retries: int = STORE_RETRIES
+) -> list[bytes]:
+    """Store a set of stream entries.
+
+    Entries that the storage backend couldn't persist are sent
+    again right away, up to `retries` times.
+
+    :param storage: storage backend
+    :param entries: stream entries to store
+    :param retries: number of times failed entries are stored again
+
+    :returns: ids of the entries that were stored
+    """
+    stored_ids = []
+    pending = entries
+
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            logger.warning(f"{len(pending)} events couldn't be stored; retrying ({attempt}/{retries})")
+
+        persisted = set(storage.store(pending))
+        stored_ids.extend(entry.message_id for entry in pending
+                          if entry.message_id in persisted)
+        pending = [entry for entry in pending if entry.message_id not in persisted]
+
+        if not pending:
+            break
+    else:
+        logger.error(f"{len(pending)} events couldn't be stored; they will be recovered later")
+
+    return stored_ids
+
+
 def _create_consumer_group(
         connection: redis.Redis,
         stream_name: str,
@@ -115,24 +264,35 @@ def _recover_stream_entries(
         connection: redis.Redis,
         consumer_name: str,
         stream_name: str,
-        group_name: str
-) -> dict:
+        group_name: str,
+        read_count: int = READ_COUNT,
+        codec: JSONCodec | None = None,
+        decoder: PayloadDecoder | None = None
+) -> Iterator[list[StreamEntry]]:
     """
     Transfers ownership of pending stream entries idle
     for 5m that match the specified criteria
 
+    Entries are returned in pages of `read_count` elements.
+    Claimed entries are not acknowledged.
+
     :param connection: Redis connection
     :param consumer_name: Name of the consumer
     :param stream_name: Name of the stream
+    :param read_count: Maximum number of entries to claim on each call
+    :param codec: JSON codec used to decode the events
+    :param decoder: decoder of the payload of the entries
     """
     logger.info(f"Recovering events from '{stream_name}' group '{group_name}'")
 
+    decoder = decoder or PayloadDecoder()
+
     while True:
         response = connection.xautoclaim(name=stream_name,
                                          groupname=group_name,
                                          consumername=consumer_name,
                                          min_idle_time=5 * 60 * 1000,
-                                         count=10)
+                                         count=read_count)
 
         # The response contains an array with the following contents
         # 1) "0-0" (stream ID to be used as the start argument for the next call)
@@ -141,13 +301,10 @@ def _recover_stream_entries(
         #          2) "value"
         # 3) (empty array) (message IDs that no longer exist in the stream)
         messages = response[1]
-        for message in messages:
-            message_id = message[0]
-            message_data = message[1][b'data']
-
-            yield json.loads(message_data)
-
-            connection.xack(stream_name, group_name, message_id)
+        entries = _decode_messages(connection, stream_name, group_name,
+                                   messages, codec, decoder)
+        if entries:
+            yield entries
 
         if response[0] == b"0-0":
             break
@@ -160,9 +317,17 @@ def events_consumer(
         group_name: str,
         limit: int = MAX_EVENTS_PER_JOB,
         block_timeout: int = BLOCK_TIMEOUT,
-) -> iter(dict):
+        read_count: int = READ_COUNT,
+        codec: JSONCodec | None = None,
+        decoder: PayloadDecoder | None = None
+) -> Iterator[list[StreamEntry]]:
     """Get items from a Redis stream given a group and a consumer name
 
+    Items are returned in pages with up to `read_count` entries.
+    Entries are not acknowledged; the caller must call to
+    `ack_stream_entries` once they are processed, so they are
+    not delivered again.
+
     :param connection: Redis connection
     :param consumer_name: Name of the consumer
     :param stream_name: Name of the stream
@@ -170,13 +335,21 @@ def events_consumer(
     :param limit: Maximum number of items to fetch
     :param block_timeout: Time to block when fetching events, None for not blocking,
         0 for blocking indefinitely
+    :param read_count: Maximum number of items to read on each call
+    :param codec: JSON codec used to decode the events
+    :param decoder: decoder of the payload of the entries
     """
     _create_consumer_group(connection, stream_name, group_name)
 
+    decoder = decoder or PayloadDecoder()
+
     yield from _recover_stream_entries(connection=connection,
                                        consumer_name=consumer_name,
                                        group_name=group_name,
-                                       stream_name=stream_name)
+                                       stream_name=stream_name,
+                                       read_count=read_count,
+                                       codec=codec,
+                                       decoder=decoder)
 
     logger.info(f"Fetching events from '{stream_name}' group "
                 f"'{group_name}' as '{consumer_name}'")
@@ -187,7 +360,7 @@ def events_consumer(
             response = connection.xreadgroup(groupname=group_name,
                                              consumername=consumer_name,
                                              streams={stream_name: '>'},
-                                             count=10,
+                                             count=read_count,
                                              block=block_timeout)
 
             # The response contains an array with the following contents
@@ -197,15 +370,12 @@ def events_consumer(
             #             2) "value"
             if response:
                 messages = response[0][1]
-                for message in messages:
-                    total += 1
-                    message_id = message[0]
-                    message_data = message[1][b'data']
-
-                    yield json.loads(message_data)
-
-                    connection.xack(stream_name, group_name, message_id)
+                total += len(messages)
 
+                entries = _decode_messages(connection, stream_name, group_name,
+                                           messages, codec, decoder)
+                if entries:
+                    yield entries
             else:
                 logger.info(f"No new messages for '{stream_name}:{group_name}:{consumer_name}'.")
                 break
@@ -219,6 +389,151 @@ def events_consumer(
             raise e
 
 
+def _decode_messages(
+        connection: redis.Redis,
+        stream_name: str,
+        group_name: str,
+        messages: list[tuple[bytes, dict[bytes, bytes]]],
+        codec: JSONCodec | None = None,
+        decoder: PayloadDecoder | None = None
+) -> list[StreamEntry]:
+    """Create the stream entries of a set of messages.
+
+    Messages that can't be decoded (e.g., the payload was compressed
+    with an unknown algorithm or dictionary) are moved to the
+    dead-letter stream and acknowledged, so they don't block the
+    rest of the page nor are delivered again.
+
+    :param connection: Redis connection
+    :param stream_name: Name of the stream
+    :param group_name: Name of the group
+    :param messages: messages read from the stream
+    :param codec: JSON codec used to decode the events
+    :param decoder: decoder of the payload of the entries
+
+    :returns: the entries of the messages that could be decoded
+    """
+    entries = []
+    undecodable = []
+
+    for message in messages:
+        try:
+            entries.append(StreamEntry.from_message(message, codec, decoder))
+        except Exception as e:
+            logger.error(f"Event {message[0]} from '{stream_name}' can't be decoded: {e}")
+            undecodable.append(message)
+
+    if undecodable:
+        dead_letter = dead_letter_stream_name(stream_name)
+
+        with connection.pipeline() as pipe:
+            for message_id, fields in undecodable:
+                pipe.xadd(dead_letter, {**fields, b'message_id': message_id})
+            pipe.xack(stream_name, group_name, *[message_id for message_id, _ in undecodable])
+            pipe.execute()
+
+        logger.warning(f"{len(undecodable)} events moved to '{dead_letter}'")
+
+    return entries
+
+
+def dead_letter_stream_name(stream_name: str) -> str:
+    """Return the name of the dead-letter stream of a stream.
+
+    Events that archivists can't decode are moved there, so they
+    can be inspected or published again.
+
+    :param stream_name: Name of the stream
+    """
+    return f"{stream_name}:{DEAD_LETTER_SUFFIX}"
+
+
+def ack_stream_entries(
+        connection: redis.Redis,
+        stream_name: str,
+        group_name: str,
+        message_ids: list[bytes | str]
+) -> int:
+    """Acknowledge a set of entries of a Redis stream.
+
+    All the entries are acknowledged with a single call.
+
+    :param connection: Redis connection
+    :param stream_name: Name of the stream
+    :param group_name: Name of the group
+    :param message_ids: Ids of the entries to acknowledge
+
+    :returns: number of entries acknowledged
+    """
+    if not message_ids:
+        return 0
+
+    return connection.xack(stream_name, group_name, *message_ids)
+
+
+class StreamEntry:
+    """Event read from a Redis stream.
+
+    The event is kept as the JSON document published in the stream,
+    so storage backends can write it without decoding it. It is only
+    decoded when the property `event` is accessed.
+
+    Producers publish the id of the event in the field 'id' of the
+    entry. When the entry doesn't have it, the id is obtained from
+    the event. The event can be published compressed; in that
+    case, it's decompressed when the entry is created.
+
+    :param message_id: id of the entry in the stream
+    :param data: event encoded as JSON
+    :param event_id: id of the event
+    :param codec: JSON codec used to decode the event; when it's
+        not set, the default codec is used
+    """
+    __slots__ = ('message_id', 'data', 'codec', '_event_id', '_event')
+
+    def __init__(self, message_id: bytes, data: bytes,
+                 event_id: str | None = None,
+                 codec: JSONCodec | None = None) -> None:
+        self.message_id = message_id
+        self.data = data
+        self.codec = codec or get_codec()
+        self._event_id = event_id
+        self._event = None
+
+    @classmethod
+    def from_message(cls, message: tuple[bytes, dict[bytes, bytes]],
+                     codec: JSONCodec | None = None,
+                     decoder: PayloadDecoder | None = None) -> StreamEntry:
+        """Create a new instance from a message read from a stream."""
+
+        message_id, fields = message
+        event_id = fields.get(b'id', None)
+
+        if event_id is not None:
+            event_id = event_id.decode('utf-8')
+
+        decoder = decoder or PayloadDecoder()
+        data = decoder.decode(fields)
+
+        return cls(message_id, data, event_id, codec)
+
+    @property
+    def event(self) -> dict[str, Any]:
+        """Return the event decoded."""
+
+        if self._event is None:
+            self._event = self.codec.loads(self.data)
+        return self._event
+
+    @property
+    def event_id(self) -> str:
+        """Return the id of the event."""
+
+        if self._event_id is None:
+            self._event_id = self.event['id']
+        return self._event_id
+
+
 class ArchivistProgress:
     """Class to store the progress of an Archivist job.
 
@@ -227,18 +542,22 @@ class ArchivistProgress:
     :param job_id: job identifier
     :param backend: backend used to store the events
     :param group: group used to fetch the events
+    :param total: number of events stored
+    :param rate: number of events stored per second
     """
     def __init__(self,
                  job_id: str,
                  backend: str,
                  group: str,
                  consumer_name: str,
-                 total: int = 0) -> None:
+                 total: int = 0,
+                 rate: float = 0) -> None:
         self.job_id = job_id
         self.backend = backend
         self.group = group
         self.consumer_name = consumer_name
         self.total = total
+        self.rate = rate
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> ArchivistProgress:
@@ -249,7 +568,8 @@ class ArchivistProgress:
             data['backend'],
             data['group'],
             data['consumer_name'],
-            data['total']
+            data['total'],
+            rate=data.get('rate', 0)
         )
 
     def to_dict(self) -> dict[str, str | int]:
@@ -260,7 +580,8 @@ class ArchivistProgress:
             'backend': self.backend,
             'group': self.group,
             'consumer_name': self.consumer_name,
-            'total': self.total
+            'total': self.total,
+            'rate': self.rate
         }
 
         return result
@@ -272,19 +593,40 @@ class StorageBackend:
     This class defines the methods that should be implemented by
     a storage backend.
 
+    Backends that store events in bulk requests must split them
+    so they don't exceed `max_items_bulk` events or `max_bytes_bulk`
+    bytes, unless a single event is larger than that.
+
     :param url: URL of the storage backend
+    :param db_name: name of the database to use
+    :param verify_certs: verify certificates when connecting
+    :param max_items_bulk: maximum number of events on each request
+    :param max_bytes_bulk: maximum size in bytes of each request
+    :param codec: JSON codec used to encode the events; when it's
+        not set, the default codec is used
     """
-    def __init__(self, url: str, db_name: str, verify_certs: bool = False) -> None:
+    def __init__(self, url: str, db_name: str, verify_certs: bool = False,
+                 max_items_bulk: int = MAX_ITEMS_BULK,
+                 max_bytes_bulk: int = MAX_BYTES_BULK,
+                 codec: JSONCodec | None = None) -> None:
         self.url = url
         self.db_name = db_name
         self.verify_certs = verify_certs
+        self.max_items_bulk = max_items_bulk
+        self.max_bytes_bulk = max_bytes_bulk
+        self.codec = codec or get_codec()
+
+    def store(self, entries: list[StreamEntry]) -> list[bytes]:
+        """Store events in the storage backend.
 
-    def store(self, data: dict[str, Any]) -> int:
-        """Store data in the storage backend.
+        Events are given as entries of a stream. The backend must
+        return the ids of those entries that were persisted, so they
+        are the only ones acknowledged. Entries that were not
+        persisted will be delivered again.
 
-        :param data: Data to store
+        :param entries: stream entries to store
 
-        :return: Number of items stored
+        :return: ids of the entries stored
         """
         raise NotImplementedError
 
@@ -363,15 +705,20 @@ class OpenSearchStorage(StorageBackend):
         }
     }
 
-    def __init__(self, url: str, db_name: str, verify_certs: bool = False) -> None:
-        super().__init__(url, db_name, verify_certs)
+    def __init__(self, url: str, db_name: str, verify_certs: bool = False,
+                 max_items_bulk: int = MAX_ITEMS_BULK,
+                 max_bytes_bulk: int = MAX_BYTES_BULK,
+                 codec: JSONCodec | None = None) -> None:
+        super().__init__(url, db_name, verify_certs,
+                         max_items_bulk=max_items_bulk,
+                         max_bytes_bulk=max_bytes_bulk,
+                         codec=codec)
 
         if not verify_certs:
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
         self.client = OpenSearch([url], verify_certs=self.verify_certs)
         self._create_index(db_name)
-        self.max_items_bulk = 100
 
     def _create_index(self, index_name: str) -> None:
         """Create an index in the OpenSearch instance.
@@ -386,50 +733,142 @@ class OpenSearchStorage(StorageBackend):
             else:
                 raise
 
-    def _bulk(self, body: str, index: str) -> int:
+    def _bulk(self, body: bytes, index: str, message_ids: list[bytes]) -> list[bytes]:
         """Store data in the OpenSearch instance.
 
+        Items in the response of a bulk request are sorted in the
+        same order as in the request, so the id of each item is
+        matched with the id of the stream entry that generated it.
+
         :param body: Data to store
         :param index: Name of the index
-        """
-        failed_items = []
+        :param message_ids: Ids of the stream entries included in the body
 
+        :returns: ids of the stream entries stored
+        """
         response = self.client.bulk(body=body, index=index)
 
-        if response['errors']:
+        if not response['errors']:
+            stored_ids = message_ids
+        else:
+            stored_ids = []
+            failed_items = []
+
+            for message_id, item in zip(message_ids, response['items']):
+                if 'error' in item['index']:
+                    failed_items.append(item['index'])
+                else:
+                    stored_ids.append(message_id)
+
             # Due to multiple errors that may be thrown when inserting bulk data, only the first error is returned
-            failed_items = [item['index'] for item in response['items'] if 'error' in item['index']]
             error = str(failed_items[0]['error'])
 
             logger.error(f"Failed to insert data to ES: {error}")
 
-        inserted_items = len(response['items']) - len(failed_items)
-
-        logger.info(f"{inserted_items} items uploaded to ES")
+        logger.info(f"{len(stored_ids)} items uploaded to ES")
 
-        return inserted_items
+        return stored_ids
 
-    def store(self, events: iter) -> None:
+    def store(self, entries: list[StreamEntry]) -> list[bytes]:
         """Store data in the OpenSearch instance.
 
-        :param events: Events to store
+        Events are encoded into bulk requests that are sent when
+        they reach the maximum number of items or the maximum size.
+        The JSON document of each event is copied as it was read
+        from the stream, without decoding it.
+
+        :param entries: stream entries with the events to store
+
+        :returns: ids of the entries stored
+        """
+        stored_ids = []
+        bulk = BulkBodyBuilder()
+
+        for entry in entries:
+            source = entry.data
+
+            # Each document must be written in a single line
+            if b'\n' in source:
+                source = self.codec.dumps(entry.event)
+
+            data = bulk.encode(entry.event_id, source, self.codec)
+
+            if bulk.items and bulk.size + len(data) > self.max_bytes_bulk:
+                stored_ids += self._bulk(body=bulk.body(), index=self.db_name,
+                                         message_ids=bulk.message_ids)
+                bulk.clear()
+
+            bulk.add(entry.message_id, data)
+
+            if bulk.items >= self.max_items_bulk:
+                stored_ids += self._bulk(body=bulk.body(), index=self.db_name,
+                                         message_ids=bulk.message_ids)
+                bulk.clear()
+
+        if bulk.items > 0:
+            stored_ids += self._bulk(body=bulk.body(), index=self.db_name,
+                                     message_ids=bulk.message_ids)
+
+        return stored_ids
+
+
+class BulkBodyBuilder:
+    """Build the body of OpenSearch bulk requests.
+
+    Each event is written as an 'index' action line followed by
+    its source line, in a bytes buffer that is reused between
+    requests. The ids of the stream entries added are kept in
+    the same order, so they can be matched with the items of the
+    bulk response.
+    """
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self.message_ids = []
+
+    @property
+    def items(self) -> int:
+        """Number of events in the body."""
+
+        return len(self.message_ids)
+
+    @property
+    def size(self) -> int:
+        """Size of the body in bytes."""
+
+        return len(self._buffer)
+
+    @staticmethod
+    def encode(event_id: str, source: bytes,
+               codec: JSONCodec | None = None) -> bytes:
+        """Encode the action and source lines of an event.
+
+        :param event_id: id of the event, used as document id
+        :param source: event encoded as JSON
+        :param codec: JSON codec used to encode the id
+        """
+        codec = codec or get_codec()
+
+        return b''.join([
+            b'{"index":{"_id":', codec.dumps(event_id), b'}}\n',
+            source, b'\n'
+        ])
+
+    def add(self, message_id: bytes, data: bytes) -> None:
+        """Add an encoded event to the body.
+
+        :param message_id: id of the stream entry of the event
+        :param data: event encoded with `encode`
         """
-        current = 0
-        new_items = 0
+        self._buffer += data
+        self.message_ids.append(message_id)
 
-        bulk_json = ""
-        for event in events:
-            data_json = json.dumps(event)
-            bulk_json += '{{"index" : {{"_id" : "{}" }} }}\n'.format(event['id'])
-            bulk_json += data_json + "\n"
-            current += 1
+    def body(self) -> bytes:
+        """Return the body of the request."""
 
-            if current >= self.max_items_bulk:
-                new_items += self._bulk(body=bulk_json, index=self.db_name)
-                current = 0
-                bulk_json = ""
+        return bytes(self._buffer)
 
-        if current > 0:
-            new_items += self._bulk(body=bulk_json, index=self.db_name)
+    def clear(self) -> None:
+        """Remove the events from the body."""
 
-        return new_items
+        self._buffer.clear()
+        self.message_ids = []
@@ -19,6 +19,7 @@
 from __future__ import annotations
 
 import logging
+import time
 import typing
 
 import cloudevents.conversion
@@ -30,11 +31,25 @@ import chronicler.eventizer
 
 from grimoirelab_toolkit.datetime import str_to_datetime
 
+from ...scheduler.codecs import DEFAULT_CODEC, get_codec
+from ...scheduler.compression import encode_payload, get_compressor
 from ...scheduler.errors import NotFoundError
+from ...scheduler.jobs import PROGRESS_INTERVAL, ProgressReporter
+from ...scheduler.streams import (
+    get_stream_partition,
+    stream_backlog,
+    stream_partition_name
+)
 
 if typing.TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Callable, Iterator
     from datetime import datetime
+    import redis
+
+
+PUBLISH_BATCH_SIZE = 100
+PUBLISH_FLUSH_INTERVAL = 1  # seconds
+THROTTLE_INTERVAL = 1  # seconds
 
 
 logger = logging.getLogger('chronicler')
@@ -45,7 +60,19 @@ def chronicler_job(
     datasource_category: str,
     events_stream: str,
     stream_max_length: int,
-    job_args: dict[str, Any] = None
+    job_args: dict[str, Any] = None,
+    batch_size: int = PUBLISH_BATCH_SIZE,
+    flush_interval: float = PUBLISH_FLUSH_INTERVAL,
+    json_codec: str = DEFAULT_CODEC,
+    compression: str | None = None,
+    compression_level: int | None = None,
+    compression_dict: str | None = None,
+    high_water_mark: int = 0,
+    low_water_mark: int | None = None,
+    throttle_interval: float = THROTTLE_INTERVAL,
+    max_throttle_time: float | None = None,
+    progress_interval: float = PROGRESS_INTERVAL,
+    partition_key: str | None = None
 ) -> ChroniclerProgress:
     """Fetch and eventize data.
 
@@ -58,17 +85,50 @@ def chronicler_job(
     Data will be fetched using `perceval` and eventized using
     `chronicler`.
 
+    The progress is saved, at most every `progress_interval` seconds,
+    while the job runs. It includes the summary of the items fetched
+    so far and the fetch rate, so a recovery can resume from there.
+
     :param datasource_type: type of the datasource
         (e.g., 'git', 'github')
     :param datasource_category: category of the datasource
         (e.g., 'pull_request', 'issue')
-    :param events_stream: Redis queue where the events will be published
+    :param events_stream: Redis queue where the events will be published;
+        when `partition_key` is set, the name of the partitioned stream
     :param stream_max_length: maximum length of the stream
     :param job_args: extra arguments to pass to the job
         (e.g., 'url', 'owner', 'repository')
+    :param batch_size: number of events published at once
+    :param flush_interval: maximum time, in seconds, an event waits
+        in the buffer before it is published
+    :param json_codec: name of the JSON codec used to encode the events
+    :param compression: algorithm used to compress the events
+        published (e.g., 'zlib', 'zstd'); None or 'none' to publish
+        them uncompressed
+    :param compression_level: compression level
+    :param compression_dict: path to the shared compression dictionary
+    :param high_water_mark: number of events not yet processed by
+        the consumers of the stream that pauses the publication;
+        0 to disable the flow control
+    :param low_water_mark: number of events not yet processed that
+        resumes the publication once it was paused
+    :param throttle_interval: time, in seconds, between checks of
+        the consumers while the publication is paused
+    :param max_throttle_time: maximum time, in seconds, the publication
+        is paused; None to wait until consumers catch up
+    :param progress_interval: minimum time, in seconds, between
+        updates of the progress of the job while it runs
+    :param partition_key: key used to select the partition of the
+        stream (e.g., the task uuid); None to publish the events
+        in `events_stream`
     """
     rq_job = rq.get_current_job()
 
+    # The partition is resolved when the job runs, so jobs
+    # enqueued before a rebalance publish in the right one.
+    if partition_key is not None:
+        events_stream = _events_stream_partition(events_stream, partition_key)
+
     try:
         backends = perceval.backend.find_backends(perceval.backends)[0]
         backend_class = backends[datasource_type]
@@ -91,24 +151,266 @@ def chronicler_job(
     )
     rq_job.progress = progress
 
+    codec = get_codec(json_codec)
+    compressor = get_compressor(compression,
+                                level=compression_level,
+                                dictionary_path=compression_dict)
+    if high_water_mark > 0:
+        flow_control = StreamFlowControl(rq_job.connection,
+                                         events_stream,
+                                         high_water_mark,
+                                         low_water_mark=low_water_mark,
+                                         check_interval=throttle_interval,
+                                         max_wait=max_throttle_time)
+    else:
+        flow_control = None
+
+    publisher = EventsPublisher(rq_job.connection,
+                                events_stream,
+                                stream_max_length,
+                                batch_size=batch_size,
+                                flush_interval=flush_interval,
+                                flow_control=flow_control,
+                                on_throttle=progress.add_throttle)
+
+    def checkpoint(fetched: int, rate: float) -> None:
+        # Events of the items fetched so far must be published
+        # before saving the progress; otherwise, a recovery
+        # could skip items whose events were lost.
+        publisher.flush()
+        progress.summary = perceval_gen.summary
+        progress.rate = rate
+
+    reporter = ProgressReporter(rq_job,
+                                interval=progress_interval,
+                                on_report=checkpoint)
+
     # The chronicler generator will eventize the data items
     # that are fetched by the perceval generator.
     try:
-        events = chronicler.eventizer.eventize(datasource_type,
-                                               perceval_gen.items)
+        items = _report_items(perceval_gen.items, reporter)
+        events = chronicler.eventizer.eventize(datasource_type, items)
         for event in events:
-            data = cloudevents.conversion.to_json(event)
+            data = codec.dumps(cloudevents.conversion.to_dict(event))
+            # The id is also published apart, so consumers
+            # can use it without decoding the event.
             message = {
-                'data': data
+                'id': event['id'],
+                **encode_payload(data, compressor)
             }
-            rq_job.connection.xadd(events_stream, message,
-                                   maxlen=stream_max_length)
+            publisher.publish(message)
     finally:
-        progress.summary = perceval_gen.summary
+        # Events already eventized must be published even when
+        # the job fails; otherwise, they will be lost.
+        try:
+            publisher.flush()
+        finally:
+            progress.summary = perceval_gen.summary
+            progress.rate = reporter.rate
 
     return progress
 
 
+def _report_items(items: Iterator[dict[str, Any]],
+                  reporter: ProgressReporter) -> Iterator[dict[str, Any]]:
+    """Report the progress every time an item is completely eventized.
+
+    The eventizer requests a new item once all the events of the
+    previous one were generated, and the summary of the fetch is
+    only updated when the next item is fetched, so the progress
+    is always reported between items.
+    """
+    for item in items:
+        yield item
+        reporter.update()
+
+
+def _events_stream_partition(stream_name: str, key: str) -> str:
+    """Return the partition of the events stream for a key.
+
+    The number of partitions is read from the current settings.
+    """
+    from django.conf import settings
+
+    partition = get_stream_partition(key, settings.GRIMOIRELAB_EVENTS_STREAM_PARTITIONS)
+
+    return stream_partition_name(stream_name, partition)
+
+
+class EventsPublisher:
+    """Publish events in a Redis stream in batches.
+
+    Messages are buffered and sent to the stream using a Redis
+    pipeline, so a batch of events only costs one round trip.
+    The buffer is flushed when it reaches `batch_size` messages or
+    when a message is published and the oldest buffered message
+    has been waiting for more than `flush_interval` seconds.
+    Call `flush` to publish the remaining messages.
+
+    The stream is trimmed to `stream_max_length` entries on each
+    insertion, like when messages are added one by one.
+
+    When `flow_control` is set, each batch waits until the consumers
+    of the stream are not too far behind, so events are not trimmed
+    before they are processed. The function `on_throttle` is called
+    with the time waited every time the publication is paused.
+
+    :param connection: Redis connection
+    :param stream_name: name of the stream where messages are published
+    :param stream_max_length: maximum length of the stream
+    :param batch_size: maximum number of messages to buffer
+    :param flush_interval: maximum time, in seconds, a message can
+        wait in the buffer
+    :param flow_control: flow control of the stream
+    :param on_throttle: function called when the publication is paused
+    """
+    def __init__(self, connection: redis.Redis, stream_name: str,
+                 stream_max_length: int,
+                 batch_size: int = PUBLISH_BATCH_SIZE,
+                 flush_interval: float = PUBLISH_FLUSH_INTERVAL,
+                 flow_control: StreamFlowControl | None = None,
+                 on_throttle: Callable[[float], None] | None = None) -> None:
+        if batch_size < 1:
+            raise ValueError("'batch_size' must be greater than 0")
+
+        self.connection = connection
+        self.stream_name = stream_name
+        self.stream_max_length = stream_max_length
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flow_control = flow_control
+        self.on_throttle = on_throttle
+        self.published = 0
+        self._buffer = []
+        self._buffered_at = None
+
+    def publish(self, message: dict[str, Any]) -> None:
+        """Add a message to the buffer, publishing it when needed.
+
+        :param message: fields and values of the stream entry
+        """
+        if not self._buffer:
+            self._buffered_at = time.monotonic()
+
+        self._buffer.append(message)
+
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        elif time.monotonic() - self._buffered_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> int:
+        """Publish the buffered messages.
+
+        :returns: number of messages published
+        """
+        if not self._buffer:
+            return 0
+
+        if self.flow_control:
+            waited = self.flow_control.wait()
+            if waited is not None and self.on_throttle:
+                self.on_throttle(waited)
+
+        pipe = self.connection.pipeline(transaction=False)
+        for message in self._buffer:
+            pipe.xadd(self.stream_name, message,
+                      maxlen=self.stream_max_length)
+        pipe.execute()
+
+        nmessages = len(self._buffer)
+        self.published += nmessages
+        self._buffer = []
+        self._buffered_at = None
+
+        return nmessages
+
+
+class StreamFlowControl:
+    """Pause producers when the consumers of a stream fall behind.
+
+    The backlog of a consumer group is the number of entries not
+    delivered to the group yet (its lag) plus the entries delivered
+    but not acknowledged. When the backlog of any group reaches the
+    `high_water_mark`, producers wait until it drops to the
+    `low_water_mark`, checking it every `check_interval` seconds.
+    Using two marks prevents pausing and resuming on every batch.
+
+    The high water mark must be lower than the maximum length
+    of the stream, so entries are not trimmed before they are
+    consumed. If producers wait longer than `max_wait` seconds,
+    they resume the publication anyway.
+
+    :param connection: Redis connection
+    :param stream_name: name of the stream
+    :param high_water_mark: backlog that pauses the producers
+    :param low_water_mark: backlog that resumes the producers; by
+        default, 80% of the high water mark
+    :param check_interval: time, in seconds, between checks while
+        producers are paused
+    :param max_wait: maximum time, in seconds, producers are paused;
+        None to wait until consumers catch up
+    """
+    def __init__(self, connection: redis.Redis, stream_name: str,
+                 high_water_mark: int,
+                 low_water_mark: int | None = None,
+                 check_interval: float = THROTTLE_INTERVAL,
+                 max_wait: float | None = None) -> None:
+        if high_water_mark < 1:
+            raise ValueError("'high_water_mark' must be greater than 0")
+
+        if low_water_mark is None:
+            low_water_mark = int(high_water_mark * 0.8)
+        elif low_water_mark > high_water_mark:
+            raise ValueError("'low_water_mark' can't be greater than 'high_water_mark'")
+
+        self.connection = connection
+        self.stream_name = stream_name
+        self.high_water_mark = high_water_mark
+        self.low_water_mark = low_water_mark
+        self.check_interval = check_interval
+        self.max_wait = max_wait
+
+    def backlog(self) -> int:
+        """Return the backlog of the slowest consumer group."""
+
+        return stream_backlog(self.connection, self.stream_name)
+
+    def wait(self) -> float | None:
+        """Wait until the consumers are not too far behind.
+
+        :returns: the time waited, in seconds, or None when the
+            producer didn't need to wait
+        """
+        backlog = self.backlog()
+
+        if backlog < self.high_water_mark:
+            return None
+
+        logger.info(f"Stream '{self.stream_name}' backlog reached {backlog} events; "
+                    f"publication paused")
+
+        started_at = time.monotonic()
+
+        while True:
+            time.sleep(self.check_interval)
+
+            waited = time.monotonic() - started_at
+            backlog = self.backlog()
+
+            if backlog <= self.low_water_mark:
+                break
+            if self.max_wait is not None and waited >= self.max_wait:
+                logger.warning(f"Stream '{self.stream_name}' backlog still at {backlog} events "
+                               f"after {waited:.0f}s; publication resumed")
+                break
+
+        logger.info(f"Stream '{self.stream_name}' backlog dropped to {backlog} events; "
+                    f"publication resumed after {waited:.1f}s")
+
+        return waited
+
+
 class ChroniclerProgress:
     """Class to store the progress of a Chronicler job.
 
@@ -116,16 +418,38 @@ class ChroniclerProgress:
     such as the task and job identifiers, the backend and the
     category of the items generated.
 
+    The number of times the publication of events was paused,
+    because the consumers were behind, and the time spent waiting
+    are also stored.
+
     :param job_id: job identifier
     :param backend: backend used to fetch the items
     :param category: category of the fetched items
+    :param summary: summary of the items fetched
+    :param throttles: number of times the publication was paused
+    :param throttled_time: time, in seconds, the publication was paused
+    :param rate: number of items fetched per second
     """
     def __init__(self, job_id: str, backend: str, category: str,
-                 summary: perceval.backend.Summary | None = None) -> None:
+                 summary: perceval.backend.Summary | None = None,
+                 throttles: int = 0,
+                 throttled_time: float = 0,
+                 rate: float = 0) -> None:
         self.job_id = job_id
         self.backend = backend
         self.category = category
         self.summary = summary
+        self.throttles = throttles
+        self.throttled_time = throttled_time
+        self.rate = rate
+
+    def add_throttle(self, waited: float) -> None:
+        """Record a pause in the publication of events.
+
+        :param waited: time paused, in seconds
+        """
+        self.throttles += 1
+        self.throttled_time += waited
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> ChroniclerProgress:
@@ -155,7 +479,10 @@ class ChroniclerProgress:
             data['job_id'],
             data['backend'],
             data['category'],
-            summary=summary
+            summary=summary,
+            throttles=data.get('throttles', 0),
+            throttled_time=data.get('throttled_time', 0),
+            rate=data.get('rate', 0)
         )
 
     def to_dict(self) -> dict[str, str | int]:
@@ -191,7 +518,10 @@ class ChroniclerProgress:
             'job_id': self.job_id,
             'backend': self.backend,
             'category': self.category,
-            'summary': summary
+            'summary': summary,
+            'throttles': self.throttles,
+            'throttled_time': self.throttled_time,
+            'rate': self.rate
         }
 
         return result
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.18 on 2026-10-18 04:51
+
+from django.db import migrations, models
+import grimoirelab.core.models
+import grimoirelab_toolkit.datetime
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_storagetask_storagejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobLogChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', grimoirelab.core.models.CreationDateTimeField(default=grimoirelab_toolkit.datetime.datetime_utcnow, editable=False)),
+                ('last_modified', grimoirelab.core.models.LastModificationDateTimeField(default=grimoirelab_toolkit.datetime.datetime_utcnow, editable=False)),
+                ('job_uuid', models.CharField(max_length=191)),
+                ('first_entry', models.PositiveIntegerField()),
+                ('nentries', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+            ],
+            options={
+                'unique_together': {('job_uuid', 'first_entry')},
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.18 on 2026-10-18 04:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_joblogchunk'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventizerjob',
+            index=models.Index(fields=['task', 'job_num'], name='tasks_event_task_id_2b28a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventizerjob',
+            index=models.Index(fields=['task', 'scheduled_at'], name='tasks_event_task_id_be6f10_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventizertask',
+            index=models.Index(fields=['status', 'scheduled_at'], name='tasks_event_status_b40c90_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventizertask',
+            index=models.Index(fields=['scheduled_at'], name='tasks_event_schedul_a5e401_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='storagejob',
+            index=models.Index(fields=['task', 'job_num'], name='tasks_stora_task_id_64b613_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='storagejob',
+            index=models.Index(fields=['task', 'scheduled_at'], name='tasks_stora_task_id_934e46_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='storagetask',
+            index=models.Index(fields=['status', 'scheduled_at'], name='tasks_stora_status_522704_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='storagetask',
+            index=models.Index(fields=['scheduled_at'], name='tasks_stora_schedul_878f75_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.18 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_scheduler_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventizertask',
+            index=models.Index(fields=['last_modified'], name='tasks_event_last_mo_553635_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='storagetask',
+            index=models.Index(fields=['last_modified'], name='tasks_stora_last_mo_d1190f_idx'),
+        ),
+    ]
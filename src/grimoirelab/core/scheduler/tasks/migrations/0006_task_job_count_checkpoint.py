@@ -0,0 +1,97 @@
+# Generated by Django 4.2.18 on 2026-10-18 05:11
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import grimoirelab.core.scheduler.models
+
+
+BATCH_SIZE = 1000
+
+
+def set_job_count_and_checkpoint(apps, schema_editor):
+    """Set the counter and the checkpoint of the existing tasks.
+
+    The counter is the number of the latest job of each task. The
+    checkpoint is taken from the latest job that finished, because
+    jobs enqueued or running don't have any progress yet.
+    """
+    from grimoirelab.core.scheduler.models import SchedulerStatus
+
+    models = [
+        (apps.get_model('tasks', 'EventizerTask'), apps.get_model('tasks', 'EventizerJob')),
+        (apps.get_model('tasks', 'StorageTask'), apps.get_model('tasks', 'StorageJob')),
+    ]
+
+    for task_class, job_class in models:
+        latest_job_num = job_class.objects.filter(
+            task=OuterRef('pk')
+        ).order_by('-job_num').values('job_num')[:1]
+
+        finished_job = job_class.objects.filter(
+            task=OuterRef('pk'),
+            status__in=[SchedulerStatus.COMPLETED, SchedulerStatus.FAILED]
+        ).order_by('-job_num').values('pk')[:1]
+
+        tasks = task_class.objects.annotate(
+            latest_job_num=Subquery(latest_job_num),
+            finished_job_id=Subquery(finished_job)
+        ).filter(latest_job_num__isnull=False).order_by('pk')
+
+        batch = []
+        for task in tasks.iterator(chunk_size=BATCH_SIZE):
+            batch.append(task)
+            if len(batch) >= BATCH_SIZE:
+                _update_tasks(task_class, job_class, batch)
+                batch = []
+        if batch:
+            _update_tasks(task_class, job_class, batch)
+
+
+def _update_tasks(task_class, job_class, tasks):
+    jobs = job_class.objects.in_bulk(
+        [task.finished_job_id for task in tasks if task.finished_job_id]
+    )
+
+    for task in tasks:
+        task.job_count = task.latest_job_num
+
+        job = jobs.get(task.finished_job_id, None)
+        if job:
+            task.checkpoint = {
+                'job_args': job.job_args,
+                'progress': job.progress
+            }
+
+    task_class.objects.bulk_update(tasks, ['job_count', 'checkpoint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_last_modified_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventizertask',
+            name='checkpoint',
+            field=models.JSONField(default=None, encoder=grimoirelab.core.scheduler.models.JobResultEncoder, null=True),
+        ),
+        migrations.AddField(
+            model_name='eventizertask',
+            name='job_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='storagetask',
+            name='checkpoint',
+            field=models.JSONField(default=None, encoder=grimoirelab.core.scheduler.models.JobResultEncoder, null=True),
+        ),
+        migrations.AddField(
+            model_name='storagetask',
+            name='job_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(set_job_count_and_checkpoint,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.18 on 2026-10-18 05:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_job_count_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='eventizerjob',
+            name='status',
+            field=models.IntegerField(choices=[(1, 'new'), (2, 'enqueued'), (3, 'running'), (4, 'completed'), (5, 'failed'), (6, 'recovery'), (7, 'paused')], default=2),
+        ),
+        migrations.AlterField(
+            model_name='eventizertask',
+            name='status',
+            field=models.IntegerField(choices=[(1, 'new'), (2, 'enqueued'), (3, 'running'), (4, 'completed'), (5, 'failed'), (6, 'recovery'), (7, 'paused')], default=1),
+        ),
+        migrations.AlterField(
+            model_name='storagejob',
+            name='status',
+            field=models.IntegerField(choices=[(1, 'new'), (2, 'enqueued'), (3, 'running'), (4, 'completed'), (5, 'failed'), (6, 'recovery'), (7, 'paused')], default=2),
+        ),
+        migrations.AlterField(
+            model_name='storagetask',
+            name='status',
+            field=models.IntegerField(choices=[(1, 'new'), (2, 'enqueued'), (3, 'running'), (4, 'completed'), (5, 'failed'), (6, 'recovery'), (7, 'paused')], default=1),
+        ),
+    ]
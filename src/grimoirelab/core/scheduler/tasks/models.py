@@ -21,8 +21,16 @@ from __future__ import annotations
 import typing
 
 from django.conf import settings
-from django.db.models import CharField
+from django.db.models import (
+    BinaryField,
+    CharField,
+    F,
+    PositiveIntegerField,
+    Sum
+)
 
+from ...scheduler.codecs import get_codec
+from ...scheduler.compression import ZlibCompressor
 from ...scheduler.models import (
     SchedulerStatus,
     Task,
@@ -32,16 +40,31 @@ from ...scheduler.scheduler import (
     _on_success_callback,
     _on_failure_callback
 )
-from ...models import MAX_SIZE_CHAR_FIELD
+from ...scheduler.streams import (
+    get_stream_partition,
+    stream_partition_name
+)
+from ...models import (
+    BaseModel,
+    MAX_SIZE_CHAR_FIELD,
+    MAX_SIZE_CHAR_INDEX
+)
 from .chronicler import (
     chronicler_job,
     ChroniclerProgress,
     get_chronicler_argument_generator
 )
-from .archivist import archivist_job
+from .archivist import (
+    MAX_BYTES_BULK,
+    MAX_EVENTS_PER_JOB,
+    MAX_IN_FLIGHT,
+    MAX_ITEMS_BULK,
+    READ_COUNT,
+    archivist_job
+)
 
 if typing.TYPE_CHECKING:
-    from typing import Any, Self
+    from typing import Any, Iterable, Self
 
 
 class EventizerTask(Task):
@@ -69,7 +92,7 @@ class EventizerTask(Task):
     TASK_TYPE = 'eventizer'
 
     @classmethod
-    def create_task(
+    def build_task(
         cls,
         task_args: dict[str, Any],
         job_interval: int,
@@ -79,9 +102,9 @@ class EventizerTask(Task):
         burst: bool = False,
         *args, **kwargs
     ) -> Self:
-        """Create a new task to eventize data.
+        """Build a new task to eventize data.
 
-        This method will create a new task to eventize data from a
+        This method will build a new task to eventize data from a
         a repository. Besides the common arguments to create a task,
         this method requires the type of the datasource and the category
         of items to eventize.
@@ -96,15 +119,14 @@ class EventizerTask(Task):
         :param args: additional arguments.
         :param kwargs: additional keyword arguments.
 
-        :return: the new task created.
+        :return: the new task, not saved yet.
         """
-        task = super().create_task(
+        task = super().build_task(
             task_args, job_interval, job_max_retries, burst=burst,
             *args, **kwargs
         )
         task.datasource_type = datasource_type
         task.datasource_category = datasource_category
-        task.save()
 
         return task
 
@@ -120,23 +142,39 @@ class EventizerTask(Task):
             'datasource_type': self.datasource_type,
             'datasource_category': self.datasource_category,
             'events_stream': settings.GRIMOIRELAB_EVENTS_STREAM_NAME,
+            'partition_key': self.uuid,
             'stream_max_length': settings.GRIMOIRELAB_EVENTS_STREAM_MAX_LENGTH,
+            'batch_size': settings.GRIMOIRELAB_EVENTS_STREAM_BATCH_SIZE,
+            'flush_interval': settings.GRIMOIRELAB_EVENTS_STREAM_FLUSH_INTERVAL,
+            'json_codec': settings.GRIMOIRELAB_JSON_CODEC,
+            'compression': settings.GRIMOIRELAB_EVENTS_STREAM_COMPRESSION,
+            'compression_level': settings.GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_LEVEL,
+            'compression_dict': settings.GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_DICT,
+            'high_water_mark': settings.GRIMOIRELAB_EVENTS_STREAM_HIGH_WATER_MARK,
+            'low_water_mark': settings.GRIMOIRELAB_EVENTS_STREAM_LOW_WATER_MARK,
+            'throttle_interval': settings.GRIMOIRELAB_EVENTS_STREAM_THROTTLE_INTERVAL,
+            'max_throttle_time': settings.GRIMOIRELAB_EVENTS_STREAM_MAX_THROTTLE_TIME,
+            'progress_interval': settings.GRIMOIRELAB_JOB_PROGRESS_INTERVAL,
         }
 
         args_gen = get_chronicler_argument_generator(self.datasource_type)
 
-        # Get the latest job arguments used and use them
-        # to prepare the new job arguments.
+        # Get the arguments of the latest job, stored in the
+        # checkpoint, to prepare the new job arguments.
+        checkpoint = self.checkpoint or {}
+
         if self.status == SchedulerStatus.NEW:
             job_args = args_gen.initial_args(self.task_args)
+        elif not checkpoint.get('progress') and self.status in (SchedulerStatus.COMPLETED,
+                                                                SchedulerStatus.RECOVERY):
+            # There isn't any progress to resume from; start again
+            job_args = args_gen.initial_args(self.task_args)
         elif self.status == SchedulerStatus.COMPLETED:
-            job = self.jobs.all().order_by('-job_num').first()
-            progress = ChroniclerProgress.from_dict(job.progress)
-            job_args = args_gen.resuming_args(job.job_args['job_args'], progress)
+            progress = ChroniclerProgress.from_dict(checkpoint['progress'])
+            job_args = args_gen.resuming_args(checkpoint['job_args']['job_args'], progress)
         elif self.status == SchedulerStatus.RECOVERY:
-            job = self.jobs.all().order_by('-job_num').first()
-            progress = ChroniclerProgress.from_dict(job.progress)
-            job_args = args_gen.recovery_args(job.job_args['job_args'], progress)
+            progress = ChroniclerProgress.from_dict(checkpoint['progress'])
+            job_args = args_gen.recovery_args(checkpoint['job_args']['job_args'], progress)
         else:
             job_args = self.task_args
 
@@ -147,6 +185,19 @@ class EventizerTask(Task):
     def can_be_retried(self):
         return True
 
+    @property
+    def events_stream(self) -> str:
+        """Partition of the events stream where events are published.
+
+        The partition is selected using the uuid of the task,
+        so all the events of the task go to the same partition.
+        Jobs resolve it when they run, using the same key, so they
+        follow the changes in the number of partitions.
+        """
+        partition = get_stream_partition(self.uuid,
+                                         settings.GRIMOIRELAB_EVENTS_STREAM_PARTITIONS)
+        return stream_partition_name(settings.GRIMOIRELAB_EVENTS_STREAM_NAME, partition)
+
     @property
     def default_job_queue(self):
         return settings.GRIMOIRELAB_Q_EVENTIZER_JOBS
@@ -178,7 +229,7 @@ class StorageTask(Task):
     TASK_TYPE = 'storager'
 
     @classmethod
-    def create_task(
+    def build_task(
         cls,
         task_args: dict[str, Any],
         job_interval: int,
@@ -187,9 +238,9 @@ class StorageTask(Task):
         burst: bool = False,
         *args, **kwargs
     ) -> Self:
-        """Create a new task to store events in a database.
+        """Build a new task to store events in a database.
 
-        This method will create a new task to store events in a database.
+        This method will build a new task to store events in a database.
         Besides the common arguments to create a task, this method requires
         the name of the Redis stream where events are published.
 
@@ -202,14 +253,13 @@ class StorageTask(Task):
         :param args: additional arguments.
         :param kwargs: additional keyword arguments.
 
-        :return: the new task created.
+        :return: the new task, not saved yet.
         """
-        task = super().create_task(
+        task = super().build_task(
             task_args, job_interval, job_max_retries, burst=burst,
             *args, **kwargs
         )
         task.storage_type = storage_type
-        task.save()
 
         return task
 
@@ -229,8 +279,15 @@ class StorageTask(Task):
             'storage_verify_certs': self.task_args.get('storage_verify_certs'),
             'redis_group': self.task_args.get('redis_group'),
             'consumer_name': self.task_id,
-            'events_queue': settings.GRIMOIRELAB_EVENTS_STREAM_NAME,
-            'limit': self.task_args.get('limit', 5000)
+            'events_queue': self.events_stream,
+            'limit': self.task_args.get('limit', MAX_EVENTS_PER_JOB),
+            'read_count': self.task_args.get('read_count', READ_COUNT),
+            'max_items_bulk': self.task_args.get('max_items_bulk', MAX_ITEMS_BULK),
+            'max_bytes_bulk': self.task_args.get('max_bytes_bulk', MAX_BYTES_BULK),
+            'max_in_flight': self.task_args.get('max_in_flight', MAX_IN_FLIGHT),
+            'json_codec': settings.GRIMOIRELAB_JSON_CODEC,
+            'compression_dict': settings.GRIMOIRELAB_EVENTS_STREAM_COMPRESSION_DICT,
+            'progress_interval': settings.GRIMOIRELAB_JOB_PROGRESS_INTERVAL
         }
 
         return task_args
@@ -238,6 +295,19 @@ class StorageTask(Task):
     def can_be_retried(self):
         return True
 
+    @property
+    def partition(self) -> int:
+        """Partition of the events stream this task consumes."""
+
+        return self.task_args.get('partition', 0)
+
+    @property
+    def events_stream(self) -> str:
+        """Partition of the events stream where events are fetched."""
+
+        return stream_partition_name(settings.GRIMOIRELAB_EVENTS_STREAM_NAME,
+                                     self.partition)
+
     @property
     def default_job_queue(self):
         return settings.GRIMOIRELAB_Q_ARCHIVIST_JOBS
@@ -255,5 +325,98 @@ class StorageTask(Task):
         return _on_failure_callback(*args, **kwargs)
 
 
-register_task_model(EventizerTask.TASK_TYPE, EventizerTask)
-register_task_model(StorageTask.TASK_TYPE, StorageTask)
+class JobLogChunk(BaseModel):
+    """Compressed chunk of the log of a job.
+
+    Jobs only keep their most recent log entries. Older entries
+    are moved to chunks of this model while the job runs, so they
+    don't take memory. Each chunk stores a list of consecutive
+    entries, encoded as a JSON array and compressed with zlib.
+    Chunks are related to jobs by their uuid, because jobs of
+    any type can archive their logs.
+
+    :param job_uuid: uuid of the job that generated the entries
+    :param first_entry: position of the first entry of the chunk
+        in the log of the job
+    :param nentries: number of entries in the chunk
+    :param data: compressed entries
+    """
+    job_uuid = CharField(max_length=MAX_SIZE_CHAR_INDEX)
+    first_entry = PositiveIntegerField()
+    nentries = PositiveIntegerField()
+    data = BinaryField()
+
+    class Meta:
+        unique_together = ['job_uuid', 'first_entry']
+
+    @classmethod
+    def archive(cls, job_uuid: str, first_entry: int, entries: list[bytes]) -> Self:
+        """Archive a list of log entries of a job.
+
+        :param job_uuid: uuid of the job
+        :param first_entry: position of the first entry in the log
+        :param entries: log entries encoded with the JSON codec
+
+        :returns: the new chunk
+        """
+        data = b'[' + b','.join(entries) + b']'
+
+        return cls.objects.create(job_uuid=job_uuid,
+                                  first_entry=first_entry,
+                                  nentries=len(entries),
+                                  data=ZlibCompressor().compress(data))
+
+    @property
+    def entries(self) -> list[dict[str, Any]]:
+        """Return the log entries of the chunk."""
+
+        return get_codec().loads(ZlibCompressor().decompress(bytes(self.data)))
+
+    @classmethod
+    def get_log(cls, job_uuid: str,
+                start: int = 0,
+                end: int | None = None) -> list[dict[str, Any]]:
+        """Return the archived log entries of a job, in order.
+
+        :param job_uuid: uuid of the job
+        :param start: position of the first entry to return
+        :param end: position after the last entry to return;
+            None to return all the entries after `start`
+        """
+        chunks = cls.objects.filter(job_uuid=job_uuid)
+        chunks = chunks.annotate(end=F('first_entry') + F('nentries')).filter(end__gt=start)
+        if end is not None:
+            chunks = chunks.filter(first_entry__lt=end)
+
+        log = []
+        for chunk in chunks.order_by('first_entry').iterator():
+            entries = chunk.entries
+            first = max(start - chunk.first_entry, 0)
+            last = None if end is None else end - chunk.first_entry
+            log.extend(entries[first:last])
+        return log
+
+    @classmethod
+    def count_entries(cls, job_uuid: str) -> int:
+        """Return the number of archived log entries of a job.
+
+        :param job_uuid: uuid of the job
+        """
+        result = cls.objects.filter(job_uuid=job_uuid).aggregate(total=Sum('nentries'))
+        return result['total'] or 0
+
+    @classmethod
+    def delete_logs(cls, job_uuids: Iterable[str]) -> None:
+        """Delete the archived log of a set of jobs.
+
+        Chunks are not removed when their jobs are deleted, so
+        they must be deleted together, with a single query.
+
+        :param job_uuids: uuids of the jobs; a queryset of uuids
+            is used as a subquery
+        """
+        cls.objects.filter(job_uuid__in=job_uuids).delete()
+
+
+_, EventizerJob = register_task_model(EventizerTask.TASK_TYPE, EventizerTask)
+_, StorageJob = register_task_model(StorageTask.TASK_TYPE, StorageTask)
@@ -23,10 +23,13 @@ from . import views
 
 
 urlpatterns = [
+    re_path(r'^add_tasks', views.add_tasks),
     re_path(r'^add_task', views.add_task),
+    path('reconciler/metrics/', views.reconciler_metrics),
     path('tasks/', api.EventizerTaskList.as_view()),
     path('tasks/<str:uuid>/', api.EventizerTaskDetail.as_view()),
     path('tasks/<str:task_id>/jobs/', api.EventizerJobList.as_view()),
     path('tasks/<str:task_id>/jobs/<str:uuid>/', api.EventizerJobDetail.as_view()),
     path('tasks/<str:task_id>/jobs/<str:uuid>/logs/', api.EventizerJobLogs.as_view()),
+    path('tasks/<str:task_id>/jobs/<str:uuid>/logs/stream/', views.job_logs_stream),
 ]
@@ -17,17 +17,32 @@
 #
 
 import json
+import time
+
+import django_rq
 
 from django.conf import settings
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from rest_framework.exceptions import ValidationError
 
+from .api import parse_log_offset, read_job_log
+from .models import SchedulerStatus, get_registered_task_model
+from .reconciler import get_reconciler_metrics
 from .scheduler import (
-    schedule_task
+    schedule_task,
+    schedule_tasks
 )
 
 
+LOG_STREAM_POLL_INTERVAL = 1  # seconds
+LOG_STREAM_KEEPALIVE = 15  # seconds
+LOG_STREAM_MAX_TIME = 5 * 60  # seconds
+
+FINISHED_JOB_STATUS = [SchedulerStatus.COMPLETED, SchedulerStatus.FAILED]
+
+
 @require_http_methods(["POST"])
 @csrf_exempt
 def add_task(request):
@@ -78,3 +93,177 @@ def add_task(request):
         'message': f"Task {task.id} added correctly"
     }
     return JsonResponse(response, safe=False)
+
+
+@require_http_methods(["POST"])
+@csrf_exempt
+def add_tasks(request):
+    """Create a set of Tasks to fetch items
+
+    The body should contain a JSON with the type of the tasks and
+    a list with the arguments of each one, using the same format
+    of `add_task`:
+    {
+        'type': 'eventizer',
+        'tasks': [
+            {
+                'task_args': {
+                    'datasource_type': 'git',
+                    'datasource_category': 'commit',
+                    'backend_args': {
+                        'uri': 'https://github.com/chaoss/grimoirelab.git'
+                    }
+                },
+                'scheduler': {
+                    'job_interval': 86400,
+                    'job_max_retries': 3
+                }
+            },
+            ...
+        ]
+    }
+
+    The response includes the result of each task, in the same
+    order they were sent. Invalid tasks don't prevent the rest
+    from being created.
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+
+    if not isinstance(data, dict) or not isinstance(data.get('tasks', None), list):
+        return JsonResponse({"error": "A list of 'tasks' is required."}, status=400)
+
+    task_type = data.get('type', None)
+
+    try:
+        get_registered_task_model(task_type)
+    except KeyError:
+        return JsonResponse({"error": f"Invalid task type '{task_type}'."}, status=400)
+
+    job_interval = settings.GRIMOIRELAB_JOB_INTERVAL
+    job_max_retries = settings.GRIMOIRELAB_JOB_MAX_RETRIES
+
+    results = [None] * len(data['tasks'])
+    tasks = []
+    positions = []
+
+    for n, item in enumerate(data['tasks']):
+        try:
+            scheduler = item.get('scheduler', {})
+            task_args = item['task_args']
+            tasks.append({
+                'task_args': task_args['backend_args'],
+                'datasource_type': task_args['datasource_type'],
+                'datasource_category': task_args['datasource_category'],
+                'job_interval': scheduler.get('job_interval', job_interval),
+                'job_max_retries': scheduler.get('job_max_retries', job_max_retries)
+            })
+            positions.append(n)
+        except (AttributeError, KeyError, TypeError):
+            results[n] = {'status': 'error', 'message': "Invalid task format."}
+
+    for n, (task, error) in zip(positions, schedule_tasks(task_type, tasks)):
+        if error:
+            results[n] = {'status': 'error', 'message': error}
+        else:
+            results[n] = {'status': 'ok', 'task_id': task.uuid}
+
+    response = {
+        'status': 'ok',
+        'results': results
+    }
+    return JsonResponse(response, safe=False)
+
+
+@require_http_methods(["GET"])
+def reconciler_metrics(request):
+    """Return the metrics of the tasks reconciler.
+
+    They include the date and results of the last sweep (tasks
+    checked and jobs rescheduled) and the totals since the
+    reconciler run for the first time.
+    """
+    metrics = get_reconciler_metrics(django_rq.get_connection())
+
+    return JsonResponse(metrics)
+
+
+@require_http_methods(["GET"])
+def job_logs_stream(request, task_id, uuid):
+    """Stream the log of a job using server-sent events.
+
+    Each log entry is sent as an event with its JSON data. The id
+    of the event is the position of the next entry, so clients
+    that reconnect (sending the header 'Last-Event-ID') continue
+    where they stopped. By default, the stream starts with the
+    most recent entries; use the parameter 'offset' to start
+    from other position.
+
+    The stream finishes with an 'end' event once the job completed
+    or failed, or when it's removed (e.g., its task was canceled).
+    Jobs enqueued are polled until they run. Streams are also closed after a while, so they don't
+    hold a server thread forever; clients will reconnect.
+    """
+    job_class = get_registered_task_model('eventizer')[1]
+
+    try:
+        job = job_class.objects.get(task__uuid=task_id, uuid=uuid)
+    except job_class.DoesNotExist:
+        raise Http404("Job not found")
+
+    try:
+        offset = parse_log_offset(request.headers.get('Last-Event-ID',
+                                                      request.GET.get('offset', None)))
+    except ValidationError as e:
+        return JsonResponse({'error': e.detail}, status=400)
+
+    response = StreamingHttpResponse(_stream_job_log(job, offset),
+                                     content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+
+    return response
+
+
+def _stream_job_log(job, offset):
+    """Generate the server-sent events with the log of a job."""
+
+    started_at = last_sent_at = time.monotonic()
+
+    while True:
+        try:
+            job.refresh_from_db(fields=['status'])
+        except job.DoesNotExist:
+            yield f"id: {offset or 0}\nevent: end\ndata: {{}}\n\n"
+            return
+
+        finished = job.status in FINISHED_JOB_STATUS
+        if finished:
+            job.refresh_from_db(fields=['logs'])
+
+        entries, next_offset = read_job_log(job, offset)
+
+        if offset is None:
+            offset = next_offset - len(entries)
+
+        for entry in entries:
+            offset += 1
+            yield f"id: {offset}\ndata: {json.dumps(entry)}\n\n"
+            last_sent_at = time.monotonic()
+
+        offset = next_offset
+
+        if finished:
+            yield f"id: {offset}\nevent: end\ndata: {{}}\n\n"
+            return
+
+        now = time.monotonic()
+        if now - started_at >= LOG_STREAM_MAX_TIME:
+            return
+        if now - last_sent_at >= LOG_STREAM_KEEPALIVE:
+            yield ": keep-alive\n\n"
+            last_sent_at = now
+
+        time.sleep(LOG_STREAM_POLL_INTERVAL)
@@ -24,7 +24,7 @@ import typing
 import django.db.transaction
 import rq.worker
 
-from .db import find_job
+from .db import find_job_from_meta, update_status
 from .models import SchedulerStatus
 
 if typing.TYPE_CHECKING:
@@ -45,10 +45,13 @@ class GrimoireLabWorker(rq.worker.Worker):
 
         super().prepare_job_execution(job, remove_from_intermediate_queue)
 
-        job_db = find_job(job.id)
+        job_db = find_job_from_meta(job)
+        task = job_db.task
 
         with django.db.transaction.atomic():
-            job_db.status = SchedulerStatus.RUNNING
-            job_db.save()
-            job_db.task.status = SchedulerStatus.RUNNING
-            job_db.task.save()
+            if not update_status(type(job_db), job_db.pk, SchedulerStatus.RUNNING,
+                                 expected=[SchedulerStatus.ENQUEUED]):
+                logger.warning(f"Job #{job_db.job_id} was not enqueued; status not updated.")
+            if not update_status(type(task), task.pk, SchedulerStatus.RUNNING,
+                                 expected=[SchedulerStatus.ENQUEUED, SchedulerStatus.RECOVERY]):
+                logger.warning(f"Task {task.task_id} was not enqueued; status not updated.")
@@ -16,10 +16,14 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 
+import unittest.mock
+
 from django.test import TransactionTestCase
 
 from fakeredis import FakeStrictRedis
 
+from grimoirelab.core.scheduler.models import GRIMOIRELAB_TASK_MODELS
+
 
 class GrimoireLabTestCase(TransactionTestCase):
     """Base class to build tests for GrimoireLab Core.
@@ -46,3 +50,18 @@ class GrimoireLabTestCase(TransactionTestCase):
 
     def tearDown(self):
         self.conn.flushdb()
+
+    def register_task_models(self, *models):
+        """Register only the given task models while the test runs.
+
+        Other tests replace the registered models, so the ones
+        needed are registered again. The registry is restored
+        when the test finishes.
+
+        :param models: pairs of task and job classes
+        """
+        registry = {task_class.TASK_TYPE: (task_class, job_class)
+                    for task_class, job_class in models}
+        patcher = unittest.mock.patch.dict(GRIMOIRELAB_TASK_MODELS, registry, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
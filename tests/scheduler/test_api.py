@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import json
+import unittest.mock
+
+import rq
+
+from django.test import Client
+
+from grimoirelab.core.scheduler.jobs import GrimoireLabJob, JobLogSink
+from grimoirelab.core.scheduler.models import SchedulerStatus
+from grimoirelab.core.scheduler.tasks.models import EventizerJob, EventizerTask, JobLogChunk
+
+from ..base import GrimoireLabTestCase
+
+
+def entries(start, end):
+    return [{'msg': f"Message {i}"} for i in range(start, end)]
+
+
+class TestJobLogs(GrimoireLabTestCase):
+    """Unit tests for the job logs endpoints"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.task = EventizerTask.create_task({'uri': 'http://example.com/'}, 60, 3,
+                                              datasource_type='git',
+                                              datasource_category='commit')
+        self.job = self.task.jobs.create(uuid='job-1', job_num=1,
+                                         status=SchedulerStatus.COMPLETED,
+                                         queue='test-queue')
+
+        # The first 10 entries were archived
+        JobLogChunk.archive('job-1', 0, [json.dumps(e).encode('utf-8') for e in entries(0, 10)])
+        self.job.logs = entries(10, 15)
+        self.job.save()
+
+        self.url = f'/scheduler/tasks/{self.task.uuid}/jobs/job-1/logs/'
+
+    def test_recent_logs(self):
+        """Only the recent entries are returned by default"""
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertListEqual(data['logs'], entries(10, 15))
+        self.assertEqual(data['offset'], 15)
+
+    def test_logs_offset(self):
+        """Only the entries after the offset are returned"""
+
+        response = self.client.get(self.url, {'offset': 13})
+
+        data = response.json()
+        self.assertListEqual(data['logs'], entries(13, 15))
+        self.assertEqual(data['offset'], 15)
+
+        # Archived entries are read when the offset is before them
+        response = self.client.get(self.url, {'offset': 8})
+
+        data = response.json()
+        self.assertListEqual(data['logs'], entries(8, 15))
+
+        # There are no new entries
+        response = self.client.get(self.url, {'offset': 15})
+
+        data = response.json()
+        self.assertListEqual(data['logs'], [])
+        self.assertEqual(data['offset'], 15)
+
+    def test_full_logs(self):
+        """The full history is returned when it is requested"""
+
+        response = self.client.get(self.url, {'full': 'true'})
+
+        data = response.json()
+        self.assertListEqual(data['logs'], entries(0, 15))
+        self.assertEqual(data['offset'], 15)
+
+    def test_invalid_offset(self):
+        """An error is returned when the offset is not valid"""
+
+        for offset in ('abc', '-1'):
+            response = self.client.get(self.url, {'offset': offset})
+            self.assertEqual(response.status_code, 400)
+
+    def test_running_job_logs(self):
+        """The log of running jobs is read from Redis"""
+
+        rq_job = GrimoireLabJob.create(func=print, id='job-2',
+                                       origin='test-queue', connection=self.conn)
+        rq_job.save()
+        sink = JobLogSink(rq_job, flush_size=5, max_entries=5, archive_size=5)
+        for entry in entries(0, 12):
+            sink.add(entry)
+
+        self.task.jobs.create(uuid='job-2', job_num=2,
+                              status=SchedulerStatus.RUNNING,
+                              queue='test-queue')
+        url = f'/scheduler/tasks/{self.task.uuid}/jobs/job-2/logs/'
+        queue = rq.Queue('test-queue', job_class=GrimoireLabJob, connection=self.conn)
+
+        with unittest.mock.patch('django_rq.get_queue', return_value=queue):
+            data = self.client.get(url).json()
+            self.assertListEqual(data['logs'], entries(5, 10))
+            self.assertEqual(data['offset'], 10)
+
+            sink.flush()
+
+            data = self.client.get(url, {'offset': data['offset']}).json()
+            self.assertListEqual(data['logs'], entries(10, 12))
+            self.assertEqual(data['offset'], 12)
+
+            data = self.client.get(url, {'offset': 2}).json()
+            self.assertListEqual(data['logs'], entries(2, 12))
+
+    def test_stream(self):
+        """The log is sent as server-sent events"""
+
+        response = self.client.get(self.url + 'stream/', {'offset': 12})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        content = b''.join(response.streaming_content).decode('utf-8')
+        events = [event for event in content.split('\n\n') if event]
+
+        self.assertListEqual(events, [
+            'id: 13\ndata: {"msg": "Message 12"}',
+            'id: 14\ndata: {"msg": "Message 13"}',
+            'id: 15\ndata: {"msg": "Message 14"}',
+            'id: 15\nevent: end\ndata: {}'
+        ])
+
+    def test_stream_last_event_id(self):
+        """Clients continue where they stopped when they reconnect"""
+
+        response = self.client.get(self.url + 'stream/', HTTP_LAST_EVENT_ID='14')
+
+        content = b''.join(response.streaming_content).decode('utf-8')
+        events = [event for event in content.split('\n\n') if event]
+
+        self.assertListEqual(events, [
+            'id: 15\ndata: {"msg": "Message 14"}',
+            'id: 15\nevent: end\ndata: {}'
+        ])
+
+    def test_stream_enqueued_job(self):
+        """The log of enqueued jobs is streamed once they run"""
+
+        job = self.task.jobs.create(uuid='job-2', job_num=2,
+                                    status=SchedulerStatus.ENQUEUED,
+                                    queue='test-queue')
+        url = f'/scheduler/tasks/{self.task.uuid}/jobs/job-2/logs/stream/'
+        queue = rq.Queue('test-queue', job_class=GrimoireLabJob, connection=self.conn)
+
+        def run_job():
+            rq_job = GrimoireLabJob.create(func=print, id='job-2',
+                                           origin='test-queue', connection=self.conn)
+            rq_job.save()
+            sink = JobLogSink(rq_job, flush_size=1)
+            for entry in entries(0, 2):
+                sink.add(entry)
+
+            job.status = SchedulerStatus.RUNNING
+            job.save()
+
+        def finish_job():
+            job.status = SchedulerStatus.COMPLETED
+            job.logs = entries(0, 3)
+            job.save()
+
+        # Each time the stream waits, the job moves to the next status
+        steps = [run_job, finish_job]
+
+        with unittest.mock.patch('django_rq.get_queue', return_value=queue), \
+             unittest.mock.patch('grimoirelab.core.scheduler.views.time.sleep',
+                                 side_effect=lambda _: steps.pop(0)()):
+            response = self.client.get(url)
+            content = b''.join(response.streaming_content).decode('utf-8')
+
+        events = [event for event in content.split('\n\n') if event]
+
+        self.assertListEqual(events, [
+            'id: 1\ndata: {"msg": "Message 0"}',
+            'id: 2\ndata: {"msg": "Message 1"}',
+            'id: 3\ndata: {"msg": "Message 2"}',
+            'id: 3\nevent: end\ndata: {}'
+        ])
+
+    def test_stream_removed_job(self):
+        """The stream finishes when the job is removed"""
+
+        job = self.task.jobs.create(uuid='job-2', job_num=2,
+                                    status=SchedulerStatus.ENQUEUED,
+                                    queue='test-queue')
+        url = f'/scheduler/tasks/{self.task.uuid}/jobs/job-2/logs/stream/'
+
+        with unittest.mock.patch('grimoirelab.core.scheduler.views.time.sleep',
+                                 side_effect=lambda _: job.delete()):
+            response = self.client.get(url)
+            content = b''.join(response.streaming_content).decode('utf-8')
+
+        events = [event for event in content.split('\n\n') if event]
+        self.assertListEqual(events, ['id: 0\nevent: end\ndata: {}'])
+
+
+class TestAddTasks(GrimoireLabTestCase):
+    """Unit tests for the endpoint to add tasks in bulk"""
+
+    def setUp(self):
+        super().setUp()
+
+        self.register_task_models((EventizerTask, EventizerJob))
+
+        self.client = Client()
+
+    def task(self, uri, **scheduler):
+        return {
+            'task_args': {
+                'datasource_type': 'git',
+                'datasource_category': 'commit',
+                'backend_args': {'uri': uri}
+            },
+            'scheduler': scheduler
+        }
+
+    def test_add_tasks(self):
+        """Tasks are created and the result of each one is returned"""
+
+        data = {
+            'type': 'eventizer',
+            'tasks': [
+                self.task('https://example.com/a.git'),
+                {'task_args': {'datasource_type': 'git'}},
+                self.task('https://example.com/b.git', job_interval=3600),
+            ]
+        }
+
+        response = self.client.post('/scheduler/add_tasks', json.dumps(data),
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]['status'], 'ok')
+        self.assertDictEqual(results[1], {'status': 'error', 'message': "Invalid task format."})
+        self.assertEqual(results[2]['status'], 'ok')
+
+        task = EventizerTask.objects.get(uuid=results[2]['task_id'])
+        self.assertEqual(task.task_args, {'uri': 'https://example.com/b.git'})
+        self.assertEqual(task.job_interval, 3600)
+        self.assertEqual(task.status, SchedulerStatus.ENQUEUED)
+        self.assertEqual(task.jobs.count(), 1)
+
+    def test_add_tasks_invalid_request(self):
+        """An error is returned when the request is not valid"""
+
+        for data in ('{', '{"type": "eventizer"}', '{"type": "unknown", "tasks": []}'):
+            response = self.client.post('/scheduler/add_tasks', data,
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+
+class TestTaskList(GrimoireLabTestCase):
+    """Unit tests for the list of tasks endpoint"""
+
+    def setUp(self):
+        super().setUp()
+
+        self.register_task_models((EventizerTask, EventizerJob))
+
+        self.client = Client()
+
+        for i in range(30):
+            task = EventizerTask.create_task({'uri': f'http://example.com/{i}.git'}, 60, 3,
+                                             datasource_type='git',
+                                             datasource_category='commit')
+            task.scheduled_at = task.created_at
+            task.save()
+            task.jobs.bulk_create([
+                EventizerJob(uuid=f'{task.uuid}-{job_num}', job_num=job_num,
+                             status=SchedulerStatus.COMPLETED,
+                             queue='eventizer_jobs', task=task)
+                for job_num in range(1, i % 15 + 1)
+            ])
+
+    def test_last_jobs(self):
+        """The last jobs of each task are returned, newest first"""
+
+        response = self.client.get('/scheduler/tasks/', {'size': 30})
+
+        self.assertEqual(response.status_code, 200)
+
+        for result in response.json()['results']:
+            task = EventizerTask.objects.get(uuid=result['uuid'])
+            expected = list(task.jobs.order_by('-job_num').values_list('job_num', flat=True)[:10])
+            self.assertListEqual([job['job_num'] for job in result['last_jobs']], expected)
+
+    def test_queries_per_page(self):
+        """The number of queries doesn't depend on the size of the page"""
+
+        # Count the tasks, read the tasks of the page and their jobs
+        for size in (5, 25, 100):
+            with self.assertNumQueries(3):
+                response = self.client.get('/scheduler/tasks/', {'size': size})
+
+            self.assertEqual(len(response.json()['results']), min(size, 30))
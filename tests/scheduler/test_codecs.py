@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import datetime
+import json
+import unittest
+import uuid
+from unittest.mock import patch
+
+from grimoirelab.core.scheduler import codecs
+from grimoirelab.core.scheduler.codecs import (
+    OrjsonCodec,
+    StdlibJSONCodec,
+    encode_default,
+    get_codec
+)
+from grimoirelab.core.scheduler.models import JobResultEncoder
+
+from ..base import GrimoireLabTestCase
+
+
+class Progress:
+    """Class used to test the encoding of objects"""
+
+    def __init__(self, job_id, total):
+        self.job_id = job_id
+        self.total = total
+
+
+def make_event():
+    """Generate an event with most of the JSON types"""
+
+    return {
+        'specversion': '1.0',
+        'id': '8bb40c9f0dcee7cb0c1d66e4e2ab2fdd1cfb2bc4',
+        'source': 'https://github.com/chaoss/grimoirelab-core',
+        'type': 'org.grimoirelab.events.git.commit',
+        'time': 1700000000.25,
+        'data': {
+            'Author': 'Jörg Müller <jmuller@example.com>',
+            'message': 'Añade soporte para 中文 \U0001F600\n\t"quoted"',
+            'files': [
+                {'file': 'README.md', 'added': 10, 'removed': 0},
+                {'file': 'src/main.py', 'added': 1, 'removed': -1}
+            ],
+            'merge': False,
+            'parents': [],
+            'tag': None,
+            'large': 2 ** 63,
+            'updated_on': datetime.datetime(2024, 1, 2, 3, 4, 5, 678910,
+                                            tzinfo=datetime.timezone.utc),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            1: 'integer key'
+        }
+    }
+
+
+class TestGetCodec(GrimoireLabTestCase):
+    """Unit tests for get_codec function"""
+
+    def test_get_codec(self):
+        """Codecs are returned by their name"""
+
+        codec = get_codec('json')
+        self.assertIsInstance(codec, StdlibJSONCodec)
+
+        # The same instance is always returned
+        self.assertIs(get_codec('json'), codec)
+
+    @unittest.skipIf(codecs.orjson is None, "orjson is not installed")
+    def test_get_codec_auto(self):
+        """orjson is selected when it is available"""
+
+        self.assertIsInstance(get_codec(), OrjsonCodec)
+        self.assertIsInstance(get_codec('auto'), OrjsonCodec)
+        self.assertIsInstance(get_codec(None), OrjsonCodec)
+
+    @patch.dict(codecs._codecs, clear=True)
+    @patch.object(codecs, 'orjson', None)
+    def test_get_codec_auto_fallback(self):
+        """The standard library is selected when orjson is not available"""
+
+        self.assertIsInstance(get_codec(), StdlibJSONCodec)
+
+    @patch.dict(codecs._codecs, clear=True)
+    @patch.object(codecs, 'orjson', None)
+    def test_orjson_not_available(self):
+        """An error is raised when orjson is requested but it is not installed"""
+
+        with self.assertRaisesRegex(ValueError, "'orjson' is not available"):
+            get_codec('orjson')
+
+    def test_codec_not_supported(self):
+        """An error is raised when the codec is not supported"""
+
+        with self.assertRaisesRegex(ValueError, "JSON codec 'yaml' not supported"):
+            get_codec('yaml')
+
+
+class TestJSONCodecs(GrimoireLabTestCase):
+    """Unit tests for JSON codecs"""
+
+    def test_dumps(self):
+        """Objects are encoded as compact UTF-8 JSON documents"""
+
+        codec = get_codec('json')
+
+        data = codec.dumps({'id': 'ñ', 'data': [1, 2.5, True, None]})
+        self.assertEqual(data, '{"id":"ñ","data":[1,2.5,true,null]}'.encode('utf-8'))
+
+    def test_dumps_default(self):
+        """Types not supported by JSON are converted"""
+
+        codec = get_codec('json')
+
+        data = codec.dumps({
+            'progress': Progress('job-1', 10),
+            'date': datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc)
+        })
+        expected = b'{"progress":{"job_id":"job-1","total":10},"date":"2024-01-02T00:00:00Z"}'
+        self.assertEqual(data, expected)
+
+    def test_loads(self):
+        """JSON documents are decoded"""
+
+        codec = get_codec('json')
+
+        self.assertEqual(codec.loads(b'{"id":"\xc3\xb1"}'), {'id': 'ñ'})
+        self.assertEqual(codec.loads('{"id":"ñ"}'), {'id': 'ñ'})
+
+    @unittest.skipIf(codecs.orjson is None, "orjson is not installed")
+    def test_identical_output(self):
+        """All codecs generate the same bytes"""
+
+        event = make_event()
+
+        data = get_codec('json').dumps(event)
+        self.assertEqual(get_codec('orjson').dumps(event), data)
+
+        for name in codecs.CODECS:
+            decoded = get_codec(name).loads(data)
+            self.assertEqual(decoded, json.loads(data))
+
+    @unittest.skipIf(codecs.orjson is None, "orjson is not installed")
+    def test_identical_output_objects(self):
+        """All codecs convert unsupported types in the same way"""
+
+        progress = {'progress': Progress('job-1', 10)}
+
+        data = get_codec('json').dumps(progress)
+        self.assertEqual(get_codec('orjson').dumps(progress), data)
+
+    def test_surrogates(self):
+        """Lone surrogates are escaped by every codec"""
+
+        # Perceval decodes commit messages that are not
+        # valid UTF-8 using 'surrogateescape'
+        message = b'Fix \xff byte'.decode('utf-8', errors='surrogateescape')
+        event = {'id': 'ñ', 'data': {'message': message}}
+        expected = '{"id":"ñ","data":{"message":"Fix \\udcff byte"}}'.encode('utf-8')
+
+        for name in codecs.CODECS:
+            if name == OrjsonCodec.name and codecs.orjson is None:
+                continue
+            codec = get_codec(name)
+            data = codec.dumps(event)
+            self.assertEqual(data, expected)
+            self.assertEqual(codec.loads(data), event)
+            self.assertEqual(codec.loads(data.decode('utf-8')), event)
+
+    def test_job_result_encoder(self):
+        """Job results are converted like in the codecs"""
+
+        progress = Progress('job-1', datetime.datetime(2024, 1, 2))
+
+        encoder = JobResultEncoder()
+        self.assertEqual(encoder.default(progress), encode_default(progress))
+        self.assertEqual(json.loads(encoder.encode(progress)),
+                         json.loads(get_codec('json').dumps(progress)))
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from grimoirelab.core.scheduler import compression
+from grimoirelab.core.scheduler.compression import (
+    PayloadDecoder,
+    ZlibCompressor,
+    ZstdCompressor,
+    encode_payload,
+    get_compressor,
+    get_dictionary_id
+)
+
+from ..base import GrimoireLabTestCase
+
+
+EVENT = (
+    b'{"specversion":"1.0","id":"8bb40c9f0dcee7cb0c1d66e4e2ab2fdd1cfb2bc4",'
+    b'"type":"org.grimoirelab.events.git.commit","source":"http://example.com",'
+    b'"time":1344965413.0,"data":{"commit":"8bb40c9f0dcee7cb0c1d66e4e2ab2fdd1cfb2bc4",'
+    b'"Author":"Eduardo Morais <companheiro.vermelho@example.com>",'
+    b'"message":"Update README.md with the latest changes of the project"}}'
+)
+
+DICTIONARY = (
+    b'{"specversion":"1.0","id":"","type":"org.grimoirelab.events.git.commit",'
+    b'"source":"http://example.com","time":,"data":{"commit":"","Author":"","message":""}}'
+)
+
+
+class TestGetCompressor(GrimoireLabTestCase):
+    """Unit tests for get_compressor function"""
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_path = tempfile.mkdtemp(prefix='compression_')
+        compression.load_dictionary.cache_clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_path)
+        compression.load_dictionary.cache_clear()
+        super().tearDown()
+
+    def test_get_compressor(self):
+        """Compressors are returned by their name"""
+
+        compressor = get_compressor('zlib', level=9)
+        self.assertIsInstance(compressor, ZlibCompressor)
+        self.assertEqual(compressor.level, 9)
+        self.assertIsNone(compressor.dictionary)
+        self.assertIsNone(compressor.dictionary_id)
+
+    def test_no_compression(self):
+        """No compressor is returned when compression is disabled"""
+
+        self.assertIsNone(get_compressor(None))
+        self.assertIsNone(get_compressor('none'))
+
+    def test_dictionary(self):
+        """The dictionary is read from a file"""
+
+        path = os.path.join(self.tmp_path, 'events.dict')
+        with open(path, 'wb') as fd:
+            fd.write(DICTIONARY)
+
+        compressor = get_compressor('zlib', dictionary_path=path)
+        self.assertEqual(compressor.dictionary, DICTIONARY)
+        self.assertEqual(compressor.dictionary_id, get_dictionary_id(DICTIONARY))
+
+    def test_compressor_not_supported(self):
+        """An error is raised when the compressor is not supported"""
+
+        with self.assertRaisesRegex(ValueError, "compression 'lzma' not supported"):
+            get_compressor('lzma')
+
+    @patch.object(compression, 'zstandard', None)
+    def test_zstd_not_available(self):
+        """An error is raised when zstd is requested but it is not installed"""
+
+        with self.assertRaisesRegex(ValueError, "'zstd' is not available"):
+            get_compressor('zstd')
+
+
+class TestCompressors(GrimoireLabTestCase):
+    """Unit tests for payload compressors"""
+
+    def test_zlib(self):
+        """Payloads are compressed with zlib"""
+
+        compressor = ZlibCompressor()
+        data = compressor.compress(EVENT)
+
+        self.assertLess(len(data), len(EVENT))
+        self.assertEqual(compressor.decompress(data), EVENT)
+
+    def test_zlib_dictionary(self):
+        """Payloads compress better with a dictionary"""
+
+        compressor = ZlibCompressor(dictionary=DICTIONARY)
+        data = compressor.compress(EVENT)
+
+        self.assertLess(len(data), len(ZlibCompressor().compress(EVENT)))
+        self.assertEqual(compressor.decompress(data), EVENT)
+
+    @unittest.skipIf(compression.zstandard is None, "zstandard is not installed")
+    def test_zstd(self):
+        """Payloads are compressed with zstd"""
+
+        for dictionary in (None, DICTIONARY):
+            compressor = ZstdCompressor(level=3, dictionary=dictionary)
+            data = compressor.compress(EVENT)
+
+            self.assertLess(len(data), len(EVENT))
+            self.assertEqual(compressor.decompress(data), EVENT)
+
+
+class TestEncodePayload(GrimoireLabTestCase):
+    """Unit tests for encode_payload function"""
+
+    def test_no_compressor(self):
+        """The payload is not modified when there is no compressor"""
+
+        self.assertDictEqual(encode_payload(EVENT), {'data': EVENT})
+
+    def test_compressed(self):
+        """The payload is compressed and flagged"""
+
+        fields = encode_payload(EVENT, ZlibCompressor())
+
+        self.assertEqual(fields['encoding'], 'zlib')
+        self.assertNotIn('dict', fields)
+        self.assertLess(len(fields['data']), len(EVENT))
+
+    def test_compressed_dictionary(self):
+        """The dictionary used is flagged"""
+
+        fields = encode_payload(EVENT, ZlibCompressor(dictionary=DICTIONARY))
+
+        self.assertEqual(fields['encoding'], 'zlib')
+        self.assertEqual(fields['dict'], get_dictionary_id(DICTIONARY))
+
+    def test_not_smaller(self):
+        """Payloads that don't get smaller are not compressed"""
+
+        fields = encode_payload(b'{}', ZlibCompressor())
+        self.assertDictEqual(fields, {'data': b'{}'})
+
+
+class TestPayloadDecoder(GrimoireLabTestCase):
+    """Unit tests for PayloadDecoder class"""
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_path = tempfile.mkdtemp(prefix='compression_')
+        self.dictionary_path = os.path.join(self.tmp_path, 'events.dict')
+        with open(self.dictionary_path, 'wb') as fd:
+            fd.write(DICTIONARY)
+        compression.load_dictionary.cache_clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_path)
+        compression.load_dictionary.cache_clear()
+        super().tearDown()
+
+    @staticmethod
+    def to_stream_fields(fields):
+        return {k.encode('utf-8'): v.encode('utf-8') if isinstance(v, str) else v
+                for k, v in fields.items()}
+
+    def test_decode(self):
+        """Compressed and uncompressed payloads are decoded"""
+
+        compressors = [
+            None,
+            ZlibCompressor(),
+            ZlibCompressor(dictionary=DICTIONARY)
+        ]
+        if compression.zstandard:
+            compressors.append(ZstdCompressor(dictionary=DICTIONARY))
+
+        decoder = PayloadDecoder(self.dictionary_path)
+
+        for compressor in compressors:
+            fields = self.to_stream_fields(encode_payload(EVENT, compressor))
+            self.assertEqual(decoder.decode(fields), EVENT)
+
+    def test_dictionary_not_found(self):
+        """An error is raised when the dictionary is not available"""
+
+        fields = encode_payload(EVENT, ZlibCompressor(dictionary=DICTIONARY))
+        fields = self.to_stream_fields(fields)
+
+        decoder = PayloadDecoder()
+
+        with self.assertRaisesRegex(ValueError, "dictionary '.+' not found"):
+            decoder.decode(fields)
+
+    def test_encoding_not_supported(self):
+        """An error is raised when the encoding is not supported"""
+
+        fields = {b'data': EVENT, b'encoding': b'lzma'}
+
+        with self.assertRaisesRegex(ValueError, "compression 'lzma' not supported"):
+            PayloadDecoder().decode(fields)
@@ -18,16 +18,22 @@
 
 import django.db
 import django.test.utils
+import rq.job
+
+import grimoirelab.core.scheduler.db
 
 from grimoirelab.core.scheduler.db import (
     find_tasks_by_status,
     find_task,
-    find_job
+    find_job,
+    find_job_from_meta,
+    update_status
 )
 from grimoirelab.core.scheduler.errors import NotFoundError
 from grimoirelab.core.scheduler.models import (
     SchedulerStatus,
     Task,
+    generate_uuid,
     register_task_model,
     GRIMOIRELAB_TASK_MODELS
 )
@@ -195,6 +201,39 @@ class TestFindTask(GrimoireLabTestCase):
         with self.assertRaises(NotFoundError):
             find_task('abcdefgh')
 
+    def test_find_task_single_query(self):
+        """The model of the task is obtained from its uuid"""
+
+        AnotherDummyTaskDB.create_task({'arg': 'value'}, 15, 10)
+        task = AnotherDummyTaskDB.create_task({'arg': 'value'}, 15, 10)
+
+        self.assertTrue(task.uuid.startswith('another_dummy_task-'))
+
+        with self.assertNumQueries(1):
+            result = find_task(task.uuid)
+        self.assertEqual(result, task)
+
+        with self.assertNumQueries(1):
+            with self.assertRaises(NotFoundError):
+                find_task(generate_uuid('another_dummy_task'))
+
+    def test_find_task_without_type(self):
+        """Tasks which uuid doesn't include the type are cached"""
+
+        grimoirelab.core.scheduler.db._uuid_types_cache.clear()
+
+        task = AnotherDummyTaskDB.objects.create(uuid='abcdefgh',
+                                                 task_type='another_dummy_task')
+
+        # Every model is checked the first time
+        with self.assertNumQueries(2):
+            result = find_task('abcdefgh')
+        self.assertEqual(result, task)
+
+        with self.assertNumQueries(1):
+            result = find_task('abcdefgh')
+        self.assertEqual(result, task)
+
 
 class TestFindJob(GrimoireLabTestCase):
     """Unit tests for find_job function"""
@@ -270,3 +309,106 @@ class TestFindJob(GrimoireLabTestCase):
 
         with self.assertRaises(NotFoundError):
             find_job('abcdefgh')
+
+    def test_find_job_single_query(self):
+        """The job and its task are found with a single query"""
+
+        task = AnotherDummyTaskDB.create_task({'arg': 'value'}, 15, 10)
+        job = self.AnotherDummyJobClass.objects.create(
+            uuid=generate_uuid('another_dummy_task'),
+            job_num=1,
+            task=task
+        )
+
+        with self.assertNumQueries(1):
+            result = find_job(job.uuid)
+            self.assertEqual(result.task, task)
+        self.assertEqual(result, job)
+
+    def test_find_job_from_meta(self):
+        """The job is loaded by its primary key when it's in the metadata"""
+
+        task = AnotherDummyTaskDB.create_task({'arg': 'value'}, 15, 10)
+        job = self.AnotherDummyJobClass.objects.create(
+            uuid='abcdefgh',
+            job_num=1,
+            task=task
+        )
+        job_rq = rq.job.Job.create(print, id='abcdefgh', connection=self.conn,
+                                   meta={'task_type': 'another_dummy_task',
+                                         'task_pk': task.pk,
+                                         'job_pk': job.pk})
+
+        with self.assertNumQueries(1):
+            result = find_job_from_meta(job_rq)
+            self.assertEqual(result.task, task)
+        self.assertEqual(result, job)
+
+        # The job is searched by its uuid without metadata
+        job_rq = rq.job.Job.create(print, id='abcdefgh', connection=self.conn)
+
+        result = find_job_from_meta(job_rq)
+        self.assertEqual(result, job)
+
+    def test_find_job_from_meta_not_found(self):
+        """An exception is raised when the job of the metadata doesn't exist"""
+
+        job_rq = rq.job.Job.create(print, id='abcdefgh', connection=self.conn,
+                                   meta={'task_type': 'another_dummy_task',
+                                         'task_pk': 1,
+                                         'job_pk': 1})
+
+        with self.assertRaises(NotFoundError):
+            find_job_from_meta(job_rq)
+
+
+class TestUpdateStatus(GrimoireLabTestCase):
+    """Unit tests for update_status function"""
+
+    def setUp(self):
+        """Create the test model"""
+
+        def cleanup_test_model():
+            with django.db.connection.schema_editor() as schema_editor:
+                schema_editor.delete_model(DummyTaskDB)
+
+        with django.db.connection.schema_editor() as schema_editor:
+            schema_editor.create_model(DummyTaskDB)
+
+        self.addCleanup(cleanup_test_model)
+        super().setUp()
+
+    def test_update_status(self):
+        """The status is updated with a single query"""
+
+        task = DummyTaskDB.create_task({'arg': 'value'}, 15, 10)
+
+        with self.assertNumQueries(1):
+            updated = update_status(DummyTaskDB, task.pk, SchedulerStatus.ENQUEUED, runs=3)
+
+        self.assertTrue(updated)
+
+        updated_task = DummyTaskDB.objects.get(pk=task.pk)
+        self.assertEqual(updated_task.status, SchedulerStatus.ENQUEUED)
+        self.assertEqual(updated_task.runs, 3)
+        self.assertGreater(updated_task.last_modified, task.last_modified)
+        self.assertEqual(updated_task.task_args, {'arg': 'value'})
+
+    def test_update_expected_status(self):
+        """The status is only updated when the current one is the expected"""
+
+        task = DummyTaskDB.create_task({'arg': 'value'}, 15, 10)
+
+        updated = update_status(DummyTaskDB, task.pk, SchedulerStatus.RUNNING,
+                                expected=[SchedulerStatus.ENQUEUED])
+        self.assertFalse(updated)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, SchedulerStatus.NEW)
+
+        updated = update_status(DummyTaskDB, task.pk, SchedulerStatus.RUNNING,
+                                expected=[SchedulerStatus.NEW, SchedulerStatus.ENQUEUED])
+        self.assertTrue(updated)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, SchedulerStatus.RUNNING)
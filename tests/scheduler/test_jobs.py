@@ -17,13 +17,19 @@
 #
 
 import logging
+import unittest.mock
 
+import django.db
+import redis
 import rq
 
 from grimoirelab.core.scheduler.jobs import (
     GrimoireLabJob,
-    JobLogHandler
+    JobLogHandler,
+    JobLogSink,
+    ProgressReporter
 )
+from grimoirelab.core.scheduler.tasks.models import EventizerTask, JobLogChunk
 
 from ..base import GrimoireLabTestCase
 
@@ -46,6 +52,14 @@ def do_something_and_fail():
     raise Exception("Unexpected error")
 
 
+def log_many_messages():
+    """Function to run on a job that logs many messages"""
+
+    logger = logging.getLogger(__name__)
+    for i in range(25):
+        logger.info(f"Message {i}")
+
+
 class TestGrimoireLabJob(GrimoireLabTestCase):
     """Unit tests for GrimoireLabJob class"""
 
@@ -90,6 +104,69 @@ class TestGrimoireLabJob(GrimoireLabTestCase):
         self.assertEqual(len(grimoire_job.log), 1)
         self.assertEqual(grimoire_job.log[0]['msg'], "This is a log message")
 
+        # Entries are stored in a list, not in the metadata
+        self.assertEqual(self.conn.llen(grimoire_job.log_key), 1)
+        self.assertNotIn('log', grimoire_job.meta)
+
+    def test_log_legacy(self):
+        """Entries stored in the metadata are also returned"""
+
+        job = GrimoireLabJob.create(func=do_something,
+                                    connection=self.conn)
+        job.meta['log'] = [{'msg': "Old message"}]
+        job.add_log({'msg': "New message"})
+
+        self.assertListEqual([entry['msg'] for entry in job.log],
+                             ["Old message", "New message"])
+
+    def test_read_log(self):
+        """The log is read from a position"""
+
+        job = GrimoireLabJob.create(func=do_something,
+                                    connection=self.conn)
+        job.save()
+        sink = JobLogSink(job, flush_size=5, max_entries=5, archive_size=5)
+
+        for i in range(12):
+            sink.add({'msg': f"Message {i}"})
+
+        # Entries 0-4 were archived; 10 and 11 are in the buffer
+        job = GrimoireLabJob.fetch(job.id, connection=self.conn)
+
+        log, offset = job.read_log()
+        self.assertListEqual([entry['msg'] for entry in log],
+                             [f"Message {i}" for i in range(5, 10)])
+        self.assertEqual(offset, 10)
+
+        sink.flush()
+
+        log, offset = job.read_log(offset)
+        self.assertListEqual([entry['msg'] for entry in log],
+                             ["Message 10", "Message 11"])
+        self.assertEqual(offset, 12)
+
+        log, offset = job.read_log(offset)
+        self.assertListEqual(log, [])
+        self.assertEqual(offset, 12)
+
+        # Archived entries are also read
+        log, offset = job.read_log(3)
+        self.assertListEqual([entry['msg'] for entry in log],
+                             [f"Message {i}" for i in range(3, 12)])
+        self.assertEqual(offset, 12)
+
+    def test_delete(self):
+        """The log is removed when the job is deleted"""
+
+        job = GrimoireLabJob.create(func=do_something,
+                                    connection=self.conn)
+        job.save()
+        job.add_log({'msg': "This is a log message"})
+
+        job.delete()
+
+        self.assertFalse(self.conn.exists(job.log_key))
+
     def test_job(self):
         """Tests if the job is run and logs are generated"""
 
@@ -112,6 +189,66 @@ class TestGrimoireLabJob(GrimoireLabTestCase):
         self.assertNotIn(job._job_logger,
                          logging.getLogger(__name__).handlers)
 
+        # The log is kept for a while once the job has finished
+        self.assertGreater(self.conn.ttl(job.log_key), 0)
+
+    def test_job_buffered_logs(self):
+        """Log entries are written in chunks while the job runs"""
+
+        job = GrimoireLabJob.create(func=log_many_messages,
+                                    connection=self.conn,
+                                    loggers=[__name__])
+        job.LOG_FLUSH_SIZE = 10
+        job.LOG_FLUSH_INTERVAL = 3600
+
+        q = rq.Queue(
+            'test-queue',
+            job_class=GrimoireLabJob,
+            connection=self.conn,
+            is_async=False
+        )
+
+        with unittest.mock.patch.object(redis.client.Pipeline, 'rpush', autospec=True,
+                                        side_effect=redis.client.Pipeline.rpush) as mock_rpush:
+            job = q.enqueue_job(job)
+
+        # Two full chunks plus the remaining entries
+        self.assertEqual(mock_rpush.call_count, 3)
+        self.assertListEqual([entry['msg'] for entry in job.log],
+                             [f"Message {i}" for i in range(25)])
+
+    def test_job_log_ttl(self):
+        """The log expires along with the job"""
+
+        q = rq.Queue(
+            'test-queue',
+            job_class=GrimoireLabJob,
+            connection=self.conn,
+            is_async=False
+        )
+
+        def run_job(func, **kwargs):
+            job = GrimoireLabJob.create(func=func,
+                                        connection=self.conn,
+                                        loggers=[__name__],
+                                        **kwargs)
+            return q.enqueue_job(job)
+
+        job = run_job(do_something, result_ttl=120, failure_ttl=3600)
+        ttl = self.conn.ttl(job.log_key)
+        self.assertGreater(ttl, 0)
+        self.assertLessEqual(ttl, 120)
+
+        job = run_job(do_something_and_fail, result_ttl=120, failure_ttl=3600)
+        ttl = self.conn.ttl(job.log_key)
+        self.assertGreater(ttl, 120)
+        self.assertLessEqual(ttl, 3600)
+
+        # Jobs kept forever keep their log too
+        job = run_job(do_something, result_ttl=-1)
+        self.assertEqual(self.conn.ttl(job.log_key), -1)
+        self.assertGreater(self.conn.llen(job.log_key), 0)
+
     def test_job_capture_exception(self):
         """Checks if the job captures exceptions and logs them"""
 
@@ -132,6 +269,274 @@ class TestGrimoireLabJob(GrimoireLabTestCase):
         self.assertRegex(job.log[1]['msg'], "Traceback")
 
 
+class TestJobLogSink(GrimoireLabTestCase):
+    """Unit tests for JobLogSink class"""
+
+    def test_flush_size(self):
+        """Entries are written when the buffer is full"""
+
+        job = GrimoireLabJob(connection=self.conn)
+        sink = JobLogSink(job, flush_size=3, flush_interval=3600)
+
+        for i in range(7):
+            sink.add({'msg': f"Message {i}"})
+
+        self.assertEqual(self.conn.llen(job.log_key), 6)
+        self.assertEqual(len(sink.buffer), 1)
+
+        # Remaining entries are written when closed
+        sink.close(ttl=100)
+
+        self.assertEqual(self.conn.llen(job.log_key), 7)
+        self.assertEqual(len(sink.buffer), 0)
+        self.assertGreater(self.conn.ttl(job.log_key), 0)
+
+    def test_flush_interval(self):
+        """Entries are written when the flush interval expires"""
+
+        job = GrimoireLabJob(connection=self.conn)
+        sink = JobLogSink(job, flush_size=100, flush_interval=10)
+
+        with unittest.mock.patch('grimoirelab.core.scheduler.jobs.time.monotonic') as mock_time:
+            mock_time.return_value = 100
+            sink.add({'msg': "Message 1"})
+            mock_time.return_value = 105
+            sink.add({'msg': "Message 2"})
+
+            self.assertEqual(self.conn.llen(job.log_key), 0)
+
+            mock_time.return_value = 110
+            sink.add({'msg': "Message 3"})
+
+        self.assertEqual(self.conn.llen(job.log_key), 3)
+
+    def test_flush_ttl(self):
+        """The list expires since the first entries are written"""
+
+        job = GrimoireLabJob(connection=self.conn)
+        sink = JobLogSink(job, flush_size=1, ttl=100)
+
+        sink.add({'msg': "Message 1"})
+
+        ttl = self.conn.ttl(job.log_key)
+        self.assertGreater(ttl, 0)
+        self.assertLessEqual(ttl, 100)
+
+    def test_flush_sanitize_entries(self):
+        """Entries that can't be encoded are sanitized"""
+
+        job = GrimoireLabJob(connection=self.conn)
+        sink = JobLogSink(job, flush_size=3, flush_interval=3600)
+
+        sink.add({'msg': "Message 1"})
+        sink.add({'msg': "Message 2", 'created': {1, 2}})
+        sink.add({'msg': "Message 3"})
+
+        self.assertEqual(len(sink.buffer), 0)
+        self.assertListEqual(job.log, [{'msg': "Message 1"},
+                                       {'msg': "Message 2", 'created': '{1, 2}'},
+                                       {'msg': "Message 3"}])
+
+    def test_flush_error(self):
+        """The buffer is emptied even when entries can't be written"""
+
+        job = GrimoireLabJob(connection=self.conn)
+        sink = JobLogSink(job, flush_size=2, flush_interval=3600)
+
+        sink.add({'msg': "Message 1"})
+
+        with unittest.mock.patch.object(self.conn, 'pipeline',
+                                        side_effect=redis.exceptions.ConnectionError):
+            with self.assertRaises(redis.exceptions.ConnectionError):
+                sink.add({'msg': "Message 2"})
+
+        self.assertEqual(len(sink.buffer), 0)
+
+        sink.add({'msg': "Message 3"})
+        sink.close()
+
+        self.assertListEqual(job.log, [{'msg': "Message 3"}])
+
+    def test_flush_saves_meta(self):
+        """The metadata of the job is saved when entries are written"""
+
+        job = GrimoireLabJob.create(func=do_something,
+                                    connection=self.conn)
+        job.save()
+        job.meta['progress'] = 25
+
+        sink = JobLogSink(job, flush_size=1)
+        sink.add({'msg': "Message 1"})
+
+        job = GrimoireLabJob.fetch(job.id, connection=self.conn)
+        self.assertEqual(job.progress, 25)
+        self.assertEqual(job.log, [{'msg': "Message 1"}])
+
+    def test_archive(self):
+        """The oldest entries are archived when the list is full"""
+
+        job = GrimoireLabJob(connection=self.conn)
+        sink = JobLogSink(job, flush_size=2, flush_interval=3600,
+                          max_entries=10, archive_size=5)
+
+        for i in range(14):
+            sink.add({'msg': f"Message {i}"})
+
+        # The list didn't reach the limit yet
+        self.assertEqual(self.conn.llen(job.log_key), 14)
+        self.assertEqual(JobLogChunk.objects.count(), 0)
+
+        sink.add({'msg': "Message 14"})
+        sink.add({'msg': "Message 15"})
+
+        # Only the last entries are kept in Redis
+        self.assertEqual(self.conn.llen(job.log_key), 10)
+        self.assertEqual(job.log_archived, 6)
+        self.assertListEqual([entry['msg'] for entry in job.log],
+                             [f"Message {i}" for i in range(6, 16)])
+        self.assertListEqual([entry['msg'] for entry in job.archived_log],
+                             [f"Message {i}" for i in range(6)])
+
+        for i in range(16, 40):
+            sink.add({'msg': f"Message {i}"})
+        sink.close()
+
+        # The log size is bounded and nothing was lost
+        self.assertLessEqual(self.conn.llen(job.log_key), 15)
+        self.assertListEqual([entry['msg'] for entry in job.archived_log + job.log],
+                             [f"Message {i}" for i in range(40)])
+
+        chunks = JobLogChunk.objects.filter(job_uuid=job.id).order_by('first_entry')
+        self.assertListEqual([(chunk.first_entry, chunk.nentries) for chunk in chunks],
+                             [(0, 6), (6, 6), (12, 6), (18, 6), (24, 6)])
+
+    def test_archive_disabled(self):
+        """Entries are never archived when there is no limit"""
+
+        job = GrimoireLabJob(connection=self.conn)
+        sink = JobLogSink(job, flush_size=2, max_entries=None)
+
+        for i in range(50):
+            sink.add({'msg': f"Message {i}"})
+
+        self.assertEqual(self.conn.llen(job.log_key), 50)
+        self.assertEqual(job.archived_log, [])
+
+
+class TestJobLogChunk(GrimoireLabTestCase):
+    """Unit tests for JobLogChunk class"""
+
+    def test_archive(self):
+        """Entries are compressed and returned in order"""
+
+        entries = [f'{{"msg":"Message {i}"}}'.encode('utf-8') for i in range(100)]
+
+        JobLogChunk.archive('job-1', 50, entries[50:])
+        JobLogChunk.archive('job-1', 0, entries[:50])
+        JobLogChunk.archive('job-2', 0, entries[:1])
+
+        chunk = JobLogChunk.objects.get(job_uuid='job-1', first_entry=0)
+        self.assertEqual(chunk.nentries, 50)
+        self.assertLess(len(chunk.data), len(b','.join(entries[:50])))
+
+        log = JobLogChunk.get_log('job-1')
+        self.assertListEqual(log, [{'msg': f"Message {i}"} for i in range(100)])
+
+        log = JobLogChunk.get_log('job-1', 45, 60)
+        self.assertListEqual(log, [{'msg': f"Message {i}"} for i in range(45, 60)])
+
+        self.assertEqual(JobLogChunk.count_entries('job-1'), 100)
+        self.assertEqual(JobLogChunk.count_entries('job-3'), 0)
+
+    def test_delete_job(self):
+        """Archived entries are removed with their job"""
+
+        task = EventizerTask.create_task({'uri': 'http://example.com/'}, 60, 3,
+                                         datasource_type='git',
+                                         datasource_category='commit')
+        job = task.jobs.create(uuid='job-1', job_num=1)
+
+        JobLogChunk.archive('job-1', 0, [b'{"msg":"Message"}'])
+        JobLogChunk.archive('job-2', 0, [b'{"msg":"Message"}'])
+
+        job.delete()
+
+        self.assertListEqual(list(JobLogChunk.objects.values_list('job_uuid', flat=True)),
+                             ['job-2'])
+
+    def test_delete_jobs(self):
+        """Jobs are deleted without loading them; logs are deleted apart"""
+
+        task = EventizerTask.create_task({'uri': 'http://example.com/'}, 60, 3,
+                                         datasource_type='git',
+                                         datasource_category='commit')
+        for job_num in range(1, 6):
+            task.jobs.create(uuid=f'job-{job_num}', job_num=job_num)
+            JobLogChunk.archive(f'job-{job_num}', 0, [b'{"msg":"Message"}'])
+
+        jobs = task.jobs.filter(job_num__lte=4)
+
+        # BEGIN, one DELETE per table and COMMIT
+        with self.assertNumQueries(4), django.db.transaction.atomic():
+            JobLogChunk.delete_logs(jobs.values_list('uuid', flat=True))
+            jobs.delete()
+
+        self.assertListEqual(list(task.jobs.values_list('uuid', flat=True)), ['job-5'])
+        self.assertListEqual(list(JobLogChunk.objects.values_list('job_uuid', flat=True)),
+                             ['job-5'])
+
+
+class TestProgressReporter(GrimoireLabTestCase):
+    """Unit tests for ProgressReporter class"""
+
+    def test_report_interval(self):
+        """The progress is saved at most once per interval"""
+
+        job = GrimoireLabJob.create(func=do_something,
+                                    connection=self.conn)
+        job.save()
+        reports = []
+
+        with unittest.mock.patch('grimoirelab.core.scheduler.jobs.time.monotonic') as mock_time:
+            mock_time.return_value = 100
+            reporter = ProgressReporter(job, interval=10,
+                                        on_report=lambda n, rate: reports.append((n, rate)))
+
+            for _ in range(50):
+                reporter.update()
+
+            self.assertListEqual(reports, [])
+
+            mock_time.return_value = 110
+            reporter.update(50)
+
+            self.assertListEqual(reports, [(100, 10.0)])
+
+            mock_time.return_value = 115
+            reporter.update()
+
+            self.assertListEqual(reports, [(100, 10.0)])
+
+    def test_report_saves_meta(self):
+        """The metadata of the job is saved on each report"""
+
+        job = GrimoireLabJob.create(func=do_something,
+                                    connection=self.conn)
+        job.save()
+
+        def on_report(count, rate):
+            job.meta['progress'] = count
+
+        reporter = ProgressReporter(job, interval=3600, on_report=on_report)
+        reporter.update(25)
+
+        self.assertIsNone(GrimoireLabJob.fetch(job.id, connection=self.conn).progress)
+
+        reporter.report()
+
+        self.assertEqual(GrimoireLabJob.fetch(job.id, connection=self.conn).progress, 25)
+
+
 class TestJobLogHandler(GrimoireLabTestCase):
     """Unit tests for JobLogHandler class"""
 
@@ -158,7 +563,7 @@ class TestJobLogHandler(GrimoireLabTestCase):
         logger.warning("This is a warning message")
         logger.info("This is an info message")
 
-        # Check if the logs are saved in the job 'meta' field
+        # Check if the logs are saved in the job log
         self.assertEqual(len(job.log), 3)
         self.assertEqual(sorted(list(job.log[0].keys())),
                          ['created', 'level', 'module', 'msg'])
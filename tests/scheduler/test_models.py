@@ -71,7 +71,7 @@ class TestTaskModel(GrimoireLabTestCase):
             {'arg': 'value'}, 15, 10, burst=True
         )
         self.assertEqual(task.id, 1)
-        self.assertEqual(task.uuid, 'abcdefg')
+        self.assertEqual(task.uuid, 'dummy_task-abcdefg')
         self.assertEqual(task.task_type, 'dummy_task')
         self.assertEqual(task.task_args, {'arg': 'value'})
         self.assertEqual(task.job_interval, 15)
@@ -88,7 +88,7 @@ class TestTaskModel(GrimoireLabTestCase):
 
         task = DummyTask.create_task({}, 0, 0, burst=False)
 
-        self.assertEqual(task.task_id, 'grimoire:task:abcdefg')
+        self.assertEqual(task.task_id, 'grimoire:task:dummy_task-abcdefg')
 
     def test_save_run(self, mock_uuid):
         """Task status is correctly updated when save_run is called"""
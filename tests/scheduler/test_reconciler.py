@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import unittest.mock
+
+import django_rq
+import rq.job
+
+from django.test import Client
+
+from grimoirelab.core.scheduler.models import SchedulerStatus
+from grimoirelab.core.scheduler.reconciler import (
+    TaskReconciler,
+    get_reconciler_metrics
+)
+from grimoirelab.core.scheduler.scheduler import _enqueue_task
+from grimoirelab.core.scheduler.tasks.models import EventizerJob, EventizerTask
+
+from ..base import GrimoireLabTestCase
+
+
+class TestTaskReconciler(GrimoireLabTestCase):
+    """Unit tests for the tasks reconciler"""
+
+    def setUp(self):
+        super().setUp()
+
+        self.register_task_models((EventizerTask, EventizerJob))
+
+        self.tasks = []
+        for i in range(5):
+            task = EventizerTask.create_task({'uri': f'http://example.com/{i}'}, 60, 3,
+                                             datasource_type='git',
+                                             datasource_category='commit')
+            _enqueue_task(task)
+            self.tasks.append(task)
+        self.connection = django_rq.get_connection()
+
+    def delete_rq_job(self, task):
+        job_db = task.jobs.first()
+        rq.job.Job.fetch(job_db.uuid, connection=self.connection).delete()
+
+    def test_sweep(self):
+        """Jobs missing in Redis are rescheduled in pages"""
+
+        self.delete_rq_job(self.tasks[0])
+        self.delete_rq_job(self.tasks[3])
+
+        reconciler = TaskReconciler(self.connection, batch_size=2)
+        metrics = reconciler.sweep()
+
+        self.assertDictEqual(metrics, {'checked': 5, 'rescheduled': 2})
+
+        for task in self.tasks:
+            job_db = task.jobs.first()
+            self.assertEqual(job_db.status, SchedulerStatus.ENQUEUED)
+            job_rq = rq.job.Job.fetch(job_db.uuid, connection=self.connection)
+            self.assertEqual(job_rq.id, job_db.uuid)
+
+        # Nothing is rescheduled when the jobs exist
+        metrics = reconciler.sweep()
+        self.assertDictEqual(metrics, {'checked': 5, 'rescheduled': 0})
+
+    def test_sweep_only_maintained_tasks(self):
+        """Tasks that finished are not checked"""
+
+        EventizerTask.objects.filter(pk=self.tasks[0].pk).update(status=SchedulerStatus.COMPLETED)
+        self.delete_rq_job(self.tasks[0])
+
+        reconciler = TaskReconciler(self.connection)
+        metrics = reconciler.sweep()
+
+        self.assertDictEqual(metrics, {'checked': 4, 'rescheduled': 0})
+
+    def test_rate_limit(self):
+        """The reconciler waits between pages to keep the rate"""
+
+        reconciler = TaskReconciler(self.connection, batch_size=2, rate_limit=10)
+
+        with unittest.mock.patch.object(reconciler, '_sleep') as sleep:
+            reconciler.sweep()
+
+        # Three pages of 2, 2 and 1 tasks
+        self.assertEqual(sleep.call_count, 3)
+        waits = [call.args[0] for call in sleep.call_args_list]
+        self.assertTrue(0 < waits[0] <= 0.2)
+        self.assertTrue(0 < waits[2] <= 0.1)
+
+    def test_metrics(self):
+        """Metrics of the sweeps are stored in Redis"""
+
+        self.delete_rq_job(self.tasks[1])
+
+        reconciler = TaskReconciler(self.connection)
+        reconciler.sweep()
+        reconciler.sweep()
+
+        metrics = get_reconciler_metrics(self.connection)
+
+        self.assertEqual(metrics['sweeps'], '2')
+        self.assertEqual(metrics['total_checked'], '10')
+        self.assertEqual(metrics['total_rescheduled'], '1')
+        self.assertEqual(metrics['last_sweep_checked'], '5')
+        self.assertEqual(metrics['last_sweep_rescheduled'], '0')
+        self.assertIn('last_sweep_at', metrics)
+
+        response = Client().get('/scheduler/reconciler/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_rescheduled'], '1')
+
+    def test_stop(self):
+        """The reconciler stops running when it's requested"""
+
+        reconciler = TaskReconciler(self.connection)
+
+        with unittest.mock.patch.object(reconciler, 'sweep',
+                                        side_effect=reconciler.stop) as sweep:
+            reconciler.run(interval=60)
+
+        sweep.assert_called_once()
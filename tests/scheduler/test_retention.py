@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+import datetime
+
+from click.testing import CliRunner
+
+from grimoirelab_toolkit.datetime import datetime_utcnow
+
+from grimoirelab.core.runner.commands.admin import admin
+from grimoirelab.core.scheduler.models import SchedulerStatus
+from grimoirelab.core.scheduler.retention import prune_jobs
+from grimoirelab.core.scheduler.tasks.models import EventizerJob, EventizerTask, JobLogChunk
+
+from ..base import GrimoireLabTestCase
+
+
+class TestPruneJobs(GrimoireLabTestCase):
+    """Unit tests for the jobs retention policy"""
+
+    def setUp(self):
+        super().setUp()
+
+        self.register_task_models((EventizerTask, EventizerJob))
+
+        now = datetime_utcnow()
+
+        # Jobs 2 and 3 failed; 2 recently. Job 4 is still running.
+        status = {
+            2: (SchedulerStatus.FAILED, now - datetime.timedelta(days=1)),
+            3: (SchedulerStatus.FAILED, now - datetime.timedelta(days=60)),
+            4: (SchedulerStatus.RUNNING, None),
+        }
+        self.task = self.create_task('http://example.com/a.git', 15, status)
+        self.other_task = self.create_task('http://example.com/b.git', 3, {})
+
+        for job_num in (1, 6):
+            JobLogChunk.archive(f'{self.task.uuid}-{job_num}', 0, [b'{"msg": "Message"}'])
+
+    def create_task(self, uri, njobs, status):
+        task = EventizerTask.create_task({'uri': uri}, 60, 3,
+                                         datasource_type='git',
+                                         datasource_category='commit')
+        for job_num in range(1, njobs + 1):
+            job_status, finished_at = status.get(job_num, (SchedulerStatus.COMPLETED,
+                                                           datetime_utcnow()))
+            task.jobs.create(uuid=f'{task.uuid}-{job_num}', job_num=job_num,
+                             status=job_status, finished_at=finished_at,
+                             queue='eventizer_jobs')
+        task.job_count = njobs
+        task.save()
+        return task
+
+    def job_nums(self, task):
+        return list(task.jobs.order_by('job_num').values_list('job_num', flat=True))
+
+    def test_prune_jobs(self):
+        """Old jobs are removed, except recent failures and running jobs"""
+
+        pruned = prune_jobs(keep_jobs=10, keep_failed_days=30, batch_size=4)
+
+        self.assertEqual(pruned, 3)
+        self.assertListEqual(self.job_nums(self.task), [2, 4] + list(range(6, 16)))
+        self.assertListEqual(self.job_nums(self.other_task), [1, 2, 3])
+
+        # Archived logs are removed with their jobs
+        chunks = JobLogChunk.objects.values_list('job_uuid', flat=True)
+        self.assertListEqual(list(chunks), [f'{self.task.uuid}-6'])
+
+        # Nothing else is removed
+        self.assertEqual(prune_jobs(keep_jobs=10, keep_failed_days=30), 0)
+
+    def test_prune_jobs_queries(self):
+        """Each range is pruned with a fixed number of queries"""
+
+        # Bounds of the primary keys, and a single range with
+        # BEGIN, SELECT, one DELETE per table and COMMIT
+        with self.assertNumQueries(6):
+            pruned = prune_jobs(keep_jobs=10, keep_failed_days=30, batch_size=100)
+
+        self.assertEqual(pruned, 3)
+
+    def test_prune_failed_jobs(self):
+        """Failed jobs are removed after the days set"""
+
+        pruned = prune_jobs(keep_jobs=13, keep_failed_days=30)
+
+        self.assertEqual(pruned, 1)
+        self.assertListEqual(self.job_nums(self.task), list(range(2, 16)))
+
+        pruned = prune_jobs(keep_jobs=13, keep_failed_days=0)
+
+        self.assertEqual(pruned, 1)
+        self.assertListEqual(self.job_nums(self.task), list(range(3, 16)))
+
+    def test_keep_latest_job(self):
+        """The latest job of each task is always kept"""
+
+        with self.assertRaisesRegex(ValueError, 'at least one job'):
+            prune_jobs(keep_jobs=0)
+
+        prune_jobs(keep_jobs=1, keep_failed_days=0)
+
+        self.assertListEqual(self.job_nums(self.task), [4, 15])
+        self.assertListEqual(self.job_nums(self.other_task), [3])
+
+    def test_prune_command(self):
+        """Jobs are pruned from the command line"""
+
+        runner = CliRunner()
+        result = runner.invoke(admin, ['jobs', 'prune', '--keep-jobs', '10'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("3 jobs pruned.", result.output)
+
+        result = runner.invoke(admin, ['jobs', 'prune', '--keep-jobs', '0'])
+        self.assertEqual(result.exit_code, 2)
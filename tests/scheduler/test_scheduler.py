@@ -20,26 +20,42 @@ import unittest.mock
 
 import datetime
 import django.db
+import django.test.utils
 import django_rq.workers
 import rq.job
 
 import grimoirelab_toolkit.datetime
 
-from grimoirelab.core.scheduler.db import find_job
+from click.testing import CliRunner
+
+from grimoirelab.core.runner.commands.admin import admin
+from grimoirelab.core.scheduler.db import find_job, find_job_from_meta
 from grimoirelab.core.scheduler.errors import NotFoundError
 from grimoirelab.core.scheduler.models import (
     Task,
     SchedulerStatus,
     register_task_model,
     GRIMOIRELAB_TASK_MODELS)
+from grimoirelab.core.scheduler import scheduler
 from grimoirelab.core.scheduler.scheduler import (
     schedule_task,
+    schedule_tasks,
     cancel_task,
+    cancel_tasks,
+    pause_tasks,
+    resume_tasks,
     maintain_tasks,
     _enqueue_task,
     _on_success_callback,
     _on_failure_callback
 )
+from grimoirelab.core.scheduler.tasks.models import (
+    EventizerJob,
+    EventizerTask,
+    JobLogChunk,
+    StorageJob,
+    StorageTask
+)
 
 from ..base import GrimoireLabTestCase
 
@@ -238,6 +254,12 @@ class TestScheduleTask(GrimoireLabTestCase):
         self.assertEqual(job.task, task)
         self.assertGreaterEqual(job.scheduled_at, enqueued_at)
 
+        # The RQ job identifies the job in the database
+        job_rq = rq.job.Job.fetch(job.uuid, connection=django_rq.get_connection())
+        self.assertEqual(job_rq.meta['task_type'], 'test_task')
+        self.assertEqual(job_rq.meta['task_pk'], task.pk)
+        self.assertEqual(job_rq.meta['job_pk'], job.pk)
+
         # Run the job
         before_run_call_dt = grimoirelab_toolkit.datetime.datetime_utcnow()
         worker = django_rq.workers.get_worker(job.queue)
@@ -261,6 +283,61 @@ class TestScheduleTask(GrimoireLabTestCase):
         self.assertGreater(job.finished_at, before_run_call_dt)
         self.assertLess(job.finished_at, after_run_call_dt)
 
+    def test_enqueue_task_job_count(self):
+        """Jobs are numbered with the counter of the task"""
+
+        task = SchedulerTestTask.create_task({'a': 1, 'b': 2}, 360, 10)
+
+        for expected in range(1, 4):
+            with django.test.utils.CaptureQueriesContext(django.db.connection) as queries:
+                job = _enqueue_task(task)
+
+            self.assertEqual(job.job_num, expected)
+            self.assertEqual(task.job_count, expected)
+            self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+
+        task.refresh_from_db()
+        self.assertEqual(task.job_count, 3)
+
+    def test_enqueue_task_updated_columns(self):
+        """Only the scheduling data of the task is written"""
+
+        task = SchedulerTestTask.create_task({'a': 1, 'b': 2}, 360, 10)
+
+        with django.test.utils.CaptureQueriesContext(django.db.connection) as queries:
+            _enqueue_task(task)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertIn('"job_count"', updates[0])
+        self.assertIn('"scheduled_at"', updates[1])
+        for sql in updates:
+            self.assertNotIn('"task_args"', sql)
+            self.assertNotIn('"runs"', sql)
+
+    def test_enqueue_paused_task(self):
+        """The job is removed when the task is paused while it's enqueued"""
+
+        task = SchedulerTestTask.create_task({'a': 1, 'b': 2}, 360, 10)
+        job_meta = scheduler._job_meta
+
+        registry = django_rq.get_queue('testing').scheduled_job_registry
+        job_ids = registry.get_job_ids()
+
+        def meta_and_pause(task, job):
+            SchedulerTestTask.objects.filter(pk=task.pk).update(status=SchedulerStatus.PAUSED)
+            return job_meta(task, job)
+
+        with unittest.mock.patch('grimoirelab.core.scheduler.scheduler._job_meta',
+                                 side_effect=meta_and_pause):
+            self.assertIsNone(_enqueue_task(task))
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, SchedulerStatus.PAUSED)
+        self.assertEqual(task.jobs.count(), 0)
+
+        self.assertListEqual(registry.get_job_ids(), job_ids)
+
     @unittest.mock.patch('django_rq.get_queue')
     def test_error_enqueuing_task(self, mock_get_queue):
         """An exception is raised when an error occurs enqueuing the task"""
@@ -276,6 +353,99 @@ class TestScheduleTask(GrimoireLabTestCase):
             _enqueue_task(task, scheduled_at=None)
 
 
+class TestScheduleTasks(GrimoireLabTestCase):
+    """Unit tests for scheduling tasks in bulk"""
+
+    def setUp(self):
+        GRIMOIRELAB_TASK_MODELS.clear()
+        task_class, job_class = register_task_model('test_task', SchedulerTestTask)
+
+        def cleanup_test_model():
+            with django.db.connection.schema_editor() as schema_editor:
+                schema_editor.delete_model(job_class)
+                schema_editor.delete_model(task_class)
+
+        with django.db.connection.schema_editor() as schema_editor:
+            schema_editor.create_model(task_class)
+            schema_editor.create_model(job_class)
+
+        self.addCleanup(cleanup_test_model)
+        super().setUp()
+
+    def test_schedule_tasks(self):
+        """Valid tasks are created and enqueued; errors are reported"""
+
+        tasks = [
+            {'task_args': {'a': 1, 'b': 2}},
+            {'job_interval': 10},
+            {'task_args': {'a': 3, 'b': 4}, 'job_interval': 10, 'job_max_retries': 2},
+            {'task_args': {'a': 5, 'b': 6}, 'job_interval': 'daily'},
+            {'task_args': {'a': 7, 'b': 8}, 'burst': 'maybe'},
+        ]
+
+        results = schedule_tasks('test_task', tasks, batch_size=1)
+
+        self.assertEqual(len(results), 5)
+        self.assertIsNone(results[0][1])
+        self.assertEqual(results[1], (None, "missing argument 'task_args'"))
+        self.assertIsNone(results[2][1])
+        self.assertIsNone(results[3][0])
+        self.assertIn("must be an integer", results[3][1])
+        self.assertIsNone(results[4][0])
+        self.assertIn("must be either True or False", results[4][1])
+
+        self.assertEqual(SchedulerTestTask.objects.count(), 2)
+
+        task = SchedulerTestTask.objects.get(uuid=results[2][0].uuid)
+        self.assertEqual(task.status, SchedulerStatus.ENQUEUED)
+        self.assertEqual(task.job_interval, 10)
+        self.assertEqual(task.job_max_retries, 2)
+
+        job = task.jobs.get()
+        self.assertEqual(job.job_num, 1)
+        self.assertEqual(job.status, SchedulerStatus.ENQUEUED)
+        self.assertEqual(job.job_args, {'a': 3, 'b': 4})
+
+        job_rq = rq.job.Job.fetch(job.uuid, connection=django_rq.get_connection())
+        self.assertEqual(job_rq.meta['job_pk'], job.pk)
+        self.assertEqual(job_rq.meta['task_pk'], task.pk)
+
+        # Enqueued jobs run
+        worker = django_rq.workers.get_worker('testing')
+        worker.work(burst=True, with_scheduler=True)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, SchedulerStatus.COMPLETED)
+        self.assertEqual(job.progress, 7)
+
+    def test_schedule_tasks_queries(self):
+        """The number of queries doesn't depend on the number of tasks"""
+
+        tasks = [{'task_args': {'a': i, 'b': i}} for i in range(50)]
+
+        # Two inserts in a transaction
+        with self.assertNumQueries(4):
+            results = schedule_tasks('test_task', tasks)
+
+        self.assertTrue(all(error is None for _, error in results))
+        self.assertEqual(SchedulerTestTask.objects.count(), 50)
+
+    @unittest.mock.patch('django_rq.get_queue')
+    def test_schedule_tasks_enqueue_error(self, mock_get_queue):
+        """Tasks are set as failed when their jobs can't be enqueued"""
+
+        mock_get_queue.side_effect = Exception("Error getting queue")
+
+        results = schedule_tasks('test_task', [{'task_args': {'a': 1, 'b': 2}}])
+
+        task, error = results[0]
+        self.assertEqual(error, "Error getting queue")
+
+        task = SchedulerTestTask.objects.get(uuid=task.uuid)
+        self.assertEqual(task.status, SchedulerStatus.FAILED)
+        self.assertEqual(task.jobs.get().status, SchedulerStatus.FAILED)
+
+
 class TestMaintainTasks(GrimoireLabTestCase):
     """Class for testing the maintenance of tasks"""
 
@@ -435,6 +605,65 @@ class TestMaintainTasks(GrimoireLabTestCase):
         job_rq = rq.job.Job.fetch(job_db.uuid, connection=django_rq.get_connection())
         self.assertEqual(job_rq.id, job_db.uuid)
 
+    def test_maintain_tasks_batches(self):
+        """Missing jobs are rescheduled in batches with a fixed number of queries"""
+
+        task_args = {
+            'a': 1,
+            'b': 2,
+        }
+
+        tasks = [schedule_task('test_task', task_args) for _ in range(6)]
+
+        # Delete some of the jobs to create the inconsistent state
+        missing = tasks[1::2]
+        for task in missing:
+            job_db = task.jobs.first()
+            rq.job.Job.fetch(job_db.uuid, connection=django_rq.get_connection()).delete()
+
+        # One query to select the tasks of each model; per batch,
+        # one to get the jobs, one to update each rescheduled task
+        # and one to update the jobs
+        with self.assertNumQueries(2 + (1 + 2 + 1) + (1 + 1 + 1)):
+            maintain_tasks(batch_size=4)
+
+        for task in tasks:
+            job_db = task.jobs.first()
+            self.assertEqual(job_db.status, SchedulerStatus.ENQUEUED)
+            job_rq = rq.job.Job.fetch(job_db.uuid, connection=django_rq.get_connection())
+            self.assertEqual(job_rq.id, job_db.uuid)
+
+        # Nothing else is rescheduled when all the jobs exist
+        with self.assertNumQueries(2 + 2):
+            maintain_tasks(batch_size=4)
+
+    def test_maintain_paused_while_rescheduling(self):
+        """Jobs of tasks paused before they are rescheduled are removed"""
+
+        task_args = {
+            'a': 1,
+            'b': 2,
+        }
+
+        task = schedule_task('test_task', task_args)
+        job_db = task.jobs.first()
+        rq.job.Job.fetch(job_db.uuid, connection=django_rq.get_connection()).delete()
+
+        reschedule_jobs = scheduler._reschedule_jobs
+
+        def pause_and_reschedule(*args, **kwargs):
+            pause_tasks(uuids=[task.uuid])
+            return reschedule_jobs(*args, **kwargs)
+
+        with unittest.mock.patch('grimoirelab.core.scheduler.scheduler._reschedule_jobs',
+                                 side_effect=pause_and_reschedule):
+            maintain_tasks()
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, SchedulerStatus.PAUSED)
+        self.assertEqual(task.jobs.count(), 0)
+        self.assertFalse(rq.job.Job.exists(job_db.uuid, connection=django_rq.get_connection()))
+
 
 class TestCancelTask(GrimoireLabTestCase):
     """Unit tests for canceling tasks"""
@@ -511,6 +740,189 @@ class TestCancelTask(GrimoireLabTestCase):
             cancel_task('non-existent-task-uuid')
 
 
+class TestTasksBySelector(GrimoireLabTestCase):
+    """Unit tests for canceling, pausing and resuming sets of tasks"""
+
+    def setUp(self):
+        super().setUp()
+
+        self.register_task_models((EventizerTask, EventizerJob),
+                                  (StorageTask, StorageJob))
+
+        self.connection = django_rq.get_connection()
+
+        self.git_tasks = [
+            self.create_task({'uri': f'http://example.com/{i}.git'}, 'git', 'commit')
+            for i in range(3)
+        ]
+        self.github_task = self.create_task({'owner': 'chaoss', 'repository': 'grimoirelab'},
+                                            'github', 'issue')
+        self.storage_task = StorageTask.create_task({}, 60, 3, storage_type='opensearch')
+        _enqueue_task(self.storage_task)
+
+    def create_task(self, task_args, datasource_type, datasource_category):
+        task = EventizerTask.create_task(task_args, 60, 3,
+                                         datasource_type=datasource_type,
+                                         datasource_category=datasource_category)
+        _enqueue_task(task)
+        return task
+
+    def rq_job_exists(self, job_uuid):
+        return rq.job.Job.exists(job_uuid, connection=self.connection)
+
+    def test_pause_tasks(self):
+        """Selected tasks are paused and their pending jobs removed"""
+
+        uuids = [task.jobs.get().uuid for task in self.git_tasks]
+
+        paused = pause_tasks(batch_size=2, datasource_type='git')
+        self.assertEqual(paused, 3)
+
+        for task, job_uuid in zip(self.git_tasks, uuids):
+            task.refresh_from_db()
+            self.assertEqual(task.status, SchedulerStatus.PAUSED)
+            self.assertEqual(task.jobs.count(), 0)
+            self.assertFalse(self.rq_job_exists(job_uuid))
+
+        # Other tasks are not paused
+        for task in (self.github_task, self.storage_task):
+            task.refresh_from_db()
+            self.assertEqual(task.status, SchedulerStatus.ENQUEUED)
+            self.assertTrue(self.rq_job_exists(task.jobs.get().uuid))
+
+        # Paused tasks are not maintained
+        maintain_tasks()
+
+        for task in self.git_tasks:
+            self.assertEqual(task.jobs.count(), 0)
+
+        # Tasks already paused are not paused again
+        self.assertEqual(pause_tasks(datasource_type='git'), 0)
+
+    def test_resume_tasks(self):
+        """Paused tasks are enqueued again"""
+
+        pause_tasks(datasource_type='git')
+
+        resumed = resume_tasks(batch_size=2, datasource_type='git', datasource_category='commit')
+        self.assertEqual(resumed, 3)
+
+        for task in self.git_tasks:
+            task.refresh_from_db()
+            self.assertEqual(task.status, SchedulerStatus.ENQUEUED)
+            self.assertEqual(task.job_count, 2)
+
+            job_db = task.jobs.get()
+            self.assertEqual(job_db.job_num, 2)
+            self.assertEqual(job_db.status, SchedulerStatus.ENQUEUED)
+            self.assertEqual(job_db.job_args['job_args']['uri'], task.task_args['uri'])
+            self.assertTrue(self.rq_job_exists(job_db.uuid))
+
+        # Only paused tasks are resumed
+        self.assertEqual(resume_tasks(datasource_type='github'), 0)
+
+    def test_cancel_tasks(self):
+        """Selected tasks and their jobs are removed"""
+
+        # The job of a task is not in Redis anymore
+        job_db = self.git_tasks[0].jobs.get()
+        rq.job.Job.fetch(job_db.uuid, connection=self.connection).delete()
+
+        uuids = [task.uuid for task in self.git_tasks[:2]] + [self.storage_task.uuid]
+        jobs = list(EventizerJob.objects.filter(task__uuid__in=uuids).values_list('uuid', flat=True))
+        jobs += list(StorageJob.objects.filter(task__uuid__in=uuids).values_list('uuid', flat=True))
+
+        canceled = cancel_tasks(uuids=uuids)
+        self.assertEqual(canceled, 3)
+
+        self.assertListEqual(
+            list(EventizerTask.objects.order_by('pk').values_list('uuid', flat=True)),
+            [self.git_tasks[2].uuid, self.github_task.uuid]
+        )
+        self.assertEqual(StorageTask.objects.count(), 0)
+        self.assertEqual(EventizerJob.objects.count(), 2)
+        self.assertEqual(StorageJob.objects.count(), 0)
+
+        for job_uuid in jobs:
+            self.assertFalse(self.rq_job_exists(job_uuid))
+
+    def test_cancel_tasks_queries(self):
+        """The number of queries doesn't depend on the number of jobs"""
+
+        for task in self.git_tasks:
+            for job_num in range(2, 12):
+                job_db = task.jobs.create(uuid=f'{task.uuid}-{job_num}', job_num=job_num,
+                                          status=SchedulerStatus.COMPLETED)
+                JobLogChunk.archive(job_db.uuid, 0, [b'{"msg": "Message"}'])
+
+        # Pages of 2, 1 and 0 tasks. Each batch updates the tasks, reads
+        # their jobs and, in a transaction, deletes the chunks, reads the
+        # keys of the tasks, and deletes the jobs and the tasks.
+        with self.assertNumQueries(3 + 2 * 8):
+            canceled = cancel_tasks(batch_size=2, datasource_type='git')
+
+        self.assertEqual(canceled, 3)
+        self.assertEqual(EventizerJob.objects.count(), 1)
+        self.assertEqual(JobLogChunk.objects.count(), 0)
+
+    def test_pause_completed_tasks(self):
+        """Tasks that completed a job and are rescheduled can be paused"""
+
+        EventizerTask.objects.filter(pk=self.git_tasks[0].pk).update(status=SchedulerStatus.COMPLETED)
+        EventizerTask.objects.filter(pk=self.git_tasks[1].pk).update(status=SchedulerStatus.COMPLETED,
+                                                                     burst=True)
+
+        self.assertEqual(pause_tasks(datasource_type='git'), 2)
+
+        # Burst tasks that completed are finished
+        self.git_tasks[1].refresh_from_db()
+        self.assertEqual(self.git_tasks[1].status, SchedulerStatus.COMPLETED)
+
+    def test_selectors(self):
+        """Tasks are selected by status; models without a field don't match"""
+
+        EventizerTask.objects.filter(pk=self.github_task.pk).update(status=SchedulerStatus.FAILED)
+
+        self.assertEqual(pause_tasks(status=[SchedulerStatus.ENQUEUED]), 4)
+        self.assertEqual(cancel_tasks(status=[SchedulerStatus.FAILED]), 1)
+        self.assertEqual(resume_tasks(datasource_category='commit'), 3)
+
+        # Storage tasks don't have a data source
+        self.storage_task.refresh_from_db()
+        self.assertEqual(self.storage_task.status, SchedulerStatus.PAUSED)
+
+    def test_no_selector(self):
+        """An error is raised when there isn't any selector"""
+
+        for func in (cancel_tasks, pause_tasks, resume_tasks):
+            with self.assertRaisesRegex(ValueError, 'selector'):
+                func()
+
+    def test_admin_commands(self):
+        """Tasks are paused and resumed from the command line"""
+
+        runner = CliRunner()
+
+        result = runner.invoke(admin, ['tasks', 'pause', '--datasource-type', 'git'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("3 tasks paused.", result.output)
+
+        result = runner.invoke(admin, ['tasks', 'resume', '--status', 'Paused'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("3 tasks resumed.", result.output)
+
+        result = runner.invoke(admin, ['tasks', 'cancel', '--uuid', self.github_task.uuid])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("1 tasks canceled.", result.output)
+
+        result = runner.invoke(admin, ['tasks', 'cancel'])
+        self.assertEqual(result.exit_code, 2)
+
+        result = runner.invoke(admin, ['tasks', 'pause', '--status', 'sleeping'])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("unknown status 'sleeping'", result.output)
+
+
 class TestOnSuccessCallback(GrimoireLabTestCase):
     """Unit tests for the default on_success_callback function"""
 
@@ -589,6 +1001,97 @@ class TestOnSuccessCallback(GrimoireLabTestCase):
         # No new job was created
         self.assertEqual(self.job_class.objects.count(), 1)
 
+    def test_paused_task(self):
+        """Task is not re-scheduled when it was paused while running"""
+
+        task_args = {
+            'a': 1,
+            'b': 2,
+        }
+        task = OnSuccessCallbackTestTask.create_task(task_args, 360, 10)
+        job = _enqueue_task(task, scheduled_at=None)
+
+        self.task_class.objects.filter(pk=task.pk).update(status=SchedulerStatus.PAUSED)
+
+        # Run the job
+        worker = django_rq.workers.get_worker(job.queue)
+        processed = worker.work(burst=True, with_scheduler=True)
+        self.assertEqual(processed, True)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, SchedulerStatus.COMPLETED)
+
+        # The run was saved but the task is still paused
+        task.refresh_from_db()
+        self.assertEqual(task.status, SchedulerStatus.PAUSED)
+        self.assertEqual(task.runs, 1)
+
+        # No new job was created
+        self.assertEqual(self.job_class.objects.count(), 1)
+
+    def test_paused_while_finishing(self):
+        """Task is not re-scheduled when it's paused after the callback loads it"""
+
+        task_args = {
+            'a': 1,
+            'b': 2,
+        }
+        task = OnSuccessCallbackTestTask.create_task(task_args, 360, 10)
+        job = _enqueue_task(task, scheduled_at=None)
+
+        def find_and_pause(rq_job):
+            job_db = find_job_from_meta(rq_job)
+            self.task_class.objects.filter(pk=job_db.task.pk).update(status=SchedulerStatus.PAUSED)
+            return job_db
+
+        with unittest.mock.patch('grimoirelab.core.scheduler.scheduler.find_job_from_meta',
+                                 side_effect=find_and_pause):
+            worker = django_rq.workers.get_worker(job.queue)
+            processed = worker.work(burst=True, with_scheduler=True)
+            self.assertEqual(processed, True)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, SchedulerStatus.PAUSED)
+        self.assertEqual(task.runs, 1)
+        self.assertEqual(self.job_class.objects.count(), 1)
+
+        # Paused tasks are not enqueued
+        self.assertIsNone(_enqueue_task(task))
+        self.assertEqual(self.job_class.objects.count(), 1)
+
+    def test_resumed_while_running(self):
+        """Task resumed while its job runs is re-scheduled only once"""
+
+        task_args = {
+            'a': 1,
+            'b': 2,
+        }
+        task = OnSuccessCallbackTestTask.create_task(task_args, 360, 10)
+        job = _enqueue_task(task, scheduled_at=None)
+
+        def find_pause_and_resume(rq_job):
+            # Job and task are running, as the worker sets them
+            self.job_class.objects.filter(task=task).update(status=SchedulerStatus.RUNNING)
+            self.task_class.objects.filter(pk=task.pk).update(status=SchedulerStatus.RUNNING)
+
+            self.assertEqual(pause_tasks(uuids=[task.uuid]), 1)
+            self.assertEqual(resume_tasks(uuids=[task.uuid]), 1)
+            return find_job_from_meta(rq_job)
+
+        with unittest.mock.patch('grimoirelab.core.scheduler.scheduler.find_job_from_meta',
+                                 side_effect=find_pause_and_resume):
+            worker = django_rq.workers.get_worker(job.queue)
+            processed = worker.work(burst=True, with_scheduler=True)
+            self.assertEqual(processed, True)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, SchedulerStatus.ENQUEUED)
+        self.assertEqual(task.job_count, 2)
+
+        jobs = self.job_class.objects.filter(task=task).order_by('job_num')
+        self.assertListEqual([(job_db.job_num, job_db.status) for job_db in jobs],
+                             [(1, SchedulerStatus.COMPLETED), (2, SchedulerStatus.ENQUEUED)])
+
     @unittest.mock.patch('grimoirelab.core.scheduler.scheduler.datetime_utcnow')
     def test_interval_between_jobs(self, mock_utcnow):
         """Task is re-scheduled to run after the given interval"""
@@ -709,6 +1212,31 @@ class TestOnFailureCallback(GrimoireLabTestCase):
         # A new job was created
         self.assertEqual(self.job_class.objects.count(), 2)
 
+    def test_paused_while_failing(self):
+        """Task is not retried when it's paused after the callback loads it"""
+
+        task_args = {
+            'a': 1,
+            'b': 2,
+        }
+        task = OnFailureCallbackTestTask.create_task(task_args, 360, 10)
+        job = _enqueue_task(task, scheduled_at=None)
+
+        def find_and_pause(rq_job):
+            job_db = find_job_from_meta(rq_job)
+            self.task_class.objects.filter(pk=job_db.task.pk).update(status=SchedulerStatus.PAUSED)
+            return job_db
+
+        with unittest.mock.patch('grimoirelab.core.scheduler.scheduler.find_job_from_meta',
+                                 side_effect=find_and_pause):
+            worker = django_rq.workers.get_worker(job.queue)
+            worker.work(burst=True, with_scheduler=True)
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, SchedulerStatus.PAUSED)
+        self.assertEqual(task.failures, 1)
+        self.assertEqual(self.job_class.objects.count(), 1)
+
     def test_maximum_tries(self):
         """The task is not re-scheduled after a number of tries"""
 
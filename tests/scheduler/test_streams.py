@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) GrimoireLab Contributors
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+from unittest.mock import patch
+
+from click.testing import CliRunner
+from django.test import override_settings
+
+from grimoirelab.core.runner.commands.admin import admin
+from grimoirelab.core.scheduler.streams import (
+    get_stream_partition,
+    stream_backlog,
+    stream_partition_name,
+    stream_partition_names
+)
+from grimoirelab.core.scheduler.tasks.models import EventizerTask, StorageTask
+
+from ..base import GrimoireLabTestCase
+
+
+class TestStreamPartitions(GrimoireLabTestCase):
+    """Unit tests for the stream partitions functions"""
+
+    def test_get_stream_partition(self):
+        """The partition is stable and within the range"""
+
+        partitions = [get_stream_partition(f'task-{i}', 4) for i in range(100)]
+
+        self.assertTrue(all(0 <= p < 4 for p in partitions))
+        self.assertEqual(set(partitions), {0, 1, 2, 3})
+
+        # The same key is always assigned to the same partition
+        self.assertListEqual(partitions,
+                             [get_stream_partition(f'task-{i}', 4) for i in range(100)])
+
+    def test_single_partition(self):
+        """There is only one partition when the stream is not partitioned"""
+
+        self.assertEqual(get_stream_partition('task-1', 1), 0)
+
+    def test_invalid_partitions(self):
+        """Check if it fails when the number of partitions is not valid"""
+
+        with self.assertRaisesRegex(ValueError, 'partitions'):
+            get_stream_partition('task-1', 0)
+
+    def test_stream_partition_name(self):
+        """The first partition uses the name of the stream"""
+
+        self.assertEqual(stream_partition_name('events', 0), 'events')
+        self.assertEqual(stream_partition_name('events', 3), 'events:3')
+
+        names = list(stream_partition_names('events', 3))
+        self.assertListEqual(names, ['events', 'events:1', 'events:2'])
+
+
+class TestStreamBacklog(GrimoireLabTestCase):
+    """Unit tests for stream_backlog function"""
+
+    def test_backlog(self):
+        """The backlog of the slowest group is returned"""
+
+        groups = [
+            {'name': b'archivist', 'pending': 20, 'lag': 100},
+            {'name': b'other', 'pending': 5, 'lag': 200},
+        ]
+
+        with patch.object(self.conn, 'xinfo_groups', return_value=groups):
+            self.assertEqual(stream_backlog(self.conn, 'events'), 205)
+
+    def test_backlog_unknown_lag(self):
+        """The length of the stream is used when the lag is unknown"""
+
+        for i in range(30):
+            self.conn.xadd('events', {'data': f'event {i}'})
+
+        groups = [{'name': b'archivist', 'pending': 5, 'lag': None}]
+
+        with patch.object(self.conn, 'xinfo_groups', return_value=groups):
+            self.assertEqual(stream_backlog(self.conn, 'events'), 35)
+
+    def test_backlog_no_groups(self):
+        """The length of the stream is the backlog when there are no groups"""
+
+        for i in range(3):
+            self.conn.xadd('events', {'data': f'event {i}'})
+
+        self.assertEqual(stream_backlog(self.conn, 'events'), 3)
+
+    def test_backlog_no_stream(self):
+        """There is no backlog when the stream doesn't exist"""
+
+        self.assertEqual(stream_backlog(self.conn, 'events'), 0)
+
+
+@override_settings(GRIMOIRELAB_EVENTS_STREAM_NAME='events')
+class TestTaskPartitions(GrimoireLabTestCase):
+    """Unit tests for the partitions assigned to tasks"""
+
+    def create_storage_task(self, partition=None):
+        task_args = {'redis_group': 'archivist'}
+        if partition is not None:
+            task_args['partition'] = partition
+
+        return StorageTask.create_task(task_args, 1, 10, storage_type='opensearch')
+
+    @override_settings(GRIMOIRELAB_EVENTS_STREAM_PARTITIONS=4)
+    def test_eventizer_task(self):
+        """Events of a task are published in its partition"""
+
+        task = EventizerTask.create_task({'uri': 'http://example.com/'}, 60, 3,
+                                         datasource_type='git',
+                                         datasource_category='commit')
+
+        partition = get_stream_partition(task.uuid, 4)
+        expected = stream_partition_name('events', partition)
+
+        self.assertEqual(task.events_stream, expected)
+
+        # Jobs resolve the partition when they run
+        job_args = task.prepare_job_parameters()
+        self.assertEqual(job_args['events_stream'], 'events')
+        self.assertEqual(job_args['partition_key'], task.uuid)
+
+    def test_eventizer_task_no_partitions(self):
+        """Events are published in the stream when it is not partitioned"""
+
+        task = EventizerTask.create_task({'uri': 'http://example.com/'}, 60, 3,
+                                         datasource_type='git',
+                                         datasource_category='commit')
+
+        self.assertEqual(task.events_stream, 'events')
+
+    def test_storage_task(self):
+        """Archivists read events from their partition"""
+
+        task = self.create_storage_task(partition=2)
+
+        self.assertEqual(task.partition, 2)
+        self.assertEqual(task.events_stream, 'events:2')
+        self.assertEqual(task.prepare_job_parameters()['events_queue'], 'events:2')
+
+        # Tasks created without partition read the first one
+        task = self.create_storage_task()
+        self.assertEqual(task.partition, 0)
+        self.assertEqual(task.events_stream, 'events')
+
+
+@override_settings(GRIMOIRELAB_EVENTS_STREAM_NAME='events')
+class TestRebalanceCommand(GrimoireLabTestCase):
+    """Unit tests for the streams rebalance command"""
+
+    def setUp(self):
+        super().setUp()
+        self.tasks = [
+            StorageTask.create_task({'partition': 0}, 1, 10, storage_type='opensearch')
+            for _ in range(4)
+        ]
+        patcher = patch('django_rq.get_connection', return_value=self.conn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_partitions(self):
+        return [StorageTask.objects.get(pk=task.pk).partition for task in self.tasks]
+
+    @override_settings(GRIMOIRELAB_EVENTS_STREAM_PARTITIONS=2)
+    def test_rebalance(self):
+        """Archivists are spread across the partitions"""
+
+        runner = CliRunner()
+        result = runner.invoke(admin, ['streams', 'rebalance'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("4 archivists assigned to 2 partitions; 2 moved", result.output)
+        self.assertListEqual(self.get_partitions(), [0, 1, 0, 1])
+
+    @override_settings(GRIMOIRELAB_EVENTS_STREAM_PARTITIONS=2)
+    def test_rebalance_pending_events(self):
+        """Partitions with events not archived prevent the rebalance"""
+
+        with patch('grimoirelab.core.scheduler.streams.stream_backlog',
+                   side_effect=lambda conn, name: 1 if name == 'events' else 0):
+            runner = CliRunner()
+            result = runner.invoke(admin, ['streams', 'rebalance'])
+
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn("There are events not archived in: events (1)", result.output)
+            self.assertListEqual(self.get_partitions(), [0, 0, 0, 0])
+
+            result = runner.invoke(admin, ['streams', 'rebalance', '--force'])
+
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertListEqual(self.get_partitions(), [0, 1, 0, 1])
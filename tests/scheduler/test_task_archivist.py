@@ -17,29 +17,49 @@
 #
 
 import json
+import os
+import shutil
+import tempfile
+import threading
+import time
 from unittest.mock import patch
 
 import rq
 
+from grimoirelab.core.scheduler.compression import ZlibCompressor, encode_payload
 from grimoirelab.core.scheduler.jobs import GrimoireLabJob
 from grimoirelab.core.scheduler.tasks.archivist import (
     ArchivistProgress,
+    BulkBodyBuilder,
+    OpenSearchStorage,
     StorageBackend,
-    archivist_job
+    StreamEntry,
+    archivist_job,
+    dead_letter_stream_name,
+    _store_entries,
+    _store_pages
 )
 
 from ..base import GrimoireLabTestCase
 
 
+def make_entry(message_id, event):
+    """Create a stream entry for the given event"""
+
+    return StreamEntry(message_id, json.dumps(event).encode('utf-8'), event['id'])
+
+
 class MockStorageBackend(StorageBackend):
     """Class to store events in the class itself for later inspection"""
 
     events = []
+    batches = []
 
-    def store(self, events: iter) -> int:
-        events = [e for e in events]
+    def store(self, entries: list) -> list:
+        events = [entry.event for entry in entries]
         MockStorageBackend.events.extend(events)
-        return len(events)
+        MockStorageBackend.batches.append(events)
+        return [entry.message_id for entry in entries]
 
     @classmethod
     def get_events(cls):
@@ -48,6 +68,7 @@ class MockStorageBackend(StorageBackend):
     @classmethod
     def clear_events(cls):
         cls.events = []
+        cls.batches = []
 
 
 class TestArchivistJob(GrimoireLabTestCase):
@@ -121,6 +142,312 @@ class TestArchivistJob(GrimoireLabTestCase):
         for result_event, event in zip(stored_events, expected_events):
             self.assertDictEqual(result_event, event)
 
+    def test_job_read_pages(self):
+        """Events are read in pages and acknowledged once stored"""
+
+        expected_events = [
+            {'uuid': str(i), 'timestamp': '2021-01-01T00:00:00Z', 'data': f'event {i}'}
+            for i in range(10)
+        ]
+
+        for e in expected_events:
+            message = {
+                'data': json.dumps(e)
+            }
+            self.conn.xadd('test-events', message, maxlen=len(expected_events))
+
+        job_args = {
+            'storage_type': 'mock_storage',
+            'storage_url': 'example.com',
+            'storage_db_name': 'mock_db',
+            'storage_verify_certs': True,
+            'redis_group': 'archivist',
+            'consumer_name': 'consumer_1',
+            'events_queue': 'test-events',
+            'block_timeout': None,
+            'limit': 10,
+            'read_count': 4
+        }
+
+        conn = self.conn
+        acks = []
+
+        def xack(name, groupname, *ids):
+            acks.append(ids)
+            return conn.__class__.xack(conn, name, groupname, *ids)
+
+        with patch('grimoirelab.core.scheduler.tasks.archivist.get_storage_backend',
+                   return_value=MockStorageBackend), \
+                patch.object(self.conn, 'xack', side_effect=xack):
+            q = rq.Queue(
+                'test-queue',
+                job_class=GrimoireLabJob,
+                connection=self.conn,
+                is_async=False
+            )
+            job = q.enqueue(f=archivist_job,
+                            result_ttl=100,
+                            job_timeout=120,
+                            job_id='archive-events',
+                            **job_args)
+            result = job.return_value()
+
+        self.assertEqual(result.total, len(expected_events))
+
+        # Each page was stored and acknowledged at once
+        self.assertListEqual([len(batch) for batch in MockStorageBackend.batches], [4, 4, 2])
+        self.assertListEqual([len(ids) for ids in acks], [4, 4, 2])
+
+        pending = self.conn.xpending('test-events', 'archivist')
+        self.assertEqual(pending['pending'], 0)
+
+    def test_job_storage_error(self):
+        """Events are not acknowledged when they can't be stored"""
+
+        for i in range(10):
+            message = {
+                'data': json.dumps({'uuid': str(i), 'data': f'event {i}'})
+            }
+            self.conn.xadd('test-events', message, maxlen=10)
+
+        job_args = {
+            'storage_type': 'mock_storage',
+            'storage_url': 'example.com',
+            'storage_db_name': 'mock_db',
+            'storage_verify_certs': True,
+            'redis_group': 'archivist',
+            'consumer_name': 'consumer_1',
+            'events_queue': 'test-events',
+            'block_timeout': None,
+            'limit': 10,
+            'read_count': 4
+        }
+        with patch('grimoirelab.core.scheduler.tasks.archivist.get_storage_backend',
+                   return_value=MockStorageBackend), \
+                patch.object(MockStorageBackend, 'store', side_effect=Exception("Storage error")):
+            q = rq.Queue(
+                'test-queue',
+                job_class=GrimoireLabJob,
+                connection=self.conn,
+                is_async=False
+            )
+            job = q.enqueue(f=archivist_job,
+                            result_ttl=100,
+                            job_timeout=120,
+                            job_id='archive-events',
+                            **job_args)
+
+        self.assertTrue(job.is_failed)
+
+        # The first page is pending and will be recovered later
+        pending = self.conn.xpending('test-events', 'archivist')
+        self.assertEqual(pending['pending'], 4)
+
+    def test_job_ack_stored_events(self):
+        """Only the events persisted by the storage are acknowledged"""
+
+        message_ids = []
+        for i in range(10):
+            message = {
+                'data': json.dumps({'uuid': str(i), 'data': f'event {i}'})
+            }
+            message_ids.append(self.conn.xadd('test-events', message, maxlen=10))
+
+        job_args = {
+            'storage_type': 'mock_storage',
+            'storage_url': 'example.com',
+            'storage_db_name': 'mock_db',
+            'storage_verify_certs': True,
+            'redis_group': 'archivist',
+            'consumer_name': 'consumer_1',
+            'events_queue': 'test-events',
+            'block_timeout': None,
+            'limit': 10,
+            'store_retries': 1
+        }
+
+        # One entry fails once and other fails permanently
+        failures = {message_ids[2]: 1, message_ids[5]: 10}
+
+        def storage_backend(**kwargs):
+            return FailingStorageBackend(failures=failures, **kwargs)
+
+        with patch('grimoirelab.core.scheduler.tasks.archivist.get_storage_backend',
+                   return_value=storage_backend):
+            q = rq.Queue(
+                'test-queue',
+                job_class=GrimoireLabJob,
+                connection=self.conn,
+                is_async=False
+            )
+            job = q.enqueue(f=archivist_job,
+                            result_ttl=100,
+                            job_timeout=120,
+                            job_id='archive-events',
+                            **job_args)
+            result = job.return_value()
+
+        self.assertEqual(result.total, 9)
+
+        pending = self.conn.xpending_range('test-events', 'archivist', '-', '+', 10)
+        self.assertEqual(len(pending), 1)
+        self.assertEqual(pending[0]['message_id'], message_ids[5])
+
+    def test_job_compressed_events(self):
+        """Compressed and uncompressed events are stored"""
+
+        tmp_path = tempfile.mkdtemp(prefix='archivist_')
+        self.addCleanup(shutil.rmtree, tmp_path)
+
+        dictionary = b'{"uuid":"","timestamp":"2021-01-01T00:00:00Z","data":"event "}'
+        dictionary_path = os.path.join(tmp_path, 'events.dict')
+        with open(dictionary_path, 'wb') as fd:
+            fd.write(dictionary)
+
+        compressors = [
+            None,
+            ZlibCompressor(),
+            ZlibCompressor(dictionary=dictionary)
+        ]
+
+        expected_events = []
+        for i in range(9):
+            event = {'uuid': str(i), 'timestamp': '2021-01-01T00:00:00Z', 'data': f'event {i}' * 10}
+            data = json.dumps(event).encode('utf-8')
+            message = encode_payload(data, compressors[i % 3])
+            self.conn.xadd('test-events', message, maxlen=10)
+            expected_events.append(event)
+
+        job_args = {
+            'storage_type': 'mock_storage',
+            'storage_url': 'example.com',
+            'storage_db_name': 'mock_db',
+            'storage_verify_certs': True,
+            'redis_group': 'archivist',
+            'consumer_name': 'consumer_1',
+            'events_queue': 'test-events',
+            'block_timeout': None,
+            'limit': 10,
+            'compression_dict': dictionary_path
+        }
+        with patch('grimoirelab.core.scheduler.tasks.archivist.get_storage_backend',
+                   return_value=MockStorageBackend):
+            q = rq.Queue(
+                'test-queue',
+                job_class=GrimoireLabJob,
+                connection=self.conn,
+                is_async=False
+            )
+            job = q.enqueue(f=archivist_job,
+                            result_ttl=100,
+                            job_timeout=120,
+                            job_id='archive-events',
+                            **job_args)
+            result = job.return_value()
+
+        self.assertEqual(result.total, 9)
+        self.assertListEqual(MockStorageBackend.get_events(), expected_events)
+
+    def test_job_undecodable_events(self):
+        """Events that can't be decoded are moved to the dead-letter stream"""
+
+        events = [
+            {'uuid': str(i), 'timestamp': '2021-01-01T00:00:00Z', 'data': f'event {i}' * 10}
+            for i in range(4)
+        ]
+
+        messages = [encode_payload(json.dumps(event).encode('utf-8'), None) for event in events]
+        # Compressed with a dictionary not available for the archivist
+        messages[1] = encode_payload(json.dumps(events[1]).encode('utf-8'),
+                                     ZlibCompressor(dictionary=b'{"uuid":"","data":"event "}'))
+        # Compressed with an unknown algorithm
+        messages[2] = {**messages[2], 'encoding': 'lz4'}
+
+        ids = [self.conn.xadd('test-events', message) for message in messages]
+
+        job_args = {
+            'storage_type': 'mock_storage',
+            'storage_url': 'example.com',
+            'storage_db_name': 'mock_db',
+            'storage_verify_certs': True,
+            'redis_group': 'archivist',
+            'consumer_name': 'consumer_1',
+            'events_queue': 'test-events',
+            'block_timeout': None,
+            'limit': 10
+        }
+        with patch('grimoirelab.core.scheduler.tasks.archivist.get_storage_backend',
+                   return_value=MockStorageBackend):
+            q = rq.Queue(
+                'test-queue',
+                job_class=GrimoireLabJob,
+                connection=self.conn,
+                is_async=False
+            )
+            job = q.enqueue(f=archivist_job,
+                            result_ttl=100,
+                            job_timeout=120,
+                            job_id='archive-events',
+                            **job_args)
+            result = job.return_value()
+
+        self.assertEqual(result.total, 2)
+        self.assertListEqual(MockStorageBackend.get_events(), [events[0], events[3]])
+
+        # All the entries were acknowledged
+        pending = self.conn.xpending('test-events', 'archivist')
+        self.assertEqual(pending['pending'], 0)
+
+        dead_letter = self.conn.xrange(dead_letter_stream_name('test-events'))
+        self.assertEqual(len(dead_letter), 2)
+        self.assertEqual(dead_letter[0][1][b'message_id'], ids[1])
+        self.assertEqual(dead_letter[0][1][b'data'], messages[1]['data'])
+        self.assertEqual(dead_letter[1][1][b'message_id'], ids[2])
+        self.assertEqual(dead_letter[1][1][b'encoding'], b'lz4')
+
+    def test_job_in_flight(self):
+        """Events are stored concurrently and all are acknowledged"""
+
+        for i in range(20):
+            message = {
+                'data': json.dumps({'uuid': str(i), 'data': f'event {i}'})
+            }
+            self.conn.xadd('test-events', message, maxlen=20)
+
+        job_args = {
+            'storage_type': 'mock_storage',
+            'storage_url': 'example.com',
+            'storage_db_name': 'mock_db',
+            'storage_verify_certs': True,
+            'redis_group': 'archivist',
+            'consumer_name': 'consumer_1',
+            'events_queue': 'test-events',
+            'block_timeout': None,
+            'limit': 20,
+            'read_count': 3,
+            'max_in_flight': 4
+        }
+        with patch('grimoirelab.core.scheduler.tasks.archivist.get_storage_backend',
+                   return_value=MockStorageBackend):
+            q = rq.Queue(
+                'test-queue',
+                job_class=GrimoireLabJob,
+                connection=self.conn,
+                is_async=False
+            )
+            job = q.enqueue(f=archivist_job,
+                            result_ttl=100,
+                            job_timeout=120,
+                            job_id='archive-events',
+                            **job_args)
+            result = job.return_value()
+
+        self.assertEqual(result.total, 20)
+        self.assertEqual(len(MockStorageBackend.get_events()), 20)
+
+        pending = self.conn.xpending('test-events', 'archivist')
+        self.assertEqual(pending['pending'], 0)
+
     def test_job_no_result(self):
         """Execute a job that will not produce any results"""
 
@@ -187,6 +514,339 @@ class TestArchivistJob(GrimoireLabTestCase):
         self.assertTrue(job.is_failed)
 
 
+class FailingStorageBackend(MockStorageBackend):
+    """Class that fails storing some entries a number of times"""
+
+    def __init__(self, *args, failures=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failures = failures or {}
+
+    def store(self, entries: list) -> list:
+        valid = []
+        for entry in entries:
+            if self.failures.get(entry.message_id, 0) > 0:
+                self.failures[entry.message_id] -= 1
+            else:
+                valid.append(entry)
+        return super().store(valid)
+
+
+class TestStreamEntry(GrimoireLabTestCase):
+    """Unit tests for StreamEntry class"""
+
+    def test_from_message(self):
+        """The entry is created from a stream message"""
+
+        message = (b'1-0', {b'id': b'event-1', b'data': b'{"id": "event-1"}'})
+        entry = StreamEntry.from_message(message)
+
+        self.assertEqual(entry.message_id, b'1-0')
+        self.assertEqual(entry.data, b'{"id": "event-1"}')
+        self.assertEqual(entry.event_id, 'event-1')
+
+        # The event is not decoded until it's needed
+        self.assertIsNone(entry._event)
+        self.assertDictEqual(entry.event, {'id': 'event-1'})
+
+    def test_from_message_no_id(self):
+        """The event id is read from the event when it's not in the message"""
+
+        message = (b'1-0', {b'data': b'{"id": "event-1", "data": 1}'})
+        entry = StreamEntry.from_message(message)
+
+        self.assertEqual(entry.event_id, 'event-1')
+        self.assertDictEqual(entry.event, {'id': 'event-1', 'data': 1})
+
+    def test_from_message_compressed(self):
+        """Compressed events are decompressed when the entry is created"""
+
+        data = b'{"id": "event-1", "data": "' + b'a' * 100 + b'"}'
+        fields = {
+            b'id': b'event-1',
+            b'data': ZlibCompressor().compress(data),
+            b'encoding': b'zlib'
+        }
+        entry = StreamEntry.from_message((b'1-0', fields))
+
+        self.assertEqual(entry.data, data)
+        self.assertEqual(entry.event['data'], 'a' * 100)
+
+
+class TestStoreEntries(GrimoireLabTestCase):
+    """Unit tests for _store_entries function"""
+
+    def setUp(self):
+        MockStorageBackend.clear_events()
+        super().setUp()
+
+    def tearDown(self):
+        MockStorageBackend.clear_events()
+        super().tearDown()
+
+    def test_store_entries(self):
+        """Ids of the stored entries are returned"""
+
+        entries = [make_entry(f'{i}-0'.encode(), {'id': str(i)}) for i in range(5)]
+
+        storage = MockStorageBackend('example.com', 'mock_db')
+        stored_ids = _store_entries(storage, entries)
+
+        self.assertListEqual(stored_ids, [b'0-0', b'1-0', b'2-0', b'3-0', b'4-0'])
+        self.assertEqual(len(MockStorageBackend.batches), 1)
+
+    def test_retry_failed_entries(self):
+        """Entries that were not stored are retried right away"""
+
+        entries = [make_entry(f'{i}-0'.encode(), {'id': str(i)}) for i in range(5)]
+
+        storage = FailingStorageBackend('example.com', 'mock_db',
+                                        failures={b'0-0': 1, b'3-0': 2})
+        stored_ids = _store_entries(storage, entries, retries=2)
+
+        # Only the entries that failed were sent again
+        self.assertListEqual(stored_ids, [b'1-0', b'2-0', b'4-0', b'0-0', b'3-0'])
+
+        batches = [[e['id'] for e in batch] for batch in MockStorageBackend.batches]
+        self.assertListEqual(batches, [['1', '2', '4'], ['0'], ['3']])
+
+    def test_retries_exhausted(self):
+        """Entries are not returned when they can't be stored"""
+
+        entries = [make_entry(b'1-0', {'id': '1'})]
+
+        storage = FailingStorageBackend('example.com', 'mock_db',
+                                        failures={b'1-0': 5})
+        stored_ids = _store_entries(storage, entries, retries=2)
+
+        self.assertListEqual(stored_ids, [])
+        self.assertEqual(len(MockStorageBackend.batches), 3)
+
+
+class SlowStorageBackend(MockStorageBackend):
+    """Class that takes longer to store the first pages"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def store(self, entries: list) -> list:
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(0.05 / (entries[0].event['page'] + 1))
+
+        with self.lock:
+            self.running -= 1
+
+        return super().store(entries)
+
+
+class TestStorePages(GrimoireLabTestCase):
+    """Unit tests for _store_pages function"""
+
+    def setUp(self):
+        MockStorageBackend.clear_events()
+        super().setUp()
+
+    def tearDown(self):
+        MockStorageBackend.clear_events()
+        super().tearDown()
+
+    @staticmethod
+    def _pages(npages, nitems):
+        for p in range(npages):
+            yield [
+                make_entry(f'{p}-{i}'.encode(), {'id': f'{p}-{i}', 'page': p})
+                for i in range(nitems)
+            ]
+
+    def test_store_pages(self):
+        """Pages are stored one after the other"""
+
+        storage = SlowStorageBackend('example.com', 'mock_db')
+        results = list(_store_pages(storage, self._pages(4, 2)))
+
+        expected = [[f'{p}-{i}'.encode() for i in range(2)] for p in range(4)]
+        self.assertListEqual(results, expected)
+        self.assertEqual(storage.max_running, 1)
+
+    def test_store_pages_in_flight(self):
+        """Pages are stored concurrently but reported in order"""
+
+        storage = SlowStorageBackend('example.com', 'mock_db')
+        results = list(_store_pages(storage, self._pages(6, 2), max_in_flight=3))
+
+        expected = [[f'{p}-{i}'.encode() for i in range(2)] for p in range(6)]
+        self.assertListEqual(results, expected)
+        self.assertGreater(storage.max_running, 1)
+        self.assertLessEqual(storage.max_running, 3)
+
+        # Last pages were stored before the first ones
+        stored = [batch[0]['page'] for batch in MockStorageBackend.batches]
+        self.assertNotEqual(stored, sorted(stored))
+
+    def test_store_pages_error(self):
+        """Errors storing a page are raised"""
+
+        storage = MockStorageBackend('example.com', 'mock_db')
+
+        with patch.object(MockStorageBackend, 'store', side_effect=Exception("Storage error")):
+            with self.assertRaisesRegex(Exception, "Storage error"):
+                list(_store_pages(storage, self._pages(4, 2), max_in_flight=2))
+
+
+class TestOpenSearchStorage(GrimoireLabTestCase):
+    """Unit tests for OpenSearchStorage class"""
+
+    def setUp(self):
+        patcher = patch('grimoirelab.core.scheduler.tasks.archivist.OpenSearch')
+        self.mock_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def test_store(self):
+        """Events are sent in bulk requests and the stored ids are returned"""
+
+        def bulk(body, index):
+            lines = body.splitlines()
+            return {
+                'errors': False,
+                'items': [{'index': {'status': 201}} for _ in lines[::2]]
+            }
+
+        self.mock_client.bulk.side_effect = bulk
+
+        entries = [make_entry(f'{i}-0'.encode(), {'id': f'event-{i}', 'data': i}) for i in range(5)]
+
+        storage = OpenSearchStorage('https://localhost:9200', 'events',
+                                    max_items_bulk=2)
+        stored_ids = storage.store(entries)
+
+        self.assertListEqual(stored_ids, [e.message_id for e in entries])
+        self.assertEqual(self.mock_client.bulk.call_count, 3)
+
+        body = self.mock_client.bulk.call_args_list[0].kwargs['body']
+        lines = body.splitlines()
+        self.assertEqual(json.loads(lines[0]), {'index': {'_id': 'event-0'}})
+        self.assertEqual(json.loads(lines[1]), {'id': 'event-0', 'data': 0})
+
+    def test_store_raw_events(self):
+        """Events are written in the body as they were read"""
+
+        self.mock_client.bulk.return_value = {
+            'errors': False,
+            'items': [{'index': {'status': 201}}, {'index': {'status': 201}}]
+        }
+
+        entries = [
+            StreamEntry(b'0-0', b'{"id" : "event-0",  "data": 0}', 'event-0'),
+            StreamEntry(b'1-0', b'{\n  "id": "event-1",\n  "data": 1\n}'),
+        ]
+
+        storage = OpenSearchStorage('https://localhost:9200', 'events')
+        storage.store(entries)
+
+        body = self.mock_client.bulk.call_args.kwargs['body']
+        expected = (
+            b'{"index":{"_id":"event-0"}}\n'
+            b'{"id" : "event-0",  "data": 0}\n'
+            b'{"index":{"_id":"event-1"}}\n'
+            b'{"id":"event-1","data":1}\n'
+        )
+        self.assertEqual(body, expected)
+
+    def test_store_max_bytes(self):
+        """Bulk requests are split when they reach the maximum size"""
+
+        self.mock_client.bulk.side_effect = lambda body, index: {
+            'errors': False,
+            'items': [{'index': {'status': 201}} for _ in body.splitlines()[::2]]
+        }
+
+        entries = [
+            make_entry(b'0-0', {'id': 'event-0', 'data': 'a' * 100}),
+            make_entry(b'1-0', {'id': 'event-1', 'data': 'b' * 100}),
+            make_entry(b'2-0', {'id': 'event-2', 'data': 'c' * 1000}),
+            make_entry(b'3-0', {'id': 'event-3', 'data': 'd' * 10}),
+        ]
+
+        storage = OpenSearchStorage('https://localhost:9200', 'events',
+                                    max_items_bulk=100, max_bytes_bulk=400)
+        stored_ids = storage.store(entries)
+
+        self.assertListEqual(stored_ids, [e.message_id for e in entries])
+
+        # Events bigger than the limit are sent alone
+        bodies = [call.kwargs['body'] for call in self.mock_client.bulk.call_args_list]
+        self.assertListEqual([len(body.splitlines()) for body in bodies], [4, 2, 2])
+
+        for body in bodies[:1] + bodies[2:]:
+            self.assertLessEqual(len(body), 400)
+
+    def test_store_failed_items(self):
+        """Ids of the items that failed are not returned"""
+
+        self.mock_client.bulk.return_value = {
+            'errors': True,
+            'items': [
+                {'index': {'status': 201}},
+                {'index': {'status': 429, 'error': {'type': 'es_rejected_execution_exception'}}},
+                {'index': {'status': 201}},
+            ]
+        }
+
+        entries = [make_entry(f'{i}-0'.encode(), {'id': f'event-{i}'}) for i in range(3)]
+
+        storage = OpenSearchStorage('https://localhost:9200', 'events')
+        stored_ids = storage.store(entries)
+
+        self.assertListEqual(stored_ids, [b'0-0', b'2-0'])
+
+
+class TestBulkBodyBuilder(GrimoireLabTestCase):
+    """Unit tests for BulkBodyBuilder class"""
+
+    def test_add(self):
+        """Events are written as action and source lines"""
+
+        bulk = BulkBodyBuilder()
+
+        data = bulk.encode('event-"1"', b'{"id":"event-\\"1\\""}')
+        bulk.add(b'1-0', data)
+        bulk.add(b'2-0', bulk.encode('event-2', b'{"id":"event-2"}'))
+
+        expected = (
+            b'{"index":{"_id":"event-\\"1\\""}}\n'
+            b'{"id":"event-\\"1\\""}\n'
+            b'{"index":{"_id":"event-2"}}\n'
+            b'{"id":"event-2"}\n'
+        )
+        self.assertEqual(bulk.body(), expected)
+        self.assertEqual(bulk.items, 2)
+        self.assertEqual(bulk.size, len(expected))
+        self.assertListEqual(bulk.message_ids, [b'1-0', b'2-0'])
+
+    def test_clear(self):
+        """The builder is empty after clearing it"""
+
+        bulk = BulkBodyBuilder()
+        bulk.add(b'1-0', bulk.encode('event-1', b'{"id":"event-1"}'))
+        body = bulk.body()
+
+        bulk.clear()
+
+        self.assertEqual(bulk.body(), b'')
+        self.assertEqual(bulk.items, 0)
+        self.assertEqual(bulk.size, 0)
+        self.assertListEqual(bulk.message_ids, [])
+
+        # Bodies returned before are not modified
+        self.assertEqual(body, b'{"index":{"_id":"event-1"}}\n{"id":"event-1"}\n')
+
+
 class TestArchivistProgress(GrimoireLabTestCase):
     """Unit tests for ArchivistProgress class"""
 
@@ -202,6 +862,7 @@ class TestArchivistProgress(GrimoireLabTestCase):
         self.assertEqual(progress.group, 'storage_grp')
         self.assertEqual(progress.consumer_name, 'consumer_1')
         self.assertEqual(progress.total, 100)
+        self.assertEqual(progress.rate, 0)
 
     def test_from_dict(self):
         """Tests whether the ArchivistProgress object is created from a dict"""
@@ -217,7 +878,8 @@ class TestArchivistProgress(GrimoireLabTestCase):
             'backend': backend,
             'group': group,
             'consumer_name': consumer_name,
-            'total': total
+            'total': total,
+            'rate': 25.5
         }
 
         progress = ArchivistProgress.from_dict(data)
@@ -227,6 +889,7 @@ class TestArchivistProgress(GrimoireLabTestCase):
         self.assertEqual(progress.group, group)
         self.assertEqual(progress.consumer_name, consumer_name)
         self.assertEqual(progress.total, total)
+        self.assertEqual(progress.rate, 25.5)
 
     def test_to_dict(self):
         """Tests whether the ArchivistProgress object is converted to a dict"""
@@ -244,7 +907,8 @@ class TestArchivistProgress(GrimoireLabTestCase):
             'backend': backend,
             'group': group,
             'consumer_name': consumer_name,
-            'total': total
+            'total': total,
+            'rate': 0
         }
 
         d = progress.to_dict()
@@ -22,15 +22,27 @@ import os
 import pickle
 import shutil
 import tempfile
+import unittest.mock
 
 import rq
+import chronicler.eventizer
 import perceval.backend
+from django.test import override_settings
 
+from grimoirelab.core.scheduler.compression import PayloadDecoder
 from grimoirelab.core.scheduler.jobs import GrimoireLabJob
+from grimoirelab.core.scheduler.models import SchedulerStatus
 from grimoirelab.core.scheduler.tasks.chronicler import (
+    StreamFlowControl,
     ChroniclerProgress,
+    EventsPublisher,
     chronicler_job
 )
+from grimoirelab.core.scheduler.streams import (
+    get_stream_partition,
+    stream_partition_name
+)
+from grimoirelab.core.scheduler.tasks.models import EventizerTask
 
 from ..base import GrimoireLabTestCase
 
@@ -125,6 +137,121 @@ class TestChroniclerJob(GrimoireLabTestCase):
             self.assertEqual(event['type'], expected[i][1])
             self.assertEqual(event['source'], 'http://example.com/')
 
+    def test_job_event_id(self):
+        """The id of each event is published apart"""
+
+        job_args = {
+            'datasource_type': 'git',
+            'datasource_category': 'commit',
+            'events_stream': 'events',
+            'stream_max_length': 500,
+            'job_args': {
+                'uri': 'http://example.com/',
+                'gitpath': os.path.join(self.dir, 'data/git_log.txt')
+            }
+        }
+
+        q = rq.Queue(
+            'test-queue',
+            job_class=GrimoireLabJob,
+            connection=self.conn,
+            is_async=False
+        )
+        q.enqueue(f=chronicler_job,
+                  result_ttl=100,
+                  job_timeout=120,
+                  job_id='chonicler-git',
+                  **job_args)
+
+        entries = self.conn.xrange('events')
+        self.assertGreater(len(entries), 0)
+
+        for _, fields in entries:
+            event = json.loads(fields[b'data'])
+            self.assertEqual(fields[b'id'].decode(), event['id'])
+
+    def test_job_compressed_events(self):
+        """Events are published compressed"""
+
+        job_args = {
+            'datasource_type': 'git',
+            'datasource_category': 'commit',
+            'events_stream': 'events',
+            'stream_max_length': 500,
+            'compression': 'zlib',
+            'job_args': {
+                'uri': 'http://example.com/',
+                'gitpath': os.path.join(self.dir, 'data/git_log.txt')
+            }
+        }
+
+        q = rq.Queue(
+            'test-queue',
+            job_class=GrimoireLabJob,
+            connection=self.conn,
+            is_async=False
+        )
+        q.enqueue(f=chronicler_job,
+                  result_ttl=100,
+                  job_timeout=120,
+                  job_id='chonicler-git',
+                  **job_args)
+
+        entries = self.conn.xrange('events')
+        self.assertGreater(len(entries), 0)
+
+        decoder = PayloadDecoder()
+
+        for _, fields in entries:
+            self.assertEqual(fields[b'encoding'], b'zlib')
+            self.assertNotIn(b'dict', fields)
+
+            event = json.loads(decoder.decode(fields))
+            self.assertEqual(fields[b'id'].decode(), event['id'])
+
+    @override_settings(GRIMOIRELAB_EVENTS_STREAM_PARTITIONS=4)
+    def test_job_partition(self):
+        """Events are published in the partition resolved when the job runs"""
+
+        job_args = {
+            'datasource_type': 'git',
+            'datasource_category': 'commit',
+            'events_stream': 'events',
+            'partition_key': 'task-1',
+            'stream_max_length': 500,
+            'job_args': {
+                'uri': 'http://example.com/',
+                'gitpath': os.path.join(self.dir, 'data/git_log.txt')
+            }
+        }
+
+        q = rq.Queue(
+            'test-queue',
+            job_class=GrimoireLabJob,
+            connection=self.conn,
+            is_async=False
+        )
+        q.enqueue(f=chronicler_job,
+                  result_ttl=100,
+                  job_timeout=120,
+                  job_id='chonicler-git',
+                  **job_args)
+
+        stream = stream_partition_name('events', get_stream_partition('task-1', 4))
+        self.assertGreater(len(self.conn.xrange(stream)), 0)
+
+        # The same arguments are reused after changing the
+        # number of partitions (e.g., when a job is rescheduled)
+        with override_settings(GRIMOIRELAB_EVENTS_STREAM_PARTITIONS=7):
+            q.enqueue(f=chronicler_job,
+                      result_ttl=100,
+                      job_timeout=120,
+                      job_id='chonicler-git-2',
+                      **job_args)
+
+        stream = stream_partition_name('events', get_stream_partition('task-1', 7))
+        self.assertGreater(len(self.conn.xrange(stream)), 0)
+
     def test_job_no_result(self):
         """Execute a job that will not produce any results"""
 
@@ -168,6 +295,104 @@ class TestChroniclerJob(GrimoireLabTestCase):
         commits = [pickle.loads(c) for c in commits]
         self.assertListEqual(commits, [])
 
+    def test_job_publish_events_on_error(self):
+        """Events eventized before an error are published"""
+
+        job_args = {
+            'datasource_type': 'git',
+            'datasource_category': 'commit',
+            'events_stream': 'events',
+            'stream_max_length': 500,
+            'batch_size': 100,
+            'job_args': {
+                'uri': 'http://example.com/',
+                'gitpath': os.path.join(self.dir, 'data/git_log.txt')
+            }
+        }
+
+        eventize = chronicler.eventizer.eventize
+
+        def eventize_and_fail(datasource_type, items):
+            events = eventize(datasource_type, items)
+            for _ in range(5):
+                yield next(events)
+            raise Exception("Unexpected error")
+
+        q = rq.Queue(
+            'test-queue',
+            job_class=GrimoireLabJob,
+            connection=self.conn,
+            is_async=False
+        )
+
+        with unittest.mock.patch('chronicler.eventizer.eventize',
+                                 side_effect=eventize_and_fail):
+            job = q.enqueue(f=chronicler_job,
+                            result_ttl=100,
+                            job_timeout=120,
+                            job_id='chonicler-git',
+                            **job_args)
+
+        self.assertTrue(job.is_failed)
+        self.assertEqual(self.conn.xlen('events'), 5)
+
+        # The summary was set after the events were published
+        self.assertIsNotNone(job.progress.summary)
+
+    def test_job_progress_checkpoints(self):
+        """The progress is saved while the job runs"""
+
+        job_args = {
+            'datasource_type': 'git',
+            'datasource_category': 'commit',
+            'events_stream': 'events',
+            'stream_max_length': 500,
+            'batch_size': 100,
+            'progress_interval': 0,
+            'job_args': {
+                'uri': 'http://example.com/',
+                'gitpath': os.path.join(self.dir, 'data/git_log.txt')
+            }
+        }
+
+        checkpoints = []
+
+        def save_meta(job, *args, **kwargs):
+            progress = job.meta['progress']
+            if progress and progress.summary:
+                checkpoints.append((progress.summary.fetched, self.conn.xlen('events')))
+
+        q = rq.Queue(
+            'test-queue',
+            job_class=GrimoireLabJob,
+            connection=self.conn,
+            is_async=False
+        )
+
+        with unittest.mock.patch.object(GrimoireLabJob, 'save_meta',
+                                        autospec=True, side_effect=save_meta):
+            job = q.enqueue(f=chronicler_job,
+                            result_ttl=100,
+                            job_timeout=120,
+                            job_id='chonicler-git',
+                            **job_args)
+
+        result = job.return_value()
+
+        # The progress was saved after each item; the log
+        # is written when the job finishes, saving it again
+        checkpoints = checkpoints[:9]
+        self.assertListEqual([fetched for fetched, _ in checkpoints],
+                             list(range(1, 10)))
+        self.assertGreater(result.rate, 0)
+
+        # Events of the items fetched were published before
+        # saving the progress
+        published = [nevents for _, nevents in checkpoints]
+        self.assertTrue(all(n > 0 for n in published))
+        self.assertListEqual(published, sorted(published))
+        self.assertEqual(published[-1], self.conn.xlen('events'))
+
     def test_backend_not_found(self):
         """Test if it fails when a backend is not found"""
 
@@ -197,6 +422,176 @@ class TestChroniclerJob(GrimoireLabTestCase):
         self.assertTrue(job.is_failed)
 
 
+class TestEventsPublisher(GrimoireLabTestCase):
+    """Unit tests for EventsPublisher class"""
+
+    def test_init(self):
+        """Tests whether the publisher initialization is correct"""
+
+        publisher = EventsPublisher(self.conn, 'events', 500,
+                                    batch_size=10, flush_interval=5)
+
+        self.assertEqual(publisher.connection, self.conn)
+        self.assertEqual(publisher.stream_name, 'events')
+        self.assertEqual(publisher.stream_max_length, 500)
+        self.assertEqual(publisher.batch_size, 10)
+        self.assertEqual(publisher.flush_interval, 5)
+        self.assertEqual(publisher.published, 0)
+
+    def test_invalid_batch_size(self):
+        """Check if it fails when the batch size is not valid"""
+
+        with self.assertRaisesRegex(ValueError, 'batch_size'):
+            EventsPublisher(self.conn, 'events', 500, batch_size=0)
+
+    def test_publish_batches(self):
+        """Messages are published when the batch is full"""
+
+        publisher = EventsPublisher(self.conn, 'events', 500,
+                                    batch_size=3, flush_interval=3600)
+
+        for i in range(7):
+            publisher.publish({'data': f'event {i}'})
+
+        self.assertEqual(publisher.published, 6)
+        self.assertEqual(self.conn.xlen('events'), 6)
+
+        # Remaining messages are published when flushed
+        nmessages = publisher.flush()
+
+        self.assertEqual(nmessages, 1)
+        self.assertEqual(publisher.published, 7)
+
+        entries = self.conn.xrange('events')
+        messages = [entry[1][b'data'] for entry in entries]
+        expected = [f'event {i}'.encode() for i in range(7)]
+        self.assertListEqual(messages, expected)
+
+        # Nothing else to publish
+        self.assertEqual(publisher.flush(), 0)
+
+    def test_publish_flush_interval(self):
+        """Messages are published when the flush interval expires"""
+
+        publisher = EventsPublisher(self.conn, 'events', 500,
+                                    batch_size=100, flush_interval=10)
+
+        with unittest.mock.patch('grimoirelab.core.scheduler.tasks.chronicler.time.monotonic') as mock_time:
+            mock_time.return_value = 100
+            publisher.publish({'data': 'event 1'})
+            mock_time.return_value = 105
+            publisher.publish({'data': 'event 2'})
+
+            self.assertEqual(self.conn.xlen('events'), 0)
+
+            mock_time.return_value = 110
+            publisher.publish({'data': 'event 3'})
+
+        self.assertEqual(publisher.published, 3)
+        self.assertEqual(self.conn.xlen('events'), 3)
+
+    def test_stream_max_length(self):
+        """The stream is trimmed when it reaches its maximum length"""
+
+        publisher = EventsPublisher(self.conn, 'events', 5,
+                                    batch_size=100, flush_interval=3600)
+
+        for i in range(20):
+            publisher.publish({'data': f'event {i}'})
+        publisher.flush()
+
+        entries = self.conn.xrange('events')
+        messages = [entry[1][b'data'] for entry in entries]
+        expected = [f'event {i}'.encode() for i in range(15, 20)]
+        self.assertListEqual(messages, expected)
+
+    def test_flow_control(self):
+        """Batches wait until the consumers catch up"""
+
+        flow_control = StreamFlowControl(self.conn, 'events', 10)
+        throttles = []
+
+        publisher = EventsPublisher(self.conn, 'events', 500,
+                                    batch_size=2, flush_interval=3600,
+                                    flow_control=flow_control,
+                                    on_throttle=throttles.append)
+
+        with unittest.mock.patch.object(flow_control, 'wait',
+                                        side_effect=[None, 3.0, None]):
+            for i in range(6):
+                publisher.publish({'data': f'event {i}'})
+
+        self.assertEqual(publisher.published, 6)
+        self.assertListEqual(throttles, [3.0])
+
+
+class TestStreamFlowControl(GrimoireLabTestCase):
+    """Unit tests for StreamFlowControl class"""
+
+    def test_init(self):
+        """Tests whether the flow control initialization is correct"""
+
+        flow_control = StreamFlowControl(self.conn, 'events', 1000,
+                                         check_interval=5, max_wait=60)
+
+        self.assertEqual(flow_control.stream_name, 'events')
+        self.assertEqual(flow_control.high_water_mark, 1000)
+        self.assertEqual(flow_control.low_water_mark, 800)
+        self.assertEqual(flow_control.check_interval, 5)
+        self.assertEqual(flow_control.max_wait, 60)
+
+    def test_invalid_water_marks(self):
+        """Check if it fails when the water marks are not valid"""
+
+        with self.assertRaisesRegex(ValueError, 'high_water_mark'):
+            StreamFlowControl(self.conn, 'events', 0)
+
+        with self.assertRaisesRegex(ValueError, 'low_water_mark'):
+            StreamFlowControl(self.conn, 'events', 100, low_water_mark=200)
+
+    def test_wait(self):
+        """Producers wait until the backlog drops to the low water mark"""
+
+        flow_control = StreamFlowControl(self.conn, 'events', 100,
+                                         low_water_mark=50, check_interval=2)
+
+        with unittest.mock.patch.object(flow_control, 'backlog',
+                                        side_effect=[150, 120, 80, 50]), \
+             unittest.mock.patch('grimoirelab.core.scheduler.tasks.chronicler.time') as mock_time:
+            mock_time.monotonic.side_effect = [0, 2, 4, 6]
+            waited = flow_control.wait()
+
+        self.assertEqual(waited, 6)
+        self.assertEqual(mock_time.sleep.call_count, 3)
+        mock_time.sleep.assert_called_with(2)
+
+    def test_wait_not_needed(self):
+        """Producers don't wait when the backlog is under the high water mark"""
+
+        flow_control = StreamFlowControl(self.conn, 'events', 100)
+
+        with unittest.mock.patch.object(flow_control, 'backlog', return_value=99), \
+             unittest.mock.patch('grimoirelab.core.scheduler.tasks.chronicler.time') as mock_time:
+            waited = flow_control.wait()
+
+        self.assertIsNone(waited)
+        mock_time.sleep.assert_not_called()
+
+    def test_wait_max_wait(self):
+        """Producers resume when the maximum time is reached"""
+
+        flow_control = StreamFlowControl(self.conn, 'events', 100,
+                                         check_interval=1, max_wait=3)
+
+        with unittest.mock.patch.object(flow_control, 'backlog', return_value=500), \
+             unittest.mock.patch('grimoirelab.core.scheduler.tasks.chronicler.time') as mock_time:
+            mock_time.monotonic.side_effect = [0, 1, 2, 3]
+            waited = flow_control.wait()
+
+        self.assertEqual(waited, 3)
+        self.assertEqual(mock_time.sleep.call_count, 3)
+
+
 class TestChroniclerProgress(GrimoireLabTestCase):
     """Unit tests for ChroniclerProgress class"""
 
@@ -209,6 +604,19 @@ class TestChroniclerProgress(GrimoireLabTestCase):
         self.assertEqual(progress.backend, 'git')
         self.assertEqual(progress.category, 'commit')
         self.assertEqual(progress.summary, None)
+        self.assertEqual(progress.throttles, 0)
+        self.assertEqual(progress.throttled_time, 0)
+        self.assertEqual(progress.rate, 0)
+
+    def test_add_throttle(self):
+        """Pauses in the publication are recorded"""
+
+        progress = ChroniclerProgress('1234567890', 'git', 'commit', None)
+        progress.add_throttle(1.5)
+        progress.add_throttle(2.5)
+
+        self.assertEqual(progress.throttles, 2)
+        self.assertEqual(progress.throttled_time, 4.0)
 
     def test_from_dict(self):
         """Tests whether the ChroniclerProgress object is created from a dict"""
@@ -232,7 +640,10 @@ class TestChroniclerProgress(GrimoireLabTestCase):
                 'max_offset': 10,
                 'last_offset': 5,
                 'extras': {'extra_key': 'extra_value'}
-            }
+            },
+            'throttles': 3,
+            'throttled_time': 12.5,
+            'rate': 7.5
         }
 
         progress = ChroniclerProgress.from_dict(data)
@@ -259,6 +670,25 @@ class TestChroniclerProgress(GrimoireLabTestCase):
         self.assertEqual(progress.summary.max_offset, 10)
         self.assertEqual(progress.summary.last_offset, 5)
         self.assertEqual(progress.summary.extras, {"extra_key": "extra_value"})
+        self.assertEqual(progress.throttles, 3)
+        self.assertEqual(progress.throttled_time, 12.5)
+        self.assertEqual(progress.rate, 7.5)
+
+    def test_from_dict_no_throttles(self):
+        """Dicts generated before throttles were recorded are supported"""
+
+        data = {
+            'job_id': '1234567890',
+            'backend': 'git',
+            'category': 'commit',
+            'summary': {}
+        }
+
+        progress = ChroniclerProgress.from_dict(data)
+
+        self.assertEqual(progress.throttles, 0)
+        self.assertEqual(progress.throttled_time, 0)
+        self.assertEqual(progress.rate, 0)
 
     def test_to_dict(self):
         """Tests whether the ChroniclerProgress object is converted to a dict"""
@@ -280,6 +710,7 @@ class TestChroniclerProgress(GrimoireLabTestCase):
         summary.last_updated_on = datetime.datetime(2022, 1, 15, tzinfo=datetime.timezone.utc)
 
         progress = ChroniclerProgress(job_id, backend, category, summary)
+        progress.add_throttle(2.5)
 
         expected = {
             'job_id': job_id,
@@ -296,8 +727,56 @@ class TestChroniclerProgress(GrimoireLabTestCase):
                 'min_updated_on': datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc).timestamp(),
                 'max_updated_on': datetime.datetime(2022, 1, 31, tzinfo=datetime.timezone.utc).timestamp(),
                 'last_updated_on': datetime.datetime(2022, 1, 15, tzinfo=datetime.timezone.utc).timestamp()
-            }
+            },
+            'throttles': 1,
+            'throttled_time': 2.5,
+            'rate': 0
         }
 
         d = progress.to_dict()
         self.assertEqual(d, expected)
+
+
+class TestEventizerTask(GrimoireLabTestCase):
+    """Unit tests for EventizerTask class"""
+
+    def test_prepare_job_parameters_checkpoint(self):
+        """The arguments of new jobs are obtained from the task checkpoint"""
+
+        task = EventizerTask.create_task({'uri': 'http://example.com/'}, 60, 3,
+                                         datasource_type='git',
+                                         datasource_category='commit')
+        job_args = task.prepare_job_parameters()
+        self.assertFalse(job_args['job_args']['latest_items'])
+
+        job = task.jobs.create(uuid='job-1', job_num=1, job_args=job_args,
+                               status=SchedulerStatus.RUNNING)
+        progress = ChroniclerProgress('job-1', 'git', 'commit', None)
+        job.save_run(SchedulerStatus.COMPLETED, progress=progress)
+
+        task = EventizerTask.objects.get(pk=task.pk)
+        self.assertEqual(task.checkpoint['progress']['job_id'], 'job-1')
+        self.assertEqual(task.checkpoint['job_args'], job_args)
+
+        # Jobs are not read to generate the arguments
+        with self.assertNumQueries(0):
+            job_args = task.prepare_job_parameters()
+
+        self.assertEqual(job_args['job_args']['uri'], 'http://example.com/')
+        self.assertTrue(job_args['job_args']['latest_items'])
+
+    def test_prepare_job_parameters_no_progress(self):
+        """Tasks without the progress of a previous job start again"""
+
+        task = EventizerTask.create_task({'uri': 'http://example.com/'}, 60, 3,
+                                         datasource_type='git',
+                                         datasource_category='commit')
+        initial_args = task.prepare_job_parameters()['job_args']
+
+        for checkpoint in (None, {'job_args': None, 'progress': None}):
+            for status in (SchedulerStatus.COMPLETED, SchedulerStatus.RECOVERY):
+                task.checkpoint = checkpoint
+                task.status = status
+
+                job_args = task.prepare_job_parameters()
+                self.assertEqual(job_args['job_args'], initial_args)
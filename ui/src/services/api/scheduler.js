@@ -14,5 +14,6 @@ export const scheduler = {
   reschedule: (taskId) => client.post(`/reschedule_task`, { taskId }),
   getTaskJobs: (taskId, params) => client.get(`/tasks/${taskId}/jobs/`, { params }),
   getJob: (taskId, jobId) => client.get(`/tasks/${taskId}/jobs/${jobId}`),
-  getJobLogs: (taskId, jobId) => client.get(`/tasks/${taskId}/jobs/${jobId}/logs/`)
+  getJobLogs: (taskId, jobId, params) =>
+    client.get(`/tasks/${taskId}/jobs/${jobId}/logs/`, { params })
 }